@@ -0,0 +1,121 @@
+"""
+Art Loader
+- Decodes card art at reduced size where the format allows it (JPEG draft)
+- Scales and center-crops art to the art window
+- Keeps an in-memory LRU of fitted art keyed by (path, mtime, window size)
+- Optionally persists fitted art on disk so re-renders skip the decode entirely
+"""
+
+from collections import OrderedDict
+from PIL import Image
+import hashlib
+import os
+
+from tracing import NO_TRACE
+
+# Bump when decoding or fitting below changes the pixels: stale on-disk derivatives
+# are ignored, and CardBuilder.layout_version (so every render cache key) changes too
+FIT_VERSION = 1
+
+
+def fit_art(art, size, reducing_gap=None):
+    """Scale art to cover `size` and center-crop it, keeping the aspect ratio"""
+    art_w, art_h = size
+    art_ratio = art.width / art.height
+    window_ratio = art_w / art_h
+
+    if art_ratio > window_ratio:
+        new_h = art_h
+        new_w = int(art_h * art_ratio)
+    else:
+        new_w = art_w
+        new_h = int(art_w / art_ratio)
+
+    art_resized = art.resize((new_w, new_h), Image.LANCZOS, reducing_gap=reducing_gap)
+    crop_x = (new_w - art_w) // 2
+    crop_y = (new_h - art_h) // 2
+    return art_resized.crop((crop_x, crop_y, crop_x + art_w, crop_y + art_h))
+
+
+class ArtLoader:
+    """
+    Loads art already fitted to an art window.
+
+    Args:
+        max_items: Fitted images kept in memory (about 1.8 MB each at 896x1344)
+        disk_dir: Optional directory for persistent fitted-art derivatives
+        reducing_gap: Passed to Image.resize; None keeps plain LANCZOS
+    """
+
+    def __init__(self, max_items=32, disk_dir=None, reducing_gap=None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.reducing_gap = reducing_gap
+        self._memory = OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+        # Optional tracing.Tracer; records decode and resize spans
+        self.tracer = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def load(self, path, size):
+        """RGBA art of exactly `size`, scaled to cover and center-cropped"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(size))
+
+        art = self._memory.get(key)
+        if art is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return art
+
+        disk_path = self._disk_path(key)
+        if disk_path and os.path.exists(disk_path):
+            with self._trace("art.decode", source="disk"):
+                art = Image.open(disk_path)
+                art.load()
+            self.disk_hits += 1
+        else:
+            art = self._decode(path, size)
+            self.misses += 1
+            if disk_path:
+                tmp_path = f"{disk_path}.tmp{os.getpid()}.png"
+                art.save(tmp_path, compress_level=1)
+                os.replace(tmp_path, disk_path)
+
+        self._memory[key] = art
+        if len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+        return art
+
+    def clear(self):
+        self._memory.clear()
+
+    def _trace(self, name, **args):
+        return self.tracer.span(name, **args) if self.tracer else NO_TRACE
+
+    def _disk_path(self, key):
+        if not self.disk_dir:
+            return None
+        name = hashlib.sha1(repr((FIT_VERSION, self.reducing_gap) + key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.png")
+
+    def _decode(self, path, size):
+        with self._trace("art.decode", source="original"):
+            art = Image.open(path)
+
+            # JPEG can decode straight at 1/2, 1/4 or 1/8 scale; ask for the
+            # smallest scale that still covers the window
+            if art.format == "JPEG":
+                scale = max(size[0] / art.width, size[1] / art.height)
+                art.draft("RGB", (int(art.width * scale) + 1, int(art.height * scale) + 1))
+
+            # Art without transparency resizes as RGB (3 bands instead of 4);
+            # the result is the same as resizing the opaque RGBA version.
+            # convert() to the mode art already has would copy the full decode
+            has_alpha = art.mode in ("RGBA", "LA", "PA") or "transparency" in art.info
+            mode = "RGBA" if has_alpha else "RGB"
+            if art.mode != mode:
+                art = art.convert(mode)
+        with self._trace("art.resize"):
+            return fit_art(art, size, self.reducing_gap).convert("RGBA")
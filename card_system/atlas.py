@@ -0,0 +1,221 @@
+"""
+Texture Atlas Packer
+- Packs rendered cards, hero portraits and small UI images into a few sheets
+- Writes atlas.json mapping sprite id -> sheet and [x, y, w, h] rect
+- Deterministic: same inputs always give the same sheets and manifest
+- Incremental: sprites keep their slot between runs, and only sheets that
+  contain changed, added or removed sprites are redrawn
+"""
+
+from PIL import Image
+import glob
+import json
+import os
+
+from render_cache import file_digest
+
+MANIFEST_NAME = "atlas.json"
+MANIFEST_VERSION = 1
+
+# Small client images packed alongside the cards (from game/images)
+UI_IMAGES = ("hp_circle.png", "mana_circle.png", "card_back.png", "hero_frame.png")
+
+
+class Sprite:
+    """One image to pack, optionally scaled"""
+
+    __slots__ = ("id", "path", "scale", "width", "height", "hash")
+
+    def __init__(self, sprite_id, path, scale=1.0):
+        self.id = sprite_id
+        self.path = path
+        self.scale = scale
+        with Image.open(path) as im:
+            self.width = max(1, round(im.width * scale))
+            self.height = max(1, round(im.height * scale))
+        self.hash = f"{file_digest(path)[:24]}@{scale:g}"
+
+    def load(self):
+        im = Image.open(self.path).convert("RGBA")
+        if im.size != (self.width, self.height):
+            im = im.resize((self.width, self.height), Image.LANCZOS)
+        return im
+
+
+def collect_sprites(cards_dir=None, images_dir=None, card_scale=1.0, extra=()):
+    """Sprites for rendered cards (<id>.png), hero portraits and UI images"""
+    sprites = []
+    if cards_dir:
+        for path in sorted(glob.glob(os.path.join(cards_dir, "*.png"))):
+            sprites.append(Sprite(os.path.splitext(os.path.basename(path))[0], path, card_scale))
+    if images_dir:
+        for path in sorted(glob.glob(os.path.join(images_dir, "hero_*.png"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if "_full" in name or "frame" in name:
+                continue  # high-res sources, not client assets
+            sprites.append(Sprite(name, path))
+        for filename in UI_IMAGES:
+            path = os.path.join(images_dir, filename)
+            if os.path.exists(path):
+                sprites.append(Sprite(os.path.splitext(filename)[0], path))
+    for path in extra:
+        sprites.append(Sprite(os.path.splitext(os.path.basename(path))[0], path))
+
+    seen = set()
+    for sprite in sprites:
+        if sprite.id in seen:
+            raise ValueError(f"Duplicate sprite id: {sprite.id}")
+        seen.add(sprite.id)
+    return sprites
+
+
+class ShelfPacker:
+    """Shelf bin packing over fixed-size sheets; state round-trips through JSON"""
+
+    def __init__(self, sheet_size, padding, state=None):
+        self.sheet_w, self.sheet_h = sheet_size
+        self.padding = padding
+        # Per sheet: list of [y, height, next_x]
+        self.sheets = [[list(shelf) for shelf in sheet] for sheet in (state or [])]
+
+    def place(self, width, height):
+        """(sheet, x, y) for a width x height sprite"""
+        pw, ph = width + self.padding, height + self.padding
+        if pw > self.sheet_w or ph > self.sheet_h:
+            raise ValueError(f"Sprite {width}x{height} does not fit a {self.sheet_w}x{self.sheet_h} sheet")
+
+        for index, shelves in enumerate(self.sheets):
+            for shelf in shelves:
+                y, shelf_h, x = shelf
+                if ph <= shelf_h and x + pw <= self.sheet_w:
+                    shelf[2] += pw
+                    return index, x, y
+            next_y = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if next_y + ph <= self.sheet_h:
+                shelves.append([next_y, ph, pw])
+                return index, 0, next_y
+
+        self.sheets.append([[0, ph, pw]])
+        return len(self.sheets) - 1, 0, 0
+
+    def state(self):
+        return self.sheets
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pack_atlas(sprites, out_dir, sheet_size=(4096, 4096), padding=2, full=False):
+    """
+    Pack sprites into <out_dir>/atlas_<n>.png and write <out_dir>/atlas.json.
+
+    Returns:
+        (manifest dict, list of sheet indexes that were rewritten)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    sheet_size = tuple(sheet_size)
+
+    old = None if full else _load_manifest(manifest_path)
+    if old and (old.get("version") != MANIFEST_VERSION or tuple(old.get("sheet_size", ())) != sheet_size
+                or old.get("padding") != padding):
+        old = None  # layout parameters changed, start over
+
+    old_sprites = old["sprites"] if old else {}
+    packer = ShelfPacker(sheet_size, padding, old["packer"] if old else None)
+    free_rects = []
+    placements = {}
+    dirty_sheets = set()
+
+    by_id = {sprite.id: sprite for sprite in sprites}
+
+    # Sprites that keep their size keep their slot
+    for sprite_id, entry in sorted(old_sprites.items()):
+        sprite = by_id.get(sprite_id)
+        if sprite and (sprite.width, sprite.height) == tuple(entry["rect"][2:]):
+            placements[sprite_id] = dict(entry)
+            if entry["hash"] != sprite.hash:
+                dirty_sheets.add(entry["sheet"])
+        else:
+            free_rects.append((entry["sheet"], entry["rect"]))
+            dirty_sheets.add(entry["sheet"])
+    free_rects.sort()
+
+    # New or resized sprites: reuse an exactly matching freed slot, else pack
+    pending = sorted((s for s in sprites if s.id not in placements), key=lambda s: (-s.height, -s.width, s.id))
+    for sprite in pending:
+        slot = next((i for i, (_, rect) in enumerate(free_rects)
+                     if tuple(rect[2:]) == (sprite.width, sprite.height)), None)
+        if slot is not None:
+            sheet, rect = free_rects.pop(slot)
+            x, y = rect[0], rect[1]
+        else:
+            sheet, x, y = packer.place(sprite.width, sprite.height)
+        placements[sprite.id] = {"sheet": sheet, "rect": [x, y, sprite.width, sprite.height]}
+        dirty_sheets.add(sheet)
+
+    for sprite_id, entry in placements.items():
+        entry["hash"] = by_id[sprite_id].hash
+
+    sheet_count = 1 + max((entry["sheet"] for entry in placements.values()), default=-1)
+    sheet_files = [f"atlas_{index}.png" for index in range(sheet_count)]
+    for index, filename in enumerate(sheet_files):
+        if not os.path.exists(os.path.join(out_dir, filename)):
+            dirty_sheets.add(index)
+
+    for index in sorted(dirty_sheets):
+        if index >= sheet_count:
+            continue
+        _redraw_sheet(index, os.path.join(out_dir, sheet_files[index]), sheet_size, placements, by_id,
+                      old_sprites if old else None, free_rects)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "sheet_size": list(sheet_size),
+        "padding": padding,
+        "sheets": sheet_files,
+        "sprites": {sprite_id: placements[sprite_id] for sprite_id in sorted(placements)},
+        "packer": packer.state(),
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    for stale in range(sheet_count, len(old["sheets"]) if old else 0):
+        stale_path = os.path.join(out_dir, f"atlas_{stale}.png")
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+    return manifest, sorted(i for i in dirty_sheets if i < sheet_count)
+
+
+def _redraw_sheet(index, path, sheet_size, placements, by_id, old_sprites, free_rects):
+    """Update one sheet in place when possible, otherwise draw it from scratch"""
+    in_sheet = {sprite_id: entry for sprite_id, entry in placements.items() if entry["sheet"] == index}
+
+    if old_sprites is not None and os.path.exists(path):
+        sheet = Image.open(path).convert("RGBA")
+        for sheet_index, (x, y, w, h) in free_rects:
+            if sheet_index == index:
+                sheet.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+        todo = [sprite_id for sprite_id, entry in in_sheet.items()
+                if old_sprites.get(sprite_id, {}).get("hash") != entry["hash"]
+                or old_sprites[sprite_id]["rect"] != entry["rect"]
+                or old_sprites[sprite_id]["sheet"] != index]
+    else:
+        sheet = Image.new("RGBA", sheet_size, (0, 0, 0, 0))
+        todo = list(in_sheet)
+
+    for sprite_id in sorted(todo):
+        x, y, w, h = in_sheet[sprite_id]["rect"]
+        sheet.paste(by_id[sprite_id].load(), (x, y))
+
+    tmp_path = f"{path}.tmp.png"
+    sheet.save(tmp_path, optimize=False, compress_level=6)
+    os.replace(tmp_path, path)
@@ -0,0 +1,460 @@
+"""
+Batch Renderer
+- Renders a whole card list across a process pool
+- Each worker builds its CardBuilder once and reuses it for every card
+- With a frame pack directory, workers restore the builder from a pack instead
+  of decoding the back image
+- Results come back in card order with per-card timing and errors
+- With a RenderCache, cards whose inputs are unchanged are skipped
+- With an Exporter, each card is also written at every client size
+- With trace=True, each result carries per-layer tracing spans from its worker
+- With low_memory=True, workers build into one reused RGB canvas and keep a
+  smaller art cache, so more of them fit in the same memory
+- RenderPool keeps the workers (and their builders) up between calls, for
+  repeated small renders such as watch mode
+- SharedRenderPool hands rendered images to the parent instead of files:
+  workers draw each card straight into a slot of a shared-memory slab and
+  return only the slot number, and the parent wraps the slot with
+  Image.frombuffer, so no image is pickled or copied between processes
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image
+import os
+import queue
+import shutil
+import time
+import traceback
+
+from art_loader import ArtLoader
+from card_builder import CardBuilder
+from card_data import build_kwargs, find_art
+from render_cache import OutputManifest, card_key, file_digest
+from tracing import NO_TRACE, Tracer
+
+# Fitted art kept in memory per worker in low-memory mode (ArtLoader default: 32)
+LOW_MEMORY_ART_ITEMS = 4
+
+# Per-process state, created once by _init_worker
+_builder = None
+_exporter = None
+_tracer = None
+# Shared-memory workers: the slab, the card size and a writable image per slot
+_slab = None
+_card_size = None
+_slot_images = {}
+
+
+class RenderResult:
+    """Outcome of rendering a single card"""
+
+    __slots__ = ("card_id", "path", "seconds", "error", "status", "exports", "trace")
+
+    def __init__(self, card_id, path=None, seconds=0.0, error=None, status="rendered", exports=None, trace=None):
+        self.card_id = card_id
+        self.path = path
+        self.seconds = seconds
+        self.error = error
+        self.status = "failed" if error else status
+        self.exports = exports or []
+        self.trace = trace or []
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _init_worker(back_path, art_cache_dir=None, exporter=None, frame_pack_dir=None, trace=False, low_memory=False):
+    global _builder, _exporter, _tracer
+    if low_memory:
+        art_loader = ArtLoader(LOW_MEMORY_ART_ITEMS, disk_dir=art_cache_dir)
+    else:
+        art_loader = ArtLoader(disk_dir=art_cache_dir)
+    if frame_pack_dir:
+        _builder = CardBuilder.cached(back_path, frame_pack_dir, art_loader)
+    else:
+        _builder = CardBuilder(back_path, art_loader)
+    _exporter = exporter
+    _tracer = Tracer() if trace else None
+    _builder.tracer = art_loader.tracer = _tracer
+    _builder.low_memory = low_memory
+
+
+def _render_one(job):
+    """Render (or reload from cache) and export one card in the current worker; never raises"""
+    card, out_dir, art_dirs, cached_path = job
+    start = time.perf_counter()
+    try:
+        path = os.path.join(out_dir, f"{card['id']}.png")
+        if cached_path:
+            shutil.copyfile(cached_path, path)
+            image = Image.open(path) if _exporter else None
+            status = "cached"
+        else:
+            image = _builder.build(**build_kwargs(card, _builder, art_dirs))
+            with _trace("encode.png"):
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                image.save(path)
+            status = "rendered"
+
+        exports = None
+        if _exporter:
+            with _trace("export"):
+                exports = _exporter.export(image, card["id"])
+        return RenderResult(card["id"], path, time.perf_counter() - start, status=status, exports=exports,
+                            trace=_tracer.drain() if _tracer else None)
+    except Exception:
+        return RenderResult(card["id"], seconds=time.perf_counter() - start,
+                            error=traceback.format_exc(limit=3).strip(),
+                            trace=_tracer.drain() if _tracer else None)
+
+
+def _trace(name):
+    return _tracer.span(name) if _tracer else NO_TRACE
+
+
+def _render_jobs(jobs, back_path, workers, art_cache_dir=None, exporter=None, frame_pack_dir=None, trace=False,
+                 low_memory=False):
+    """Render jobs in order, in-process or across a pool"""
+    if workers == 1 or len(jobs) <= 1:
+        if jobs:
+            _init_worker(back_path, art_cache_dir, exporter, frame_pack_dir, trace, low_memory)
+        for job in jobs:
+            yield _render_one(job)
+        return
+
+    if frame_pack_dir:
+        # Write the pack once up front so no worker has to decode the back
+        CardBuilder.cached(back_path, frame_pack_dir)
+
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                             initargs=(back_path, art_cache_dir, exporter, frame_pack_dir, trace,
+                                       low_memory)) as pool:
+        yield from pool.map(_render_one, jobs, chunksize=chunksize)
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+class RenderPool:
+    """
+    Render workers that stay up between render() calls, each keeping its
+    CardBuilder and art loader warm.
+
+    Args:
+        back_path: Card back/frame image for CardBuilder
+        workers: Process count (default: CPU count, 1 = render in-process)
+        art_cache_dir: Optional on-disk store of art already fitted to the art window
+        frame_pack_dir: Optional directory of CardBuilder frame packs
+    """
+
+    def __init__(self, back_path, workers=None, art_cache_dir=None, frame_pack_dir=None):
+        self.back_path = back_path
+        self.workers = workers or os.cpu_count() or 1
+        self.art_cache_dir = art_cache_dir
+        self.frame_pack_dir = frame_pack_dir
+        self._pool = None
+        self._started = False
+
+    def start(self):
+        """Start the workers and build their CardBuilders now rather than on the first render"""
+        if self._started:
+            return
+        initargs = (self.back_path, self.art_cache_dir, None, self.frame_pack_dir)
+        if self.workers == 1:
+            _init_worker(*initargs)
+        else:
+            if self.frame_pack_dir:
+                CardBuilder.cached(self.back_path, self.frame_pack_dir)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs)
+            list(self._pool.map(_warm_up, range(self.workers)))
+        self._started = True
+
+    def render(self, cards, out_dir, art_dirs=None):
+        """Render cards to <out_dir>/<id>.png; yields a RenderResult per card, in order"""
+        os.makedirs(out_dir, exist_ok=True)
+        self.start()
+        jobs = [(card, out_dir, art_dirs, None) for card in cards]
+        if self._pool is None:
+            for job in jobs:
+                yield _render_one(job)
+        else:
+            yield from self._pool.map(_render_one, jobs)
+
+    def restart(self):
+        """Drop the workers so the next render rebuilds every builder (e.g. after the frame changed)"""
+        self.close()
+        self.start()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_shared_worker(back_path, art_cache_dir, frame_pack_dir, slab_name, card_size):
+    _init_worker(back_path, art_cache_dir, frame_pack_dir=frame_pack_dir)
+    # The pool's processes share the parent's resource tracker, so attaching
+    # does not take ownership: the parent alone unlinks the slab
+    _attach_slab(shared_memory.SharedMemory(slab_name), card_size)
+
+
+def _attach_slab(slab, card_size):
+    global _slab, _card_size, _slot_images
+    _slab = slab
+    _card_size = card_size
+    _slot_images = {}
+
+
+def _slot_view(slab, slot, size):
+    """RGBA image over slot `slot` of the slab; shares its memory, nothing is copied"""
+    nbytes = size[0] * size[1] * 4
+    return Image.frombuffer("RGBA", size, slab.buf[slot * nbytes:(slot + 1) * nbytes], "raw", "RGBA", 0, 1)
+
+
+def _render_into_slot(job):
+    """Build one card straight into a shared-memory slot; returns (RenderResult, slot) and never raises"""
+    card, art_dirs, slot = job
+    start = time.perf_counter()
+    try:
+        image = _slot_images.get(slot)
+        if image is None:
+            image = _slot_images[slot] = _slot_view(_slab, slot, _card_size)
+            # frombuffer images are read-only and would copy themselves on the
+            # first paste; this one is meant to be drawn on in place
+            image.readonly = 0
+        _builder.build(**build_kwargs(card, _builder, art_dirs), into=image)
+        return RenderResult(card["id"], seconds=time.perf_counter() - start), slot
+    except Exception:
+        return RenderResult(card["id"], seconds=time.perf_counter() - start,
+                            error=traceback.format_exc(limit=3).strip()), slot
+
+
+class SharedRender:
+    """
+    One card from SharedRenderPool.render(). `image` is a read-only RGBA view
+    of the slot the worker drew into (None if the card failed); it stays valid
+    until release() hands the slot back for another card.
+    """
+
+    __slots__ = ("result", "image", "_free", "_slot")
+
+    def __init__(self, result, image, free=None, slot=None):
+        self.result = result
+        self.image = image
+        self._free = free
+        self._slot = slot
+
+    def release(self):
+        """Give the slot back; safe to call from any thread, and more than once"""
+        slot, self._slot = self._slot, None
+        self.image = None
+        if slot is not None:
+            self._free.put(slot)
+
+
+class SharedRenderPool:
+    """
+    Render workers that build cards straight into shared memory.
+
+    One multiprocessing.shared_memory slab holds `slots` card-sized RGBA
+    images. A worker draws a card into a free slot (CardBuilder.build(into=))
+    and sends back only (RenderResult, slot); the parent wraps the slot with
+    Image.frombuffer, so assembling an archive, sheet or atlas reads the
+    pixels the worker wrote instead of a pickled 4.8 MB copy.
+
+    Args:
+        back_path: Card back/frame image for CardBuilder
+        workers: Process count (default: CPU count, 1 = render in-process)
+        slots: Cards held in shared memory at once: rendering waits for a slot
+            when the consumer holds them all (default: 2 per worker, plus 2)
+        art_cache_dir: Optional on-disk store of art already fitted to the art window
+        frame_pack_dir: Optional directory of CardBuilder frame packs
+    """
+
+    def __init__(self, back_path, workers=None, slots=None, art_cache_dir=None, frame_pack_dir=None):
+        self.back_path = back_path
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots or self.workers * 2 + 2
+        self.art_cache_dir = art_cache_dir
+        self.frame_pack_dir = frame_pack_dir
+        self.card_size = None
+        self._slab = None
+        self._free = None
+        self._pool = None
+
+    def start(self):
+        """Create the slab and start the workers"""
+        if self._slab is not None:
+            return
+        with Image.open(self.back_path) as back:
+            self.card_size = back.size
+        width, height = self.card_size
+        self._slab = shared_memory.SharedMemory(create=True, size=self.slots * width * height * 4)
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        if self.workers == 1:
+            _init_worker(self.back_path, self.art_cache_dir, frame_pack_dir=self.frame_pack_dir)
+            _attach_slab(self._slab, self.card_size)
+        else:
+            if self.frame_pack_dir:
+                CardBuilder.cached(self.back_path, self.frame_pack_dir)
+            initargs = (self.back_path, self.art_cache_dir, self.frame_pack_dir, self._slab.name, self.card_size)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_shared_worker,
+                                             initargs=initargs)
+
+    def render(self, cards, art_dirs=None):
+        """
+        Yield a SharedRender per card, in order.
+
+        Release every image once done with it (from any thread): a card is only
+        submitted when a slot is free, so holding all of them stalls the render.
+        """
+        self.start()
+        cards = iter(cards)
+        if self._pool is None:
+            for card in cards:
+                result, slot = _render_into_slot((card, art_dirs, self._free.get()))
+                yield self._shared(result, slot)
+            return
+
+        pending = deque()
+        remaining = True
+        while remaining or pending:
+            # Top up the workers: without pending work, wait for the consumer to free a slot
+            while remaining:
+                try:
+                    slot = self._free.get(block=not pending)
+                except queue.Empty:
+                    break
+                card = next(cards, None)
+                if card is None:
+                    self._free.put(slot)
+                    remaining = False
+                    break
+                pending.append(self._pool.submit(_render_into_slot, (card, art_dirs, slot)))
+            if pending:
+                yield self._shared(*pending.popleft().result())
+
+    def _shared(self, result, slot):
+        if not result.ok:
+            self._free.put(slot)
+            return SharedRender(result, None)
+        return SharedRender(result, _slot_view(self._slab, slot, self.card_size), self._free, slot)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._slab is not None:
+            if _slab is self._slab:
+                _attach_slab(None, None)
+            try:
+                self._slab.close()
+            except BufferError:
+                # A caller still holds a view; the mapping goes away with it
+                pass
+            self._slab.unlink()
+            self._slab = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_all(cards, back_path, out_dir, workers=None, art_dirs=None, cache=None, art_cache_dir=None,
+               exporter=None, frame_pack_dir=None, trace=False, low_memory=False):
+    """
+    Render every card to <out_dir>/<id>.png.
+
+    Args:
+        cards: Card dicts as returned by card_data.load_cards
+        back_path: Card back/frame image for CardBuilder
+        out_dir: Output directory (created if missing)
+        workers: Process count (default: CPU count, 1 = render in-process)
+        art_dirs: Directories searched for <id>.png art
+        cache: Optional RenderCache; unchanged cards are skipped or copied from it
+        art_cache_dir: Optional on-disk store of art already fitted to the art window
+        exporter: Optional export.Exporter; every target is written from the
+            same render, and export settings are part of the incremental key
+        frame_pack_dir: Optional directory of CardBuilder frame packs, so
+            workers start without decoding the back image
+        trace: Record tracing spans per layer; each rendered result carries
+            its events in `result.trace` (see tracing.Tracer)
+        low_memory: Build into a canvas each worker reuses (CardBuilder.low_memory)
+            and keep fewer fitted art images in memory; output is identical
+
+    Yields:
+        RenderResult per card, in the same order as `cards`. status is
+        "rendered", "cached" (copied from the cache), "unchanged" (output
+        already current, not touched) or "failed".
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    if cache is None:
+        jobs = [(card, out_dir, art_dirs, None) for card in cards]
+        yield from _render_jobs(jobs, back_path, workers, art_cache_dir, exporter, frame_pack_dir, trace, low_memory)
+        return
+
+    manifest = OutputManifest(out_dir)
+    frame_digest = file_digest(back_path)
+    layout_version = CardBuilder.layout_version()
+    export_signature = exporter.signature() if exporter else None
+
+    # Decide up front which cards need rendering so the pool only sees real work
+    plan = []
+    jobs = []
+    for card in cards:
+        out_path = os.path.join(out_dir, f"{card['id']}.png")
+        start = time.perf_counter()
+        try:
+            key = card_key(card, find_art(card, art_dirs), frame_digest, layout_version)
+        except OSError as e:
+            plan.append((card, None, None, RenderResult(card["id"], error=f"{type(e).__name__}: {e}")))
+            continue
+
+        output_key = f"{key}:{export_signature}" if exporter else key
+        outputs = [out_path] + (exporter.paths(card["id"]) if exporter else [])
+        if manifest.is_current(card["id"], output_key, outputs):
+            result = RenderResult(card["id"], out_path, time.perf_counter() - start, status="unchanged")
+        else:
+            cached_path = cache.get(key)
+            if cached_path and not exporter:
+                shutil.copyfile(cached_path, out_path)
+                result = RenderResult(card["id"], out_path, time.perf_counter() - start, status="cached")
+            else:
+                result = None
+                jobs.append((card, out_dir, art_dirs, cached_path))
+        plan.append((card, key, output_key, result))
+
+    rendered = _render_jobs(jobs, back_path, workers, art_cache_dir, exporter, frame_pack_dir, trace, low_memory)
+    changed = False
+    for card, key, output_key, result in plan:
+        if result is None:
+            result = next(rendered)
+            if result.status == "rendered":
+                cache.put(key, result.path)
+        if key and result.status in ("rendered", "cached"):
+            manifest.keys[card["id"]] = output_key
+            changed = True
+        yield result
+
+    if changed:
+        manifest.save()
+        cache.evict()
@@ -0,0 +1,376 @@
+"""
+Card Pipeline Benchmark
+- Times CardBuilder startup, every build layer, PNG encoding and batch throughput
+- Compares handing rendered images to the parent pickled against shared memory
+- Checks that streamed low-memory renders encode the same bytes as plain builds
+- Runs offline: synthetic frame and art, cards from cards/basic_creatures.json
+- Writes the results as JSON and compares them against a stored baseline
+
+Usage:
+    python bench.py [--out bench.json] [--iterations 20] [--workers 1,2,4] [--batch-cards 48]
+    python bench.py --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json [--tolerance 0.15]
+
+With --baseline the exit code is 1 if any metric is more than --tolerance
+worse than the baseline. Baselines are machine specific: record one on the
+machine (and with the libraries) you compare on.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import PIL
+import batch
+import card_builder
+from art_loader import ArtLoader
+from batch import SharedRenderPool, render_all
+from bench_layers import synthetic_back
+from card_builder import CardBuilder
+from card_data import build_kwargs, load_cards
+from stream import build_many
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CARDS = os.path.join(REPO_ROOT, "cards", "basic_creatures.json")
+RESULTS_VERSION = 1
+
+
+def _timed(func, iterations, setup=None):
+    """Per-call seconds for `iterations` calls of func(setup())"""
+    samples = []
+    for _ in range(iterations):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _metric(samples, unit="s", better="lower"):
+    return {
+        "value": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "runs": len(samples),
+        "unit": unit,
+        "better": better,
+    }
+
+
+def _environment():
+    numpy_version = card_builder.np.__version__ if card_builder.np is not None else None
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def synthetic_art(path, size=(1536, 1024), seed=1):
+    synthetic_back(size, seed).convert("RGB").save(path)
+
+
+def bench_startup(back_path, pack_dir, iterations):
+    metrics = {"init.decode": _metric(_timed(lambda _: CardBuilder(back_path), iterations))}
+    CardBuilder.cached(back_path, pack_dir)
+    pack_path = CardBuilder.frame_pack_path(back_path, pack_dir)
+    metrics["init.frame_pack"] = _metric(_timed(lambda _: CardBuilder.from_frame_pack(pack_path), iterations))
+    return metrics
+
+
+def bench_layers(builder, card, art_path, iterations):
+    """Each build layer on its own, drawn onto a fresh canvas"""
+    blank = Image.new("RGBA", (builder.CARD_W, builder.CARD_H), builder.DARKER_BLUE)
+    kwargs = build_kwargs(card, builder, [os.path.dirname(art_path)])
+
+    def frames(canvas):
+        draw = ImageDraw.Draw(canvas)
+        for rect in (builder.name_rect, builder.art_rect, builder.text_rect):
+            builder._draw_zone_frame(draw, rect)
+        builder._draw_zone_frame(draw, builder.type_rect, thin=True)
+        builder._draw_decorations(draw)
+
+    def badges(canvas):
+        canvas = builder._draw_stat_badge(canvas, builder.stat_left_x, builder.stat_y, builder.stat_radius,
+                                          (150, 60, 60))
+        builder._draw_stat_badge(canvas, builder.stat_right_x, builder.stat_y, builder.stat_radius, (60, 90, 150))
+
+    def text(canvas):
+        builder._render_name(canvas, kwargs["card_name"])
+        builder._render_type(canvas, kwargs["card_type"])
+        builder._render_abilities(canvas, kwargs["abilities"], kwargs["flavor"])
+        builder._render_stats(canvas, kwargs["attack"], kwargs["defense"])
+
+    def clear_text_caches():
+        builder._glyph_runs.clear()
+        builder._text_bboxes.clear()
+        return builder.frame_template.copy()
+
+    def clear_art_cache():
+        builder.art_loader.clear()
+        return builder.frame_template.copy()
+
+    template = builder.frame_template.copy
+    layers = {
+        "base": (lambda _: builder._draw_base(), None),
+        "border": (lambda canvas: builder._draw_clean_border(ImageDraw.Draw(canvas)), blank.copy),
+        "edge_strips": (builder._apply_edge_strips, blank.copy),
+        "zone_fills": (lambda canvas: [builder._draw_zone_fill(canvas, rect) for rect in
+                                       (builder.name_rect, builder.art_rect, builder.type_rect, builder.text_rect)],
+                       blank.copy),
+        "zone_frames": (frames, blank.copy),
+        "badges": (badges, blank.copy),
+        "template": (lambda _: builder._compile_frame_template(), None),
+        "art.cold": (lambda canvas: builder._place_art(canvas, art_path), clear_art_cache),
+        "art.warm": (lambda canvas: builder._place_art(canvas, art_path), template),
+        "text.cold": (text, clear_text_caches),
+        "text.warm": (text, template),
+    }
+    return {f"layer.{name}": _metric(_timed(func, iterations, setup)) for name, (func, setup) in layers.items()}
+
+
+def check_stream(back_path, cards, art_dir):
+    """
+    build_many with a low-memory builder must encode every card from its own
+    pixels: compare, in order, against encoding separate build() results
+    """
+    builder = CardBuilder(back_path, ArtLoader())
+    expected = []
+    for card in cards:
+        buffer = io.BytesIO()
+        builder.build(**build_kwargs(card, builder, [art_dir])).convert("RGB").save(buffer, "PNG")
+        expected.append((card["id"], buffer.getvalue()))
+
+    builder.low_memory = True
+    results = list(build_many(builder, cards, None, "png", [art_dir], max_pending=4, encode_threads=2))
+    mismatched = [card_id for (card_id, data), result in zip(expected, results)
+                  if result.card_id != card_id or result.data != data]
+    if len(results) != len(expected) or mismatched:
+        raise RuntimeError(f"build_many with low_memory encoded the wrong pixels for: {', '.join(mismatched)}")
+
+
+def bench_build(builder, cards, art_dir, iterations):
+    """Whole build() per card, a stats-only update of it and PNG encoding of the result"""
+    build_samples = []
+    update_samples = []
+    encode_samples = []
+    encoded_sizes = []
+    for _ in range(iterations):
+        for index, card in enumerate(cards):
+            kwargs = build_kwargs(card, builder, [art_dir])
+            start = time.perf_counter()
+            image = builder.build(**kwargs)
+            build_samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            builder.update_stats(image, index % 10, index % 7 + 1)
+            update_samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, "PNG")
+            encode_samples.append(time.perf_counter() - start)
+            encoded_sizes.append(buffer.tell())
+    return {
+        "build": _metric(build_samples),
+        "update_stats": _metric(update_samples),
+        "encode.png": _metric(encode_samples),
+        "encode.png_bytes": _metric(encoded_sizes, unit="bytes"),
+    }
+
+
+def bench_batch(cards, back_path, art_dir, workers_list, batch_cards, tmp):
+    """render_all throughput (uncached) at each worker count"""
+    jobs = []
+    for index in range(batch_cards):
+        card = cards[index % len(cards)]
+        job = dict(card, id=f"{card['id']}_{index}")
+        shutil.copyfile(os.path.join(art_dir, f"{card['id']}.png"), os.path.join(art_dir, f"{job['id']}.png"))
+        jobs.append(job)
+
+    metrics = {}
+    for workers in workers_list:
+        out_dir = os.path.join(tmp, f"batch_{workers}")
+        start = time.perf_counter()
+        failed = [r for r in render_all(jobs, back_path, out_dir, workers, [art_dir]) if not r.ok]
+        elapsed = time.perf_counter() - start
+        if failed:
+            raise RuntimeError(f"{len(failed)} card(s) failed in the batch run:\n{failed[0].error}")
+        metrics[f"batch.workers_{workers}"] = _metric([len(jobs) / elapsed], unit="cards/s", better="higher")
+    return metrics
+
+
+def _build_pickled(job):
+    """Worker side of the pickled baseline: the whole image is sent back"""
+    card, art_dirs = job
+    return batch._builder.build(**build_kwargs(card, batch._builder, art_dirs))
+
+
+def bench_transfer(cards, back_path, art_dir, workers_list, batch_cards):
+    """Cards/s delivered as images to the parent: pickled back from the workers vs. SharedRenderPool"""
+    jobs = [cards[index % len(cards)] for index in range(batch_cards)]
+    metrics = {}
+    for workers in workers_list:
+        if workers == 1:
+            continue
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=batch._init_worker,
+                                 initargs=(back_path,)) as pool:
+            for image in pool.map(_build_pickled, [(card, [art_dir]) for card in jobs]):
+                image.getpixel((0, 0))
+        metrics[f"transfer.pickled_workers_{workers}"] = _metric([len(jobs) / (time.perf_counter() - start)],
+                                                                 unit="cards/s", better="higher")
+
+        start = time.perf_counter()
+        with SharedRenderPool(back_path, workers) as pool:
+            for render in pool.render(jobs, [art_dir]):
+                if not render.result.ok:
+                    raise RuntimeError(f"{render.result.card_id} failed in the transfer run:\n{render.result.error}")
+                render.image.getpixel((0, 0))
+                render.release()
+        metrics[f"transfer.shared_workers_{workers}"] = _metric([len(jobs) / (time.perf_counter() - start)],
+                                                                unit="cards/s", better="higher")
+    return metrics
+
+
+def run(cards_path, iterations, workers_list, batch_cards):
+    cards = load_cards(cards_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        back_path = os.path.join(tmp, "back.png")
+        synthetic_back().save(back_path)
+        art_dir = os.path.join(tmp, "art")
+        os.makedirs(art_dir)
+        art_path = os.path.join(art_dir, "synthetic.png")
+        synthetic_art(art_path)
+        for card in cards:
+            shutil.copyfile(art_path, os.path.join(art_dir, f"{card['id']}.png"))
+
+        builder = CardBuilder(back_path, ArtLoader())
+        metrics = {}
+        metrics.update(bench_startup(back_path, os.path.join(tmp, "frames"), iterations))
+        metrics.update(bench_layers(builder, cards[0], os.path.join(art_dir, f"{cards[0]['id']}.png"),
+                                    iterations))
+        metrics.update(bench_build(builder, cards, art_dir, max(1, iterations // 5)))
+        check_stream(back_path, cards, art_dir)
+        metrics.update(bench_batch(cards, back_path, art_dir, workers_list, batch_cards, tmp))
+        metrics.update(bench_transfer(cards, back_path, art_dir, workers_list, batch_cards))
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "settings": {"cards": os.path.relpath(cards_path, REPO_ROOT), "iterations": iterations,
+                     "batch_cards": batch_cards},
+        "metrics": metrics,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """(rows, regressions): change per metric; regressions are worse than tolerance"""
+    rows = []
+    regressions = []
+    for name, metric in sorted(results["metrics"].items()):
+        base = baseline["metrics"].get(name)
+        if base is None or not base["value"]:
+            rows.append((name, metric, None, None))
+            continue
+        # Positive change = worse, whichever direction the metric improves in
+        if metric["better"] == "lower":
+            change = metric["value"] / base["value"] - 1
+        else:
+            change = base["value"] / metric["value"] - 1 if metric["value"] else float("inf")
+        rows.append((name, metric, base, change))
+        if change > tolerance and metric["unit"] != "bytes":
+            regressions.append(name)
+    return rows, regressions
+
+
+def _format(metric):
+    value = metric["value"]
+    if metric["unit"] == "s":
+        return f"{value * 1000:.2f} ms"
+    if metric["unit"] == "bytes":
+        return f"{value / 1024:.1f} KB"
+    return f"{value:.1f} {metric['unit']}"
+
+
+def print_results(results, baseline=None, tolerance=0.15):
+    if baseline is None:
+        for name, metric in sorted(results["metrics"].items()):
+            print(f"  {name:<24}{_format(metric):>16}")
+        return []
+
+    if baseline.get("environment") != results["environment"]:
+        print("  Note: baseline was recorded in a different environment:")
+        for key, value in sorted(results["environment"].items()):
+            old = baseline.get("environment", {}).get(key)
+            if old != value:
+                print(f"    {key}: {old} -> {value}")
+
+    rows, regressions = compare(results, baseline, tolerance)
+    print(f"  {'metric':<24}{'baseline':>16}{'now':>16}{'change':>10}")
+    for name, metric, base, change in rows:
+        if base is None:
+            print(f"  {name:<24}{'-':>16}{_format(metric):>16}{'new':>10}")
+            continue
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"  {name:<24}{_format(base):>16}{_format(metric):>16}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the card rendering pipeline",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--cards", default=DEFAULT_CARDS, help="Card source (default: cards/basic_creatures.json)")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per timed step")
+    parser.add_argument("--workers", default=None,
+                        help="Comma-separated worker counts for the batch run (default: 1, 2, 4, ... up to CPU count)")
+    parser.add_argument("--batch-cards", type=int, default=48, help="Cards rendered per batch run")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results JSON as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed slowdown before a metric counts as a regression (default: 0.15)")
+    args = parser.parse_args()
+
+    if args.workers:
+        workers_list = [int(w) for w in args.workers.split(",")]
+    else:
+        workers_list = [1]
+        while workers_list[-1] * 2 <= (os.cpu_count() or 1):
+            workers_list.append(workers_list[-1] * 2)
+
+    print(f"Benchmarking {args.cards} ({args.iterations} iterations, workers {workers_list})")
+    results = run(args.cards, args.iterations, workers_list, args.batch_cards)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=1, sort_keys=True)
+            print(f"Wrote {path}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = print_results(results, baseline, args.tolerance)
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Layer Benchmark - NumPy vs PIL drawing paths
+- Times zone gradients, art inner shadow and stat badge tint/mask
+- "cold" includes building the cached arrays, "warm" reuses them
+- Reports the speedup per layer and how far the outputs drift apart
+
+Usage:
+    python bench_layers.py [--back card_back.png] [--iterations 50]
+
+Without --back a synthetic 896x1344 frame is generated, so the benchmark
+runs offline.
+"""
+
+from PIL import Image, ImageChops
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import card_builder
+from card_builder import CardBuilder
+
+
+def synthetic_back(size=(896, 1344), seed=0):
+    """Noise image standing in for the real card back"""
+    rng = random.Random(seed)
+    data = bytes(rng.randrange(256) for _ in range(64 * 64 * 3))
+    tile = Image.frombytes("RGB", (64, 64), data)
+    return tile.resize(size, Image.BICUBIC).convert("RGBA")
+
+
+def _diff(a, b):
+    """(max abs diff, mean abs diff, fraction of pixels that differ)"""
+    diff = ImageChops.difference(a, b)
+    histogram = diff.histogram()
+    bands = len(diff.getbands())
+    total = 0
+    max_diff = 0
+    for band in range(bands):
+        counts = histogram[band * 256:(band + 1) * 256]
+        total += sum(value * count for value, count in enumerate(counts))
+        max_diff = max([max_diff] + [value for value, count in enumerate(counts) if count])
+    changed = diff.convert("L").point(lambda v: 255 if v else 0).histogram()[255]
+    pixels = a.width * a.height
+    return max_diff, total / (pixels * bands), changed / pixels
+
+
+def _blank(builder):
+    return Image.new("RGBA", (builder.CARD_W, builder.CARD_H), builder.DARKER_BLUE)
+
+
+def _zone_fills(builder, card):
+    for rect in (builder.name_rect, builder.art_rect, builder.type_rect, builder.text_rect):
+        builder._draw_zone_fill(card, rect)
+    return card
+
+
+def _art_shadow(builder, card):
+    x1, y1, x2, y2 = builder.art_rect
+    builder._draw_art_shadow(card, x1 + 6, y1 + 6, x2 - x1 - 12, y2 - y1 - 12)
+    return card
+
+
+def _stat_badges(builder, card):
+    card = builder._draw_stat_badge(card, builder.stat_left_x, builder.stat_y, builder.stat_radius, (150, 60, 60))
+    return builder._draw_stat_badge(card, builder.stat_right_x, builder.stat_y, builder.stat_radius, (60, 90, 150))
+
+
+def _measure(builder, layer, iterations, cold):
+    """Average seconds per call, drawing onto a fresh blank card each time"""
+    canvas = _blank(builder)
+    total = 0.0
+    for _ in range(iterations):
+        if cold:
+            builder._shadow_cache.clear()
+            builder._mask_cache.clear()
+        card = canvas.copy()
+        start = time.perf_counter()
+        layer(builder, card)
+        total += time.perf_counter() - start
+    return total / iterations, card
+
+
+def run(back_path, iterations):
+    """Benchmark each layer with NumPy enabled and disabled"""
+    if card_builder.np is None:
+        raise SystemExit("NumPy is not installed; nothing to compare against")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if back_path is None:
+            back_path = os.path.join(tmp, "back.png")
+            synthetic_back().save(back_path)
+        builder = CardBuilder(back_path)
+
+    layers = [
+        ("zone fills", _zone_fills),
+        ("art shadow", _art_shadow),
+        ("stat badges", _stat_badges),
+    ]
+
+    numpy_module = card_builder.np
+    print(f"{'layer':<14}{'PIL ms':>9}{'cold ms':>9}{'warm ms':>9}{'speedup':>9}"
+          "   max / mean diff, pixels changed")
+    for name, layer in layers:
+        try:
+            card_builder.np = None
+            pil_time, pil_out = _measure(builder, layer, iterations, cold=True)
+        finally:
+            card_builder.np = numpy_module
+        cold_time, _ = _measure(builder, layer, iterations, cold=True)
+        warm_time, np_out = _measure(builder, layer, iterations, cold=False)
+
+        max_diff, mean_diff, changed = _diff(pil_out, np_out)
+        print(f"{name:<14}{pil_time * 1000:>9.3f}{cold_time * 1000:>9.3f}{warm_time * 1000:>9.3f}"
+              f"{pil_time / warm_time:>8.1f}x   {max_diff} / {mean_diff:.4f}, {changed:.4%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NumPy vs PIL card layers")
+    parser.add_argument("--back", help="Card back/frame image (default: synthetic)")
+    parser.add_argument("--iterations", type=int, default=50, help="Runs per layer")
+    args = parser.parse_args()
+    run(args.back, args.iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
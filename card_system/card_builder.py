@@ -7,18 +7,104 @@ Card Frame System v5 - Production Ready
 - Cleaner text color hierarchy
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageEnhance
+from art_loader import ArtLoader, FIT_VERSION
+from tracing import NO_TRACE
+import fonts
+import hashlib
+import json
 import math
+import os
 import re
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-PIL drawing paths are used instead
+    np = None
+
+# "Keyword —" or "Keyword:" at the start of an ability line
+KEYWORD_PATTERN = re.compile(r'^([A-Z][a-zA-Z]*(?:\s[A-Z][a-zA-Z]*)?)\s*([—:\-–])\s*')
+
+# Frame pack: everything CardBuilder derives from the back image, stored raw
+FRAME_PACK_MAGIC = b"CARDFRAMEPACK\n"
+FRAME_PACK_VERSION = 1
+FRAME_PACK_IMAGES = ("back", "texture", "gem_source", "top_edge", "bottom_edge", "left_edge", "right_edge",
+                     "frame_template")
+FRAME_PACK_ZONES = ("name_height", "name_rect", "art_height", "art_rect", "type_height", "type_rect",
+                    "text_height", "text_rect", "stat_y", "stat_radius", "stat_left_x", "stat_right_x")
 
 class CardBuilder:
-    def __init__(self, back_image_path):
+    # Bump whenever drawing code changes in a way the constants below don't capture
+    RENDER_VERSION = 6
+    
+    # === BOUNDARIES ===
+    BORDER_THICKNESS = 35
+    ZONE_GAP = 8
+    
+    # === ZONE PROPORTIONS ===
+    NAME_RATIO = 0.08
+    ART_RATIO = 0.44
+    TYPE_RATIO = 0.05
+    TEXT_RATIO = 0.31
+    STAT_RATIO = 0.12
+    
+    # === COLORS ===
+    DARKER_BLUE = (18, 32, 42)
+    DEEP_TEAL = (38, 58, 66)
+    BRONZE = (165, 130, 85)
+    BRONZE_LIGHT = (195, 165, 115)
+    BRONZE_DARK = (120, 90, 55)
+    GEM_BLUE = (55, 95, 110)
+    
+    # Text colors - clear hierarchy
+    COLOR_NAME = (225, 195, 135)       # Bright gold for title
+    COLOR_TYPE = (170, 150, 115)       # Muted bronze for type
+    COLOR_ABILITY = (225, 220, 205)    # Warm white for abilities
+    COLOR_KEYWORD = (240, 210, 150)    # Highlighted gold for keywords
+    COLOR_FLAVOR = (95, 145, 155)      # Teal for flavor
+    COLOR_STAT_ATK = (255, 235, 215)   # Warm white for attack
+    COLOR_STAT_DEF = (215, 235, 255)   # Cool white for defense
+    
+    # === FONT FILES (found on the font registry's search paths) ===
+    FONT_FILE_SERIF = "DejaVuSerif.ttf"
+    FONT_FILE_SERIF_BOLD = "DejaVuSerif-Bold.ttf"
+    FONT_FILE_SERIF_ITALIC = "DejaVuSerif-Italic.ttf"
+    FONT_FILE_SANS_BOLD = "DejaVuSans-Bold.ttf"
+    
+    # === BASE FONT SIZES ===
+    FONT_NAME = 54
+    FONT_TYPE = 28
+    FONT_BODY = 32
+    FONT_KEYWORD = 32
+    FONT_FLAVOR = 24
+    FONT_STAT = 50
+    
+    # === TEXT LAYOUT ===
+    TEXT_H_PADDING = 20
+    ABILITY_LINE_SPACING = 42
+    FLAVOR_LINE_SPACING = 32
+    FLAVOR_BOTTOM_MARGIN = 20
+    
+    # Rasterized text runs kept per builder (stat numbers, keywords, recurring lines)
+    GLYPH_RUN_CACHE_SIZE = 1024
+    
+    def __init__(self, back_image_path, art_loader=None, font_registry=None):
         self.back = Image.open(back_image_path).convert("RGBA")
-        self.CARD_W, self.CARD_H = self.back.size
+        self._setup(self.back.size, art_loader, font_registry)
         
-        # === BOUNDARIES ===
-        self.BORDER_THICKNESS = 35
+        self._extract_minimal_elements()
+        self._calculate_zones()
         
+        # Everything except art and text is identical for every card
+        self.frame_template = self._compile_frame_template()
+    
+    def _setup(self, size, art_loader, font_registry):
+        """Size-derived bounds, fonts and per-builder caches (shared by __init__ and frame packs)"""
+        self.CARD_W, self.CARD_H = size
+        
+        # === BOUNDARIES ===
         self.CONTENT_LEFT = self.BORDER_THICKNESS
         self.CONTENT_RIGHT = self.CARD_W - self.BORDER_THICKNESS
         self.CONTENT_TOP = self.BORDER_THICKNESS
@@ -26,65 +112,116 @@ class CardBuilder:
         self.CONTENT_WIDTH = self.CONTENT_RIGHT - self.CONTENT_LEFT
         self.CONTENT_HEIGHT = self.CONTENT_BOTTOM - self.CONTENT_TOP
         
-        self.ZONE_GAP = 8
-        
-        # === ZONE PROPORTIONS ===
-        self.NAME_RATIO = 0.08
-        self.ART_RATIO = 0.44
-        self.TYPE_RATIO = 0.05
-        self.TEXT_RATIO = 0.31
-        self.STAT_RATIO = 0.12
-        
-        # === COLORS ===
-        self.DARKER_BLUE = (18, 32, 42)
-        self.DEEP_TEAL = (38, 58, 66)
-        self.BRONZE = (165, 130, 85)
-        self.BRONZE_LIGHT = (195, 165, 115)
-        self.BRONZE_DARK = (120, 90, 55)
-        self.GEM_BLUE = (55, 95, 110)
-        
-        # Text colors - clear hierarchy
-        self.COLOR_NAME = (225, 195, 135)       # Bright gold for title
-        self.COLOR_TYPE = (170, 150, 115)       # Muted bronze for type
-        self.COLOR_ABILITY = (225, 220, 205)    # Warm white for abilities
-        self.COLOR_KEYWORD = (240, 210, 150)    # Highlighted gold for keywords
-        self.COLOR_FLAVOR = (95, 145, 155)      # Teal for flavor
-        self.COLOR_STAT_ATK = (255, 235, 215)   # Warm white for attack
-        self.COLOR_STAT_DEF = (215, 235, 255)   # Cool white for defense
-        
-        # === BASE FONT SIZES ===
-        self.FONT_NAME = 54
-        self.FONT_TYPE = 28
-        self.FONT_BODY = 32
-        self.FONT_KEYWORD = 32
-        self.FONT_FLAVOR = 24
-        self.FONT_STAT = 50
-        
-        # === TEXT LAYOUT ===
-        self.TEXT_H_PADDING = 20
-        self.ABILITY_LINE_SPACING = 42
-        self.FLAVOR_LINE_SPACING = 32
-        self.FLAVOR_BOTTOM_MARGIN = 20
-        
         # === LOAD FONTS ===
-        self._load_fonts()
-        
-        self._extract_minimal_elements()
-        self._calculate_zones()
+        self._load_fonts(font_registry or fonts.registry)
+        
+        self._shadow_cache = {}
+        self._mask_cache = {}
+        self._clean_regions = {}
+        self.art_loader = art_loader or ArtLoader()
+        
+        # Text measurement and raster caches, shared by every build
+        self._measure_draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        self._text_bboxes = {}
+        self._glyph_runs = OrderedDict()
+        
+        # Optional tracing.Tracer; when set, build() records a span per layer
+        self.tracer = None
+        
+        # Low-memory mode (see build): one RGB canvas reused by every build,
+        # restored from an RGB copy of the template only where the last card drew
+        self.low_memory = False
+        self._canvas = None
+        self._canvas_template = None
+        self._dirty = []
+    
+    @classmethod
+    def layout_version(cls):
+        """Short hash of every layout constant and the art loader's FIT_VERSION; changes whenever either does"""
+        constants = {name: value for name, value in vars(cls).items() if name.isupper()}
+        constants["FIT_VERSION"] = FIT_VERSION
+        return hashlib.sha256(repr(sorted(constants.items())).encode()).hexdigest()[:16]
+    
+    def _load_fonts(self, registry):
+        """Load all fonts through the shared registry (missing files fall back with a warning)"""
+        self.font_name = registry.get(self.FONT_FILE_SERIF_BOLD, self.FONT_NAME)
+        self.font_type = registry.get(self.FONT_FILE_SERIF, self.FONT_TYPE)
+        self.font_body = registry.get(self.FONT_FILE_SERIF, self.FONT_BODY)
+        self.font_keyword = registry.get(self.FONT_FILE_SERIF_BOLD, self.FONT_KEYWORD)
+        self.font_flavor = registry.get(self.FONT_FILE_SERIF_ITALIC, self.FONT_FLAVOR)
+        self.font_stat = registry.get(self.FONT_FILE_SANS_BOLD, self.FONT_STAT)
     
-    def _load_fonts(self):
-        """Load all fonts with fallbacks"""
+    # === FRAME PACKS ===
+    
+    @classmethod
+    def frame_pack_path(cls, back_image_path, pack_dir):
+        """Pack file for this back image and layout; any change to either gives a new name"""
+        stat = os.stat(back_image_path)
+        stamp = (FRAME_PACK_VERSION, os.path.abspath(back_image_path), stat.st_size, stat.st_mtime_ns,
+                 cls.layout_version())
+        name = hashlib.sha1(repr(stamp).encode()).hexdigest()[:20]
+        return os.path.join(pack_dir, f"frame_{name}.pack")
+    
+    def save_frame_pack(self, path):
+        """Write the decoded back, its crops, the zones and the frame template to `path`"""
+        images = []
+        blobs = []
+        offset = 0
+        for name in FRAME_PACK_IMAGES:
+            image = getattr(self, name)
+            data = image.tobytes()
+            images.append([name, image.mode, image.width, image.height, offset, len(data)])
+            blobs.append(data)
+            offset += len(data)
+        header = json.dumps({
+            "version": FRAME_PACK_VERSION,
+            "layout": self.layout_version(),
+            "size": [self.CARD_W, self.CARD_H],
+            "zones": {name: getattr(self, name) for name in FRAME_PACK_ZONES},
+            "images": images,
+        }).encode()
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(FRAME_PACK_MAGIC + struct.pack("<I", len(header)) + header)
+            for data in blobs:
+                f.write(data)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def from_frame_pack(cls, path, art_loader=None, font_registry=None):
+        """Builder restored from a frame pack, without decoding the back image; ValueError if stale"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(FRAME_PACK_MAGIC):
+            raise ValueError(f"{path} is not a frame pack")
+        start = len(FRAME_PACK_MAGIC) + 4
+        (header_len,) = struct.unpack_from("<I", data, len(FRAME_PACK_MAGIC))
+        header = json.loads(data[start:start + header_len])
+        if header["version"] != FRAME_PACK_VERSION or header["layout"] != cls.layout_version():
+            raise ValueError(f"{path} was built for a different layout")
+        
+        builder = cls.__new__(cls)
+        builder._setup(tuple(header["size"]), art_loader, font_registry)
+        for name, value in header["zones"].items():
+            setattr(builder, name, value)
+        blobs = memoryview(data)[start + header_len:]
+        for name, mode, width, height, offset, length in header["images"]:
+            setattr(builder, name, Image.frombuffer(mode, (width, height), blobs[offset:offset + length],
+                                                    "raw", mode, 0, 1))
+        return builder
+    
+    @classmethod
+    def cached(cls, back_image_path, pack_dir, art_loader=None, font_registry=None):
+        """Builder from the frame pack in `pack_dir`, building and saving the pack if needed"""
+        path = cls.frame_pack_path(back_image_path, pack_dir)
         try:
-            self.font_name = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf", self.FONT_NAME)
-            self.font_type = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf", self.FONT_TYPE)
-            self.font_body = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf", self.FONT_BODY)
-            self.font_keyword = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf", self.FONT_KEYWORD)
-            self.font_flavor = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSerif-Italic.ttf", self.FONT_FLAVOR)
-            self.font_stat = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", self.FONT_STAT)
-        except:
-            default = ImageFont.load_default()
-            self.font_name = self.font_type = self.font_body = default
-            self.font_keyword = self.font_flavor = self.font_stat = default
+            return cls.from_frame_pack(path, art_loader, font_registry)
+        except (OSError, ValueError, KeyError):
+            builder = cls(back_image_path, art_loader, font_registry)
+            builder.save_frame_pack(path)
+            return builder
     
     def _extract_minimal_elements(self):
         """Extract texture, gem, and edge strips from back"""
@@ -125,25 +262,10 @@ class CardBuilder:
         self.stat_left_x = self.CONTENT_LEFT + 70
         self.stat_right_x = self.CONTENT_RIGHT - 70
     
-    def build(self, art_image_path=None, card_name="", card_type="", abilities=None, flavor=None, attack="", defense=""):
-        """Build the complete card"""
-        # Normalize inputs
-        abilities = abilities or []
-        flavor = flavor or []
-        if isinstance(flavor, str):
-            flavor = [flavor]
-        
+    def _compile_frame_template(self):
+        """Render all card-independent layers (everything but art and text)"""
         # === LAYER 1: Base with texture ===
-        card = Image.new("RGBA", (self.CARD_W, self.CARD_H), self.DARKER_BLUE)
-        
-        texture_dark = ImageEnhance.Brightness(self.texture.resize((200, 200))).enhance(0.3)
-        for x in range(0, self.CARD_W, 200):
-            for y in range(0, self.CARD_H, 200):
-                card.paste(texture_dark, (x, y))
-        
-        overlay = Image.new("RGBA", (self.CARD_W, self.CARD_H), (*self.DARKER_BLUE, 190))
-        card = Image.alpha_composite(card, overlay)
-        
+        card = self._draw_base()
         draw = ImageDraw.Draw(card)
         
         # === LAYER 2: Border ===
@@ -154,15 +276,14 @@ class CardBuilder:
         draw = ImageDraw.Draw(card)
         
         # === LAYER 4: Zone fills ===
-        self._draw_zone_fill(draw, self.name_rect)
-        self._draw_zone_fill(draw, self.art_rect)
-        self._draw_zone_fill(draw, self.type_rect)
-        self._draw_zone_fill(draw, self.text_rect)
+        self._draw_zone_fill(card, self.name_rect)
+        self._draw_zone_fill(card, self.art_rect)
+        self._draw_zone_fill(card, self.type_rect)
+        self._draw_zone_fill(card, self.text_rect)
         
-        # === LAYER 5: Art ===
-        if art_image_path:
-            card = self._place_art(card, art_image_path)
-            draw = ImageDraw.Draw(card)
+        # Layer 5 (art) only ever touches the inside of the art window,
+        # which none of the layers below draw into, so it can be pasted
+        # onto a copy of the finished template without changing the output.
         
         # === LAYER 6: Zone frames ===
         self._draw_zone_frame(draw, self.name_rect)
@@ -176,18 +297,87 @@ class CardBuilder:
         # === LAYER 8: Stat badges ===
         card = self._draw_stat_badge(card, self.stat_left_x, self.stat_y, self.stat_radius, (150, 60, 60))
         card = self._draw_stat_badge(card, self.stat_right_x, self.stat_y, self.stat_radius, (60, 90, 150))
-        draw = ImageDraw.Draw(card)
         
-        # === LAYER 9: Text ===
-        self._render_name(draw, card_name)
-        self._render_type(draw, card_type)
-        self._render_abilities(draw, abilities, flavor)
-        self._render_stats(draw, attack, defense)
+        return card
+    
+    def build(self, art_image_path=None, card_name="", card_type="", abilities=None, flavor=None, attack="", defense="",
+              into=None):
+        """
+        Build the complete card.
+        
+        Returns a new RGBA image, or with `low_memory` set, the builder's RGB
+        canvas: the same pixels as build(...).convert("RGB") without allocating
+        a card-sized image per build, but overwritten by the next build().
+        
+        With `into`, a writable card-sized RGBA image (such as a view of shared
+        memory), the card is drawn into it instead and it is returned.
+        """
+        # Normalize inputs
+        abilities = abilities or []
+        flavor = flavor or []
+        if isinstance(flavor, str):
+            flavor = [flavor]
+        
+        with self._trace("build", card=card_name):
+            # === LAYERS 1-4, 6-8: Precompiled frame ===
+            with self._trace("template"):
+                if into is not None:
+                    into.paste(self.frame_template)
+                    card = into
+                elif self.low_memory:
+                    card = self._reuse_canvas()
+                else:
+                    card = self.frame_template.copy()
+            
+            # === LAYER 5: Art ===
+            if art_image_path:
+                with self._trace("art"):
+                    card = self._place_art(card, art_image_path)
+            
+            # === LAYER 9: Text ===
+            with self._trace("text.name"):
+                self._render_name(card, card_name)
+            with self._trace("text.type"):
+                self._render_type(card, card_type)
+            with self._trace("text.abilities"):
+                self._render_abilities(card, abilities, flavor)
+            with self._trace("text.stats"):
+                self._render_stats(card, attack, defense)
         
         return card
     
+    def _trace(self, name, **args):
+        """Tracer span, or a no-op context when tracing is off"""
+        return self.tracer.span(name, **args) if self.tracer else NO_TRACE
+    
+    def _reuse_canvas(self):
+        """The low-memory canvas, with the regions the previous build drew on put back to the template"""
+        if self._canvas is None:
+            # Every layer after the template either replaces pixels or blends
+            # through a mask, so drawing on RGB matches drawing on RGBA and
+            # dropping alpha afterwards
+            self._canvas_template = self.frame_template.convert("RGB")
+            self._canvas = self._canvas_template.copy()
+        else:
+            for box in self._dirty:
+                self._canvas.paste(self._canvas_template.crop(box), box[:2])
+        self._dirty = []
+        return self._canvas
+    
     # === BORDER AND FRAME METHODS ===
     
+    def _draw_base(self):
+        """Dark base with the back's texture tiled underneath"""
+        card = Image.new("RGBA", (self.CARD_W, self.CARD_H), self.DARKER_BLUE)
+        
+        texture_dark = ImageEnhance.Brightness(self.texture.resize((200, 200))).enhance(0.3)
+        for x in range(0, self.CARD_W, 200):
+            for y in range(0, self.CARD_H, 200):
+                card.paste(texture_dark, (x, y))
+        
+        overlay = Image.new("RGBA", (self.CARD_W, self.CARD_H), (*self.DARKER_BLUE, 190))
+        return Image.alpha_composite(card, overlay)
+    
     def _draw_clean_border(self, draw):
         """Simple clean border"""
         draw.rectangle([0, 0, self.CARD_W-1, self.CARD_H-1], outline=self.BRONZE_DARK, width=4)
@@ -242,10 +432,24 @@ class CardBuilder:
         
         return card
     
-    def _draw_zone_fill(self, draw, rect):
+    def _draw_zone_fill(self, card, rect):
         """Gradient fill for a zone"""
         x1, y1, x2, y2 = rect
         height = y2 - y1
+        if np is not None:
+            # Same per-row formula as below, evaluated for all rows at once
+            # into a 1px column that is then stretched across the zone
+            curve = np.sin(np.arange(height) / height * np.pi)[:, None]
+            dark = np.array(self.DARKER_BLUE, dtype=np.float64)
+            teal = np.array(self.DEEP_TEAL, dtype=np.float64)
+            column = np.empty((height, 1, 4), dtype=np.uint8)
+            column[:, 0, :3] = dark + (teal - dark) * curve * 0.4
+            column[..., 3] = 255
+            fill = Image.fromarray(column).resize((x2 - x1 + 1, height), Image.NEAREST)
+            card.paste(fill, (x1, y1))
+            return
+        
+        draw = ImageDraw.Draw(card)
         for i in range(height):
             progress = i / height
             curve = math.sin(progress * math.pi)
@@ -264,40 +468,63 @@ class CardBuilder:
     
     def _place_art(self, card, art_path):
         """Place artwork in art zone"""
-        art = Image.open(art_path).convert("RGBA")
-        
         padding = 6
         art_x = self.art_rect[0] + padding
         art_y = self.art_rect[1] + padding
         art_w = self.art_rect[2] - self.art_rect[0] - padding * 2
         art_h = self.art_rect[3] - self.art_rect[1] - padding * 2
         
-        # Scale and crop to fit
-        art_ratio = art.width / art.height
-        window_ratio = art_w / art_h
-        
-        if art_ratio > window_ratio:
-            new_h = art_h
-            new_w = int(art_h * art_ratio)
-        else:
-            new_w = art_w
-            new_h = int(art_w / art_ratio)
+        # Scaled and cropped to fit, cached across builds
+        with self._trace("art.load"):
+            art_cropped = self.art_loader.load(art_path, (art_w, art_h))
         
-        art_resized = art.resize((new_w, new_h), Image.LANCZOS)
-        crop_x = (new_w - art_w) // 2
-        crop_y = (new_h - art_h) // 2
-        art_cropped = art_resized.crop((crop_x, crop_y, crop_x + art_w, crop_y + art_h))
+        with self._trace("art.composite"):
+            if self.low_memory:
+                self._dirty.append((art_x, art_y, art_x + art_w + 1, art_y + art_h + 1))
+            card.paste(art_cropped, (art_x, art_y))
+            self._draw_art_shadow(card, art_x, art_y, art_w, art_h)
         
-        card.paste(art_cropped, (art_x, art_y))
+        return card
+    
+    def _draw_art_shadow(self, card, art_x, art_y, art_w, art_h, depth=10):
+        """Inner shadow: rings of fading black along the art window edge"""
+        if np is not None:
+            for band, offset in self._art_shadow_bands(art_w + 1, art_h + 1, depth):
+                card.paste(band, (art_x + offset[0], art_y + offset[1]))
+            return
         
-        # Inner shadow
         draw = ImageDraw.Draw(card)
-        for i in range(10):
-            alpha = int(80 * (1 - i/10))
+        for i in range(depth):
+            alpha = int(80 * (1 - i/depth))
             draw.rectangle([art_x + i, art_y + i, art_x + art_w - i, art_y + art_h - i], 
                            outline=(0, 0, 0, alpha))
-        
-        return card
+    
+    def _art_shadow_bands(self, width, height, depth):
+        """Shadow ring cut into four solid edge bands, cached per window size (NumPy path)"""
+        key = (width, height, depth)
+        if key not in self._shadow_cache:
+            xs = np.arange(width)
+            ys = np.arange(height)
+            dist_x = np.minimum(xs, width - 1 - xs)
+            dist_y = np.minimum(ys, height - 1 - ys)
+            dist = np.minimum(dist_x[None, :], dist_y[:, None])
+            
+            ring = np.zeros((height, width, 4), dtype=np.uint8)
+            ring[..., 3] = (80 * (1 - np.minimum(dist, depth) / depth)).astype(np.uint8)
+            
+            # Every pixel in these bands is on the ring, so they can be
+            # pasted without a mask and the untouched interior is skipped
+            boxes = [
+                (0, 0, width, depth),
+                (0, height - depth, width, height),
+                (0, depth, depth, height - depth),
+                (width - depth, depth, width, height - depth),
+            ]
+            self._shadow_cache[key] = [
+                (Image.fromarray(np.ascontiguousarray(ring[y1:y2, x1:x2])), (x1, y1))
+                for x1, y1, x2, y2 in boxes
+            ]
+        return self._shadow_cache[key]
     
     def _draw_decorations(self, draw):
         """Draw small decorative gems"""
@@ -333,11 +560,7 @@ class CardBuilder:
         
         tint_layer = Image.new("RGBA", gem_sized.size, (*tint, 110))
         gem_tinted = Image.alpha_composite(gem_sized.convert("RGBA"), tint_layer)
-        
-        mask = Image.new("L", gem_sized.size, 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse([0, 0, badge_size - 1, badge_size - 1], fill=255)
-        gem_tinted.putalpha(mask)
+        gem_tinted.putalpha(self._circle_mask(badge_size))
         
         card.paste(gem_tinted, (cx - badge_size // 2, cy - badge_size // 2), gem_tinted)
         
@@ -349,17 +572,59 @@ class CardBuilder:
         
         return card
     
+    def _circle_mask(self, size):
+        """Filled circle mask for a size x size box, cached per size (drawn by PIL, so badges match older renders)"""
+        if size not in self._mask_cache:
+            mask = Image.new("L", (size, size), 0)
+            ImageDraw.Draw(mask).ellipse([0, 0, size - 1, size - 1], fill=255)
+            self._mask_cache[size] = mask
+        return self._mask_cache[size]
+    
     # === TEXT RENDERING METHODS ===
     
-    def _text_shadow(self, draw, pos, text, font, fill, offset=2):
-        """Draw text with shadow"""
-        x, y = pos
-        draw.text((x + offset, y + offset), text, font=font, fill=(0, 0, 0))
-        draw.text((x, y), text, font=font, fill=fill)
+    def _text_bbox(self, text, font):
+        """Bounding box of text drawn at (0, 0), memoized across builds"""
+        key = (text, font)
+        bbox = self._text_bboxes.get(key)
+        if bbox is None:
+            bbox = self._measure_draw.textbbox((0, 0), text, font=font)
+            self._text_bboxes[key] = bbox
+        return bbox
+    
+    def _glyph_run(self, text, font):
+        """Rasterized alpha mask of a text run and its offset from the draw origin"""
+        key = (text, font)
+        run = self._glyph_runs.get(key)
+        if run is not None:
+            self._glyph_runs.move_to_end(key)
+            return run
+        
+        left, top, right, bottom = self._text_bbox(text, font)
+        mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        run = (mask, left, top)
+        
+        self._glyph_runs[key] = run
+        if len(self._glyph_runs) > self.GLYPH_RUN_CACHE_SIZE:
+            self._glyph_runs.popitem(last=False)
+        return run
     
-    def _center_text_in_rect(self, draw, rect, text, font, fill, offset=2):
+    def _text_shadow(self, card, pos, text, font, fill, offset=2):
+        """Draw text with shadow, both stamped from one cached glyph mask; returns the box drawn on"""
+        if not text:
+            return
+        mask, left, top = self._glyph_run(text, font)
+        x, y = pos[0] + left, pos[1] + top
+        box = (x, y, x + mask.width + offset, y + mask.height + offset)
+        if self.low_memory:
+            self._dirty.append(box)
+        card.paste((0, 0, 0), (x + offset, y + offset), mask)
+        card.paste(fill, (x, y), mask)
+        return box
+    
+    def _center_text_in_rect(self, card, rect, text, font, fill, offset=2):
         """Center text horizontally and vertically in a rectangle"""
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = self._text_bbox(text, font)
         text_w = bbox[2] - bbox[0]
         text_h = bbox[3] - bbox[1]
         
@@ -369,21 +634,39 @@ class CardBuilder:
         x = rect[0] + (rect_w - text_w) // 2
         y = rect[1] + (rect_h - text_h) // 2 - bbox[1]  # Subtract bbox[1] to account for font ascent
         
-        self._text_shadow(draw, (x, y), text, font, fill, offset)
+        self._text_shadow(card, (x, y), text, font, fill, offset)
     
-    def _render_name(self, draw, name):
+    def wrap_text(self, text, font, width=None):
+        """Greedy word-wrap text into lines that fit the text box"""
+        if width is None:
+            width = self.CONTENT_WIDTH - self.TEXT_H_PADDING * 2
+
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for word in paragraph.split():
+                candidate = f"{line} {word}" if line else word
+                if line and font.getlength(candidate) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return lines
+
+    def _render_name(self, card, name):
         """Render card name - bold, gold, centered"""
         if not name:
             return
-        self._center_text_in_rect(draw, self.name_rect, name, self.font_name, self.COLOR_NAME, 3)
+        self._center_text_in_rect(card, self.name_rect, name, self.font_name, self.COLOR_NAME, 3)
     
-    def _render_type(self, draw, card_type):
+    def _render_type(self, card, card_type):
         """Render type line - regular, muted bronze, centered"""
         if not card_type:
             return
-        self._center_text_in_rect(draw, self.type_rect, card_type, self.font_type, self.COLOR_TYPE, 2)
+        self._center_text_in_rect(card, self.type_rect, card_type, self.font_type, self.COLOR_TYPE, 2)
     
-    def _render_abilities(self, draw, abilities, flavor):
+    def _render_abilities(self, card, abilities, flavor):
         """Render ability text (centered in available space) and flavor (anchored to bottom)"""
         if not abilities and not flavor:
             return
@@ -413,22 +696,22 @@ class CardBuilder:
             
             for i, line in enumerate(abilities):
                 line_y = ability_start_y + i * self.ABILITY_LINE_SPACING
-                self._render_ability_line(draw, line, line_y, text_left, text_width)
+                self._render_ability_line(card, line, line_y, text_left, text_width)
         
         # Render flavor (anchored to bottom)
         if flavor:
             for i, line in enumerate(flavor):
-                bbox = draw.textbbox((0, 0), line, font=self.font_flavor)
+                bbox = self._text_bbox(line, self.font_flavor)
                 line_w = bbox[2] - bbox[0]
                 line_x = text_left + (text_width - line_w) // 2
                 line_y = flavor_start_y + i * self.FLAVOR_LINE_SPACING
-                self._text_shadow(draw, (line_x, line_y), line, self.font_flavor, self.COLOR_FLAVOR, 2)
+                self._text_shadow(card, (line_x, line_y), line, self.font_flavor, self.COLOR_FLAVOR, 2)
     
-    def _render_ability_line(self, draw, line, y, text_left, text_width):
+    def _render_ability_line(self, card, line, y, text_left, text_width):
         """Render a single ability line with keyword highlighting"""
         # Check for keyword pattern: "Keyword —" or "Keyword:" at start of line
         # Match: Word(s) followed by em-dash, colon, or hyphen
-        keyword_match = re.match(r'^([A-Z][a-zA-Z]*(?:\s[A-Z][a-zA-Z]*)?)\s*([—:\-–])\s*', line)
+        keyword_match = KEYWORD_PATTERN.match(line)
         
         if keyword_match:
             keyword = keyword_match.group(1)
@@ -436,55 +719,107 @@ class CardBuilder:
             rest = line[keyword_match.end():]
             
             # Measure parts
-            keyword_bbox = draw.textbbox((0, 0), keyword, font=self.font_keyword)
+            keyword_bbox = self._text_bbox(keyword, self.font_keyword)
             keyword_w = keyword_bbox[2] - keyword_bbox[0]
             
             sep_with_spaces = f" {separator} "
-            sep_bbox = draw.textbbox((0, 0), sep_with_spaces, font=self.font_body)
+            sep_bbox = self._text_bbox(sep_with_spaces, self.font_body)
             sep_w = sep_bbox[2] - sep_bbox[0]
             
-            rest_bbox = draw.textbbox((0, 0), rest, font=self.font_body)
+            rest_bbox = self._text_bbox(rest, self.font_body)
             rest_w = rest_bbox[2] - rest_bbox[0]
             
             total_w = keyword_w + sep_w + rest_w
             start_x = text_left + (text_width - total_w) // 2
             
             # Draw keyword (bold, highlighted)
-            self._text_shadow(draw, (start_x, y), keyword, self.font_keyword, self.COLOR_KEYWORD, 2)
+            self._text_shadow(card, (start_x, y), keyword, self.font_keyword, self.COLOR_KEYWORD, 2)
             
             # Draw separator (regular)
-            self._text_shadow(draw, (start_x + keyword_w, y), sep_with_spaces, self.font_body, self.COLOR_ABILITY, 2)
+            self._text_shadow(card, (start_x + keyword_w, y), sep_with_spaces, self.font_body, self.COLOR_ABILITY, 2)
             
             # Draw rest (regular)
-            self._text_shadow(draw, (start_x + keyword_w + sep_w, y), rest, self.font_body, self.COLOR_ABILITY, 2)
+            self._text_shadow(card, (start_x + keyword_w + sep_w, y), rest, self.font_body, self.COLOR_ABILITY, 2)
         else:
             # No keyword, just center the line
-            bbox = draw.textbbox((0, 0), line, font=self.font_body)
+            bbox = self._text_bbox(line, self.font_body)
             line_w = bbox[2] - bbox[0]
             line_x = text_left + (text_width - line_w) // 2
-            self._text_shadow(draw, (line_x, y), line, self.font_body, self.COLOR_ABILITY, 2)
+            self._text_shadow(card, (line_x, y), line, self.font_body, self.COLOR_ABILITY, 2)
     
-    def _render_stats(self, draw, attack, defense):
+    def _render_stats(self, card, attack, defense):
         """Render stat numbers - PROPERLY CENTERED in badges"""
         if attack:
-            self._render_stat_number(draw, attack, self.stat_left_x, self.stat_y, self.COLOR_STAT_ATK)
+            self._render_stat_number(card, attack, self.stat_left_x, self.stat_y, self.COLOR_STAT_ATK)
         
         if defense:
-            self._render_stat_number(draw, defense, self.stat_right_x, self.stat_y, self.COLOR_STAT_DEF)
+            self._render_stat_number(card, defense, self.stat_right_x, self.stat_y, self.COLOR_STAT_DEF)
     
-    def _render_stat_number(self, draw, value, cx, cy, color):
+    def _render_stat_number(self, card, value, cx, cy, color):
         """Render a stat number perfectly centered in its badge"""
+        # Draw with shadow
+        return self._text_shadow(card, self._stat_number_pos(value, cx, cy), value, self.font_stat, color, 3)
+    
+    def _stat_number_pos(self, value, cx, cy):
+        """Where a stat number is drawn so it sits centered on (cx, cy)"""
         # Get the bounding box
-        bbox = draw.textbbox((0, 0), value, font=self.font_stat)
+        bbox = self._text_bbox(value, self.font_stat)
         text_w = bbox[2] - bbox[0]
         text_h = bbox[3] - bbox[1]
         
         # Calculate position - account for bbox offset
-        x = cx - text_w // 2 - bbox[0]
-        y = cy - text_h // 2 - bbox[1]
-        
-        # Draw with shadow
-        self._text_shadow(draw, (x, y), value, self.font_stat, color, 3)
+        return cx - text_w // 2 - bbox[0], cy - text_h // 2 - bbox[1]
+    
+    # === PARTIAL UPDATES ===
+    
+    def update_stats(self, card, attack=None, defense=None):
+        """
+        Redraw only the stat badges of a finished card, in place.
+        
+        Each badge is restored from a cached clean copy of the template and the
+        new number drawn on it, so the pixels match build() with these stats.
+        `card` is a build() result or its reloaded PNG (RGBA or RGB) whose
+        current numbers fit their badges (up to three digits). None leaves a
+        badge untouched; "" clears it, as in build().
+        
+        Returns the (left, top, right, bottom) boxes that were redrawn, so only
+        those regions need to be sent or blitted.
+        """
+        dirty = []
+        for value, cx, color in ((attack, self.stat_left_x, self.COLOR_STAT_ATK),
+                                 (defense, self.stat_right_x, self.COLOR_STAT_DEF)):
+            if value is None:
+                continue
+            value = str(value)
+            box = self._stat_region(cx)
+            if value:
+                # A number wider than the badge widens the region to cover it
+                mask, left, top = self._glyph_run(value, self.font_stat)
+                x, y = self._stat_number_pos(value, cx, self.stat_y)
+                box = (max(0, min(box[0], x + left)), max(0, min(box[1], y + top)),
+                       min(self.CARD_W, max(box[2], x + left + mask.width + 3)),
+                       min(self.CARD_H, max(box[3], y + top + mask.height + 3)))
+            card.paste(self._clean_region(box, card.mode), box[:2])
+            if value:
+                self._render_stat_number(card, value, cx, self.stat_y, color)
+            dirty.append(box)
+        return dirty
+    
+    def _stat_region(self, cx):
+        """Box covering a stat badge, ring included"""
+        half = self.stat_radius + 8
+        return (cx - half, self.stat_y - half, cx + half, self.stat_y + half)
+    
+    def _clean_region(self, box, mode):
+        """The template (no stats drawn) cropped to `box`, in `mode`, cached per box"""
+        key = (box, mode)
+        region = self._clean_regions.get(key)
+        if region is None:
+            region = self.frame_template.crop(box)
+            if region.mode != mode:
+                region = region.convert(mode)
+            self._clean_regions[key] = region
+        return region
 
 
 # === MAIN ===
@@ -0,0 +1,136 @@
+"""
+Card Data Loader
+- Reads cards/basic_creatures.json, a JSON export of CARD_DATABASE,
+  the CARD_DATABASE literal straight out of game/js/cards.js, or a compiled
+  card database (card_db.py, .cdb)
+- Normalizes every source to a list of card dicts with an "id"
+- Converts cards into CardBuilder.build() arguments
+"""
+
+import json
+import os
+import re
+
+ART_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+_JS_TOKEN = re.compile(r'''
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<punct>[{}\[\]:,])
+''', re.VERBOSE | re.DOTALL)
+
+
+def parse_js_object(source, name):
+    """Parse the object literal assigned to `const <name> = {...};` in a JS file"""
+    match = re.search(r'\b(?:const|let|var)\s+' + re.escape(name) + r'\s*=\s*', source)
+    if not match:
+        raise ValueError(f"{name} not found")
+
+    out = []
+    depth = 0
+    pos = match.end()
+    while True:
+        token = _JS_TOKEN.match(source, pos)
+        if not token:
+            raise ValueError(f"Unsupported syntax in {name} at offset {pos}: {source[pos:pos + 30]!r}")
+        pos = token.end()
+        kind, text = token.lastgroup, token.group()
+
+        if kind == "space":
+            continue
+        if kind == "string" and text[0] == "'":
+            text = json.dumps(text[1:-1].replace("\\'", "'"))
+        elif kind == "ident":
+            if text not in ("true", "false", "null"):
+                text = json.dumps(text)
+        elif kind == "punct":
+            if text in "}]" and out and out[-1] == ",":
+                out.pop()  # trailing comma
+            depth += text in "{["
+            depth -= text in "}]"
+
+        out.append(text)
+        if depth == 0:
+            break
+
+    return json.loads("".join(out))
+
+
+def load_cards(path):
+    """Load cards from a .json, .js or .cdb source as a list of dicts with an "id" key"""
+    if path.endswith(".cdb"):
+        from card_db import CardDB
+        with CardDB.open(path) as db:
+            return [dict(card) for card in db.cards()]
+
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+
+    if path.endswith(".js"):
+        data = parse_js_object(source, "CARD_DATABASE")
+    else:
+        data = json.loads(source)
+
+    # {"basic_creatures": [...]} or any other single named list
+    if isinstance(data, dict) and len(data) == 1:
+        (only,) = data.values()
+        if isinstance(only, list):
+            data = only
+
+    if isinstance(data, list):
+        cards = [dict(card) for card in data]
+    else:
+        # CARD_DATABASE export: {card_id: {...}}
+        cards = [dict(card, id=card_id) for card_id, card in data.items()]
+
+    for index, card in enumerate(cards):
+        if "id" not in card:
+            raise ValueError(f"{path}: card #{index} has no id")
+    return cards
+
+
+def find_art(card, art_dirs):
+    """Locate art for a card: an explicit "art" field, else <id>.<ext> in art_dirs"""
+    if card.get("art"):
+        return card["art"]
+    for art_dir in art_dirs or ():
+        for ext in ART_EXTENSIONS:
+            candidate = os.path.join(art_dir, card["id"] + ext)
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def card_type_line(card):
+    """Type line as printed on the card, e.g. "Creature — Undead" """
+    card_type = card.get("type", "")
+    subtype = card.get("tribe") or card.get("school")
+    if subtype and "—" not in card_type:
+        return f"{card_type} — {subtype}"
+    return card_type
+
+
+def build_kwargs(card, builder, art_dirs=None):
+    """Translate a card dict into keyword arguments for CardBuilder.build"""
+    abilities = card.get("abilities")
+    if not abilities and card.get("text"):
+        abilities = builder.wrap_text(card["text"], builder.font_body)
+
+    flavor = card.get("flavor") or []
+    if isinstance(flavor, str):
+        flavor = builder.wrap_text(f"\"{flavor}\"", builder.font_flavor)
+
+    attack = card.get("attack")
+    defense = card.get("defense")
+
+    return dict(
+        art_image_path=find_art(card, art_dirs),
+        card_name=card.get("name", "").upper(),
+        card_type=card_type_line(card),
+        abilities=list(abilities or []),
+        flavor=list(flavor),
+        attack="" if attack is None else str(attack),
+        defense="" if defense is None else str(defense),
+    )
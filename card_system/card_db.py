@@ -0,0 +1,457 @@
+"""
+Card Database
+- Compiles CARD_DATABASE and TOKENS (game/js/cards.js) and cards/basic_creatures.json
+  into one validated, versioned binary file
+- Fixed columns per card (cost, hp cost, attack, defense, keyword bitmask,
+  interned type/tribe/school ids) as little-endian int arrays
+- Prebuilt indexes by type, tribe, school and cost (getCardsByTribe and
+  friends without a scan)
+- Opened with mmap: loading reads a small JSON header, columns are views into
+  the file, and card records are decoded on first use
+- card_data.load_cards, engine.CardPool.load and CreatureTable.load accept the
+  compiled file, so the renderer, simulator and deck tools read the same data
+
+Usage:
+    python card_db.py [--db cards/cards.cdb] [--cards game/js/cards.js] [--extra cards/basic_creatures.json]
+    python card_db.py --info | --check | --where tribe=Undead cost=3
+"""
+
+from array import array
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from card_data import load_cards, parse_js_object
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CARDS_JS = os.path.join(REPO_ROOT, "game", "js", "cards.js")
+DEFAULT_EXTRA = (os.path.join(REPO_ROOT, "cards", "basic_creatures.json"),)
+DEFAULT_DB = os.path.join(REPO_ROOT, "cards", "cards.cdb")
+
+CARD_DB_MAGIC = b"CARDDB\n"
+CARD_DB_VERSION = 1
+
+# Stored for a missing attack/defense/tribe/school (spells, untyped cards)
+NONE = -1
+
+# flags column
+TOKEN = 1
+
+# Where each card came from (source column)
+SOURCE_DATABASE, SOURCE_EXTRA, SOURCE_TOKENS = 0, 1, 2
+
+INT_COLUMNS = ("cost", "hp_cost", "attack", "defense", "type", "tribe", "school", "source", "flags")
+INDEXES = ("type", "tribe", "school", "cost", "source")
+# Indexes keyed by the number itself rather than an interned name
+NUMBER_INDEXES = ("cost", "source")
+
+_ALIGN = 8
+
+
+def _split_type(card):
+    """("Creature", "Undead") for both `type: "Creature", tribe: "Undead"` and "Creature — Undead" """
+    card_type = card.get("type") or ""
+    subtype = None
+    if "—" in card_type:
+        card_type, subtype = (part.strip() for part in card_type.split("—", 1))
+    return card_type, subtype
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate(cards, keywords):
+    """Problems with a list of (source, card dict) as readable strings; empty if the data is sound"""
+    problems = []
+    seen = {}
+    for source, card in cards:
+        card_id = card.get("id")
+        where = f"{card_id or '?'} ({source})"
+        if not card_id or not isinstance(card_id, str):
+            problems.append(f"{where}: missing id")
+            continue
+        if card_id in seen:
+            problems.append(f"{where}: duplicate id, also in {seen[card_id]}")
+        seen[card_id] = source
+        if not card.get("name"):
+            problems.append(f"{where}: missing name")
+        card_type, _ = _split_type(card)
+        if not card_type:
+            problems.append(f"{where}: missing type")
+        if not _is_int(card.get("cost")) or card["cost"] < 0:
+            problems.append(f"{where}: cost must be a non-negative integer, not {card.get('cost')!r}")
+        if not _is_int(card.get("hpCost") or 0) or (card.get("hpCost") or 0) < 0:
+            problems.append(f"{where}: hpCost must be a non-negative integer, not {card.get('hpCost')!r}")
+        if card_type == "Creature":
+            for stat in ("attack", "defense"):
+                if not _is_int(card.get(stat)) or card[stat] < 0:
+                    problems.append(f"{where}: creature {stat} must be a non-negative integer, "
+                                    f"not {card.get(stat)!r}")
+        unknown = [k for k in card.get("keywords") or () if k not in keywords]
+        if unknown:
+            problems.append(f"{where}: unknown keywords {', '.join(unknown)}")
+    return problems
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_stamps(cards_js, extra):
+    return [[os.path.abspath(path), _file_digest(path)] for path in (cards_js, *extra)]
+
+
+def compile_cards(cards_js=DEFAULT_CARDS_JS, extra=DEFAULT_EXTRA):
+    """
+    The database file's bytes for CARD_DATABASE and TOKENS in `cards_js` plus
+    every card file in `extra` (card_data.load_cards formats).
+
+    Raises:
+        ValueError: listing every validation problem found
+    """
+    with open(cards_js, encoding="utf-8") as f:
+        source = f.read()
+    keywords = list(parse_js_object(source, "KEYWORDS"))
+    cards = [(os.path.basename(cards_js), dict(card, id=card_id))
+             for card_id, card in parse_js_object(source, "CARD_DATABASE").items()]
+    sources = [SOURCE_DATABASE] * len(cards)
+    for path in extra:
+        extra_cards = load_cards(path)
+        cards.extend((os.path.basename(path), card) for card in extra_cards)
+        sources.extend([SOURCE_EXTRA] * len(extra_cards))
+    tokens = parse_js_object(source, "TOKENS")
+    cards.extend((f"{os.path.basename(cards_js)} TOKENS", dict(card, id=token_id)) for token_id, card in tokens.items())
+    sources.extend([SOURCE_TOKENS] * len(tokens))
+
+    problems = validate(cards, set(keywords))
+    if problems:
+        raise ValueError("Invalid card data:\n  " + "\n  ".join(problems))
+
+    tables = {"type": [], "tribe": [], "school": []}
+
+    def intern(table, value):
+        if value is None:
+            return NONE
+        names = tables[table]
+        if value not in names:
+            names.append(value)
+        return names.index(value)
+
+    columns = {name: array("i") for name in INT_COLUMNS}
+    masks = array("q")
+    bits = {keyword: 1 << i for i, keyword in enumerate(keywords)}
+    for (_, card), source_id in zip(cards, sources):
+        card_type, subtype = _split_type(card)
+        tribe = card.get("tribe") or (subtype if card_type == "Creature" else None)
+        school = card.get("school") or (subtype if card_type != "Creature" else None)
+        row = {
+            "cost": card["cost"], "hp_cost": card.get("hpCost") or 0,
+            "attack": card["attack"] if _is_int(card.get("attack")) else NONE,
+            "defense": card["defense"] if _is_int(card.get("defense")) else NONE,
+            "type": intern("type", card_type), "tribe": intern("tribe", tribe), "school": intern("school", school),
+            "source": source_id, "flags": TOKEN if source_id == SOURCE_TOKENS else 0,
+        }
+        for name, value in row.items():
+            columns[name].append(value)
+        mask = 0
+        for keyword in card.get("keywords") or ():
+            mask |= bits[keyword]
+        masks.append(mask)
+
+    indexes = {}
+    for name in INDEXES:
+        keys = max(columns[name], default=0) + 1 if name in NUMBER_INDEXES else len(tables[name])
+        members = [[] for _ in range(keys)]
+        for i, key in enumerate(columns[name]):
+            if key != NONE:
+                members[key].append(i)
+        starts = array("i", [0])
+        for group in members:
+            starts.append(starts[-1] + len(group))
+        indexes[name] = (starts, array("i", [i for group in members for i in group]))
+
+    ids = [card["id"].encode() for _, card in cards]
+    records = [json.dumps(card, ensure_ascii=False, separators=(",", ":")).encode() for _, card in cards]
+
+    # Lay out the sections, each 8-byte aligned, and describe them in the header
+    blobs = bytearray()
+    layout = {}
+
+    def add(name, data):
+        blobs.extend(b"\0" * (-len(blobs) % _ALIGN))
+        if sys.byteorder != "little" and isinstance(data, array):
+            data = array(data.typecode, data)
+            data.byteswap()
+        layout[name] = [len(blobs), len(data) * (data.itemsize if isinstance(data, array) else 1)]
+        blobs.extend(data.tobytes() if isinstance(data, array) else data)
+
+    for name, column in columns.items():
+        add(f"column.{name}", column)
+    add("column.keywords", masks)
+    for name, (starts, items) in indexes.items():
+        add(f"index.{name}.starts", starts)
+        add(f"index.{name}.items", items)
+    for name, strings in (("ids", ids), ("records", records)):
+        offsets = array("i", [0])
+        for s in strings:
+            offsets.append(offsets[-1] + len(s))
+        add(f"{name}.offsets", offsets)
+        add(f"{name}.data", b"".join(strings))
+
+    data_version = hashlib.sha256(b"".join(records) + json.dumps(keywords).encode()).hexdigest()[:16]
+    header = json.dumps({
+        "version": CARD_DB_VERSION, "data_version": data_version, "count": len(cards),
+        "keywords": keywords, "types": tables["type"], "tribes": tables["tribe"], "schools": tables["school"],
+        "sources": _source_stamps(cards_js, extra), "sections": layout,
+    }).encode()
+    start = len(CARD_DB_MAGIC) + 4 + len(header)
+    padding = b" " * (-start % _ALIGN)  # JSON tolerates trailing spaces; keeps the sections aligned in the file
+    return CARD_DB_MAGIC + struct.pack("<I", len(header) + len(padding)) + header + padding + bytes(blobs)
+
+
+def compile_db(path=DEFAULT_DB, cards_js=DEFAULT_CARDS_JS, extra=DEFAULT_EXTRA):
+    """Compile the sources and write the database to `path` (atomically); returns the opened CardDB"""
+    data = compile_cards(cards_js, extra)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return CardDB.open(path)
+
+
+class CardDB:
+    """
+    A compiled card database. Columns are int arrays indexed by card number
+    (memory views into the file where the byte order allows); records are
+    the source card dicts, with "id", decoded on demand.
+    """
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        if not bytes(buffer[:len(CARD_DB_MAGIC)]) == CARD_DB_MAGIC:
+            raise ValueError(f"{path or 'buffer'} is not a card database")
+        (header_len,) = struct.unpack_from("<I", buffer, len(CARD_DB_MAGIC))
+        start = len(CARD_DB_MAGIC) + 4
+        header = json.loads(bytes(buffer[start:start + header_len]))
+        if header["version"] != CARD_DB_VERSION:
+            raise ValueError(f"{path or 'buffer'} is card database format {header['version']}, "
+                             f"expected {CARD_DB_VERSION}: recompile it")
+        self.header = header
+        self.count = header["count"]
+        self.data_version = header["data_version"]
+        self.keyword_names = header["keywords"]
+        self.keyword_bits = {name: 1 << i for i, name in enumerate(self.keyword_names)}
+        self.names = {"type": header["types"], "tribe": header["tribes"], "school": header["schools"]}
+        self._view = memoryview(buffer)[start + header_len:]
+        self._sections = header["sections"]
+        self.columns = {name: self._array(f"column.{name}", "i") for name in INT_COLUMNS}
+        self.columns["keywords"] = self._array("column.keywords", "q")
+        self._id_offsets = self._array("ids.offsets", "i")
+        self._record_offsets = self._array("records.offsets", "i")
+        self._ids = None
+        self._index = None
+        self._records = {}
+
+    @classmethod
+    def open(cls, path=DEFAULT_DB):
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    def close(self):
+        """Release the file mapping; columns handed out earlier must not be used afterwards"""
+        if self._mmap is not None:
+            for column in self.columns.values():
+                if isinstance(column, memoryview):
+                    column.release()
+            for view in (self._id_offsets, self._record_offsets, self._view):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _bytes(self, section):
+        offset, size = self._sections[section]
+        return self._view[offset:offset + size]
+
+    def _array(self, section, typecode):
+        data = self._bytes(section)
+        if sys.byteorder == "little":
+            return data.cast(typecode)
+        values = array(typecode, bytes(data))
+        values.byteswap()
+        return values
+
+    # === CARDS ===
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, card_id):
+        return card_id in self.index
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            data = bytes(self._bytes("ids.data"))
+            offsets = self._id_offsets
+            self._ids = [data[offsets[i]:offsets[i + 1]].decode() for i in range(self.count)]
+        return self._ids
+
+    @property
+    def index(self):
+        """{card id: card number}"""
+        if self._index is None:
+            self._index = {card_id: i for i, card_id in enumerate(self.ids)}
+        return self._index
+
+    def card(self, key):
+        """Source card dict (with "id") by id or card number; KeyError for an unknown id"""
+        i = self.index[key] if isinstance(key, str) else key
+        record = self._records.get(i)
+        if record is None:
+            offsets = self._record_offsets
+            offset = self._sections["records.data"][0]
+            record = self._records[i] = json.loads(bytes(self._view[offset + offsets[i]:offset + offsets[i + 1]]))
+        return record
+
+    def cards(self, sources=(SOURCE_DATABASE, SOURCE_EXTRA)):
+        """Card dicts from the given sources, in compile order (tokens excluded by default)"""
+        source = self.columns["source"]
+        return [self.card(i) for i in range(self.count) if source[i] in sources]
+
+    def value(self, name, key):
+        """A column value by card id or number; interned columns come back as names, NONE as None"""
+        i = self.index[key] if isinstance(key, str) else key
+        value = self.columns[name][i]
+        if name in self.names:
+            return None if value == NONE else self.names[name][value]
+        if name == "keywords":
+            return [k for k, bit in self.keyword_bits.items() if value & bit]
+        return None if value == NONE and name in ("attack", "defense") else value
+
+    # === QUERIES ===
+
+    def numbers(self, index, key):
+        """Card numbers in an index (see INDEXES) under a name, or a number for cost and source"""
+        if index not in NUMBER_INDEXES:
+            names = self.names[index]
+            if key not in names:
+                return []
+            key = names.index(key)
+        starts = self._array(f"index.{index}.starts", "i")
+        if not 0 <= key < len(starts) - 1:
+            return []
+        items = self._array(f"index.{index}.items", "i")
+        return list(items[starts[key]:starts[key + 1]])
+
+    def by_tribe(self, tribe):
+        return [self.ids[i] for i in self.numbers("tribe", tribe)]
+
+    def by_type(self, card_type):
+        return [self.ids[i] for i in self.numbers("type", card_type)]
+
+    def by_school(self, school):
+        return [self.ids[i] for i in self.numbers("school", school)]
+
+    def by_cost(self, cost):
+        return [self.ids[i] for i in self.numbers("cost", cost)]
+
+    def with_keywords(self, *keywords):
+        """Ids of cards having every one of `keywords`"""
+        mask = 0
+        for keyword in keywords:
+            if keyword not in self.keyword_bits:
+                return []
+            mask |= self.keyword_bits[keyword]
+        column = self.columns["keywords"]
+        return [self.ids[i] for i in range(self.count) if column[i] & mask == mask]
+
+    def where(self, **conditions):
+        """
+        Ids matching every index condition, e.g. where(tribe="Undead", cost=3).
+        Indexes cover every compiled card; add source=SOURCE_DATABASE to match
+        getCardsByTribe and friends, which only look at CARD_DATABASE.
+        """
+        selected = None
+        for name, key in conditions.items():
+            numbers = set(self.numbers(name, key))
+            selected = numbers if selected is None else selected & numbers
+        return [self.ids[i] for i in sorted(selected or ())]
+
+    def is_current(self):
+        """False if a source file changed (or moved) since this database was compiled"""
+        for path, digest in self.header["sources"]:
+            if not os.path.exists(path) or _file_digest(path) != digest:
+                return False
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and query the card database",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--db", default=DEFAULT_DB, help="Database file (default: cards/cards.cdb)")
+    parser.add_argument("--cards", default=DEFAULT_CARDS_JS, help="cards.js to compile (default: game/js/cards.js)")
+    parser.add_argument("--extra", action="append",
+                        help="Extra card file (repeatable; default: cards/basic_creatures.json)")
+    parser.add_argument("--info", action="store_true", help="Describe the database instead of compiling")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the database is missing or out of date")
+    parser.add_argument("--where", nargs="+", metavar="INDEX=KEY", help="List cards, e.g. tribe=Undead cost=3")
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            with CardDB.open(args.db) as db:
+                current = db.is_current()
+        except (OSError, ValueError) as e:
+            print(f"{args.db}: {e}")
+            return 1
+        print(f"{args.db}: {'up to date' if current else 'out of date'}")
+        return 0 if current else 1
+
+    if args.info or args.where:
+        with CardDB.open(args.db) as db:
+            if args.where:
+                conditions = {}
+                for condition in args.where:
+                    name, _, key = condition.partition("=")
+                    if name not in INDEXES:
+                        parser.error(f"unknown index {name!r} (use {', '.join(INDEXES)})")
+                    conditions[name] = int(key) if name in NUMBER_INDEXES else key
+                for card_id in db.where(**conditions):
+                    print(f"  {card_id:<28}{db.card(card_id).get('name', '')}")
+                return 0
+            print(f"{args.db}: format {CARD_DB_VERSION}, data {db.data_version}, {len(db)} cards, "
+                  f"{len(db.keyword_names)} keywords")
+            for name in ("type", "tribe", "school"):
+                counts = ", ".join(f"{key} {len(db.numbers(name, key))}" for key in db.names[name])
+                print(f"  {name + 's':<9}{counts}")
+        return 0
+
+    try:
+        db = compile_db(args.db, args.cards, args.extra if args.extra is not None else DEFAULT_EXTRA)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {args.db}: {len(db)} cards, data version {db.data_version}, "
+          f"{os.path.getsize(args.db) / 1024:.1f} KB")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
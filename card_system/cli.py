@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+GRIMDARK TCG - Card Tools
+==========================
+
+Usage:
+    python cli.py render-all --back <card_frame.png> [--cards <file>] [--out <dir>]
+                             [--art-dir <dir> ...] [--workers N]
+                             [--cache-dir <dir>] [--cache-size MB] [--no-cache]
+                             [--art-cache-dir <dir>]
+                             [--export] [--target name:WxH:format[:opts] ...] [--direct-resize]
+                             [--trace trace.json] [--trace-histograms histograms.json] [--low-memory]
+    python cli.py render-stream --back <card_frame.png> [--cards <file>] [--out <dir|.zip|.tar|->]
+                                [--art-dir <dir> ...] [--format png|webp|jpeg] [--max-pending N] [--workers N]
+    python cli.py watch --back <card_frame.png> [--cards <file>] [--out <dir>] [--art-dir <dir> ...]
+                        [--workers N] [--art-cache-dir <dir>] [--debounce S] [--interval S]
+                        [--notify-port PORT]
+    python cli.py print-sheets --back <card_frame.png> [--cards <file>] [--deck <ids.json>] [--copies N]
+                               [--out sheets.pdf|sheets.tiff] [--render-dir <dir>] [--art-dir <dir> ...]
+                               [--page letter|a4|WxH] [--dpi 300] [--bleed MM] [--margin MM]
+                               [--card-width MM] [--quality Q | --lossless] [--no-marks]
+    python cli.py serve --back <card_frame.png> [--cards <file>] [--art-dir <dir> ...] [--host 127.0.0.1]
+                        [--port 47620] [--workers N] [--cache-mb 64] [--art-cache-dir <dir>] [--no-frame-pack]
+    python cli.py atlas [--cards-dir <dir>] [--images-dir <dir>] [--out <dir>]
+                        [--card-scale 0.25] [--sheet-size 4096] [--sprite <png> ...] [--full]
+
+Examples:
+    python cli.py render-all --back frame.png --art-dir art/
+    python cli.py render-all --back frame.png --cards ../game/js/cards.js --workers 8
+    python cli.py render-all --back frame.png --export --target hand:224x336:webp:quality=85
+    python cli.py render-all --back frame.png --no-cache --trace trace.json
+    python cli.py render-all --back frame.png --workers 32 --low-memory
+    python cli.py render-stream --back frame.png --cards ../game/js/cards.js --out cards.zip
+    python cli.py render-stream --back frame.png --format webp --out - | ssh host tar x -C cards
+    python cli.py render-stream --back frame.png --workers 8 --encode-threads 8 --out cards.tar
+    python cli.py watch --back frame.png --cards ../game/js/cards.js --art-dir art/ --notify-port 47615
+    python cli.py print-sheets --back frame.png --cards ../game/js/cards.js --deck my_deck.json --out deck.pdf
+    python cli.py print-sheets --back frame.png --copies 3 --page a4 --dpi 600 --out playtest.tiff
+    python cli.py serve --back frame.png --cards ../game/js/cards.js --art-dir art/
+    python cli.py atlas --cards-dir rendered --out ../game/images/atlas
+
+Card sources:
+    cards/basic_creatures.json, a JSON export of CARD_DATABASE
+    ({card_id: {...}}), game/js/cards.js itself, or a compiled card database
+    (card_db.py, .cdb).
+"""
+
+import argparse
+import contextlib
+import math
+import os
+import sys
+import time
+
+from card_data import load_cards
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CARDS = os.path.join(REPO_ROOT, "cards", "basic_creatures.json")
+DEFAULT_IMAGES = os.path.join(REPO_ROOT, "game", "images")
+
+
+def cmd_render_all(args):
+    from batch import render_all
+    from render_cache import RenderCache
+
+    cache = None if args.no_cache else RenderCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    exporter = None
+    if args.export or args.target:
+        from export import Exporter, parse_target
+        try:
+            targets = [parse_target(spec) for spec in args.target] or None
+            exporter = Exporter(args.out, targets, chain=not args.direct_resize)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+    cards = load_cards(args.cards)
+    total = len(cards)
+    width = len(str(total))
+    print(f"Rendering {total} cards from {args.cards} -> {args.out}")
+
+    start = time.perf_counter()
+    failures = []
+    counts = {}
+    exported = []
+    tracer = None
+    if args.trace or args.trace_histograms:
+        from tracing import Tracer
+        tracer = Tracer()
+    frame_pack_dir = None if args.no_cache else os.path.join(args.cache_dir, "frames")
+    results = render_all(cards, args.back, args.out, args.workers, args.art_dir, cache, args.art_cache_dir,
+                         exporter, frame_pack_dir, tracer is not None, args.low_memory)
+    for index, result in enumerate(results, 1):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.exports:
+            exported.append(result)
+        if tracer:
+            tracer.extend(result.trace)
+        print(f"  [{index:>{width}}/{total}] {result.card_id:<28} {result.status:<9} "
+              f"{result.seconds * 1000:7.0f} ms")
+        if not result.ok:
+            failures.append(result)
+    elapsed = time.perf_counter() - start
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\nDone: {summary} in {elapsed:.2f}s ({total / elapsed:.1f} cards/s)")
+
+    if exported:
+        print_export_report(exporter, exported)
+
+    if tracer:
+        print_trace_report(tracer, args.trace, args.trace_histograms)
+
+    if failures:
+        print(f"\n{len(failures)} card(s) failed:")
+        for result in failures:
+            print(f"\n  {result.card_id}:")
+            for line in result.error.splitlines():
+                print(f"    {line}")
+        return 1
+    return 0
+
+
+def print_export_report(exporter, results):
+    """Bytes and encode time per export target, against the full-size PNGs"""
+    full_bytes = sum(os.path.getsize(result.path) for result in results)
+    print(f"\nExport report ({len(results)} cards, full PNG: {full_bytes / 1024:.0f} KB):")
+    print(f"  {'target':<10}{'size':>11}{'format':>8}{'total KB':>10}{'avg KB':>8}"
+          f"{'resize ms':>11}{'encode ms':>11}{'vs PNG':>8}")
+    for index, target in enumerate(exporter.targets):
+        stats = [result.exports[index] for result in results]
+        total = sum(stat.bytes for stat in stats)
+        resize_ms = sum(stat.resize_seconds for stat in stats) * 1000
+        encode_ms = sum(stat.encode_seconds for stat in stats) * 1000
+        size = f"{target.size[0]}x{target.size[1]}"
+        print(f"  {target.name:<10}{size:>11}{target.format:>8}{total / 1024:>10.0f}{total / len(stats) / 1024:>8.1f}"
+              f"{resize_ms:>11.0f}{encode_ms:>11.0f}{full_bytes / max(total, 1):>7.1f}x")
+
+
+def cmd_render_stream(args):
+    from batch import SharedRenderPool
+    from card_builder import CardBuilder
+    from stream import build_many, open_sink, render_many
+
+    cards = load_cards(args.cards)
+    total = len(cards)
+    width = len(str(total))
+    # Progress goes to stderr so "--out -" can stream the tar on stdout
+    log = sys.stderr
+    print(f"Streaming {total} cards from {args.cards} -> {args.out}", file=log)
+
+    start = time.perf_counter()
+    failures = []
+    written = 0
+    options = {"quality": args.quality} if args.quality and args.format != "png" else {}
+    with contextlib.ExitStack() as stack:
+        sink = stack.enter_context(open_sink(args.out))
+        if args.workers > 1:
+            # Workers draw into shared memory; only slot numbers cross the process boundary
+            pool = stack.enter_context(SharedRenderPool(args.back, args.workers, args.workers + args.max_pending))
+            results = render_many(pool, cards, sink, args.format, args.art_dir, args.encode_threads, **options)
+        else:
+            results = build_many(CardBuilder(args.back), cards, sink, args.format, args.art_dir, args.max_pending,
+                                 args.encode_threads, **options)
+        for index, result in enumerate(results, 1):
+            status = "ok" if result.ok else "failed"
+            print(f"  [{index:>{width}}/{total}] {result.card_id:<28} {status:<7} "
+                  f"{result.seconds * 1000:7.0f} ms {result.size / 1024:7.1f} KB", file=log)
+            written += result.size
+            if not result.ok:
+                failures.append(result)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nDone: {total - len(failures)} cards, {written / 1024 / 1024:.1f} MB in {elapsed:.2f}s "
+          f"({total / elapsed:.1f} cards/s)", file=log)
+    if failures:
+        print(f"\n{len(failures)} card(s) failed:", file=log)
+        for result in failures:
+            print(f"\n  {result.card_id}:", file=log)
+            for line in result.error.splitlines():
+                print(f"    {line}", file=log)
+        return 1
+    return 0
+
+
+def print_trace_report(tracer, trace_path, histograms_path):
+    """Per-span histogram table; writes the Chrome trace and histogram JSON if asked"""
+    if not tracer.events:
+        print("\nTrace: no cards were rendered (use --no-cache to trace every card)")
+        return
+    print("\nTrace (per span, slowest total first):")
+    print(tracer.format_histograms())
+    if trace_path:
+        tracer.save_chrome_trace(trace_path)
+        print(f"  Chrome trace: {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+    if histograms_path:
+        import json
+        with open(histograms_path, "w", encoding="utf-8") as f:
+            json.dump(tracer.histograms(), f, indent=1)
+        print(f"  Histograms: {histograms_path}")
+
+
+def cmd_watch(args):
+    from watch import CardWatcher
+
+    watcher = CardWatcher(args.cards, args.back, args.out, args.art_dir, args.workers, args.art_cache_dir,
+                          args.notify_port)
+    try:
+        watcher.run(args.interval, args.debounce)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+
+def cmd_print_sheets(args):
+    import json
+    from batch import render_all
+    from imposition import SheetLayout, card_size_for, impose, open_sheet_writer, parse_size
+    from render_cache import RenderCache
+
+    cards = load_cards(args.cards)
+    by_id = {card["id"]: card for card in cards}
+    if args.deck:
+        with open(args.deck, encoding="utf-8") as f:
+            ids = json.load(f)
+        unknown = sorted({card_id for card_id in ids if card_id not in by_id})
+        if unknown:
+            print(f"Error: {args.deck}: unknown cards {', '.join(unknown)}", file=sys.stderr)
+            return 1
+    else:
+        ids = [card["id"] for card in cards for _ in range(args.copies)]
+    if not ids:
+        print("Error: nothing to print", file=sys.stderr)
+        return 1
+    try:
+        page = parse_size(args.page)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    # Unchanged cards come from --render-dir or the render cache; the rest render in parallel
+    unique = [by_id[card_id] for card_id in dict.fromkeys(ids)]
+    print(f"Rendering {len(unique)} cards from {args.cards} -> {args.render_dir}")
+    start = time.perf_counter()
+    cache = None if args.no_cache else RenderCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    frame_pack_dir = None if args.no_cache else os.path.join(args.cache_dir, "frames")
+    paths = {}
+    counts = {}
+    failures = []
+    for result in render_all(unique, args.back, args.render_dir, args.workers, args.art_dir, cache,
+                             args.art_cache_dir, frame_pack_dir=frame_pack_dir):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.ok:
+            paths[result.card_id] = result.path
+        else:
+            failures.append(result)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"  {summary} in {time.perf_counter() - start:.2f}s")
+    if failures:
+        print(f"\n{len(failures)} card(s) failed, no sheets written:")
+        for result in failures:
+            print(f"\n  {result.card_id}:")
+            for line in result.error.splitlines():
+                print(f"    {line}")
+        return 1
+
+    card_paths = [paths[card_id] for card_id in ids]
+    try:
+        layout = SheetLayout(page, card_size_for(card_paths[0], args.card_width), args.bleed, args.margin,
+                             args.dpi, not args.no_marks)
+        writer = open_sheet_writer(args.out, layout, None if args.lossless else args.quality)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    pages = math.ceil(len(card_paths) / layout.per_page)
+    print(f"Imposing {len(card_paths)} cards, {layout.cols}x{layout.rows} per page "
+          f"({layout.card[0]:g}x{layout.card[1]:.1f} mm + {layout.bleed:g} mm bleed at {layout.dpi} dpi) -> {args.out}")
+    start = time.perf_counter()
+    with writer:
+        for index, count in enumerate(impose(card_paths, writer), 1):
+            print(f"  [{index:>{len(str(pages))}}/{pages}] {count} cards")
+    print(f"\nDone: {writer.pages} page(s), {os.path.getsize(args.out) / 1024 / 1024:.1f} MB "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def cmd_serve(args):
+    import asyncio
+    from render_service import RenderService
+
+    frame_pack_dir = None if args.no_frame_pack else os.path.join(args.cache_dir, "frames")
+    service = RenderService(args.back, args.cards, args.art_dir, args.workers, args.cache_mb << 20,
+                            args.art_cache_dir, frame_pack_dir)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        service.close()
+    return 0
+
+
+def cmd_atlas(args):
+    from atlas import collect_sprites, pack_atlas
+
+    start = time.perf_counter()
+    sprites = collect_sprites(args.cards_dir, args.images_dir, args.card_scale, args.sprite)
+    manifest, redrawn = pack_atlas(sprites, args.out, (args.sheet_size, args.sheet_size),
+                                   args.padding, args.full)
+    elapsed = time.perf_counter() - start
+
+    print(f"Packed {len(sprites)} sprites into {len(manifest['sheets'])} sheet(s) in {args.out}")
+    if redrawn:
+        print(f"  Redrawn: {', '.join(manifest['sheets'][i] for i in redrawn)}")
+    else:
+        print("  Nothing changed")
+    print(f"  Done in {elapsed:.2f}s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Grimdark TCG card tools",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render-all", help="Render every card in a card file")
+    render.add_argument("--back", required=True, help="Card back/frame image")
+    render.add_argument("--cards", default=DEFAULT_CARDS,
+                        help="Card source: .json, cards.js or .cdb (default: cards/basic_creatures.json)")
+    render.add_argument("--out", default="rendered", help="Output directory")
+    render.add_argument("--art-dir", action="append", default=[],
+                        help="Directory with <card_id>.png art (repeatable)")
+    render.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    render.add_argument("--cache-dir", default=".render_cache",
+                        help="Content-addressed render cache (default: .render_cache)")
+    render.add_argument("--cache-size", type=int, default=512,
+                        help="Cache size limit in MB; least recently used renders are evicted")
+    render.add_argument("--no-cache", action="store_true", help="Always re-render every card")
+    render.add_argument("--art-cache-dir", default=None,
+                        help="Keep art resized to the art window here so re-renders skip decoding it")
+    render.add_argument("--export", action="store_true",
+                        help="Also write zoom/hand/board sizes (WebP) from the same render")
+    render.add_argument("--target", action="append", default=[],
+                        help="Export target name:WxH:format[:key=value,...] (repeatable, implies --export)")
+    render.add_argument("--direct-resize", action="store_true",
+                        help="Resize each target from the full card instead of from the next larger target")
+    render.add_argument("--trace", metavar="PATH",
+                        help="Record per-layer spans and write a Chrome trace-event JSON file")
+    render.add_argument("--trace-histograms", metavar="PATH",
+                        help="Write per-layer timing/allocation histograms as JSON")
+    render.add_argument("--low-memory", action="store_true",
+                        help="Reuse one canvas per worker and keep less art in memory (same output)")
+    render.set_defaults(func=cmd_render_all)
+
+    stream = commands.add_parser("render-stream",
+                                 help="Render cards one by one straight into a directory, zip or tar")
+    stream.add_argument("--back", required=True, help="Card back/frame image")
+    stream.add_argument("--cards", default=DEFAULT_CARDS,
+                        help="Card source: .json, cards.js or .cdb (default: cards/basic_creatures.json)")
+    stream.add_argument("--out", default="rendered",
+                        help="Directory, .zip, .tar/.tar.gz, or - for a tar stream on stdout")
+    stream.add_argument("--art-dir", action="append", default=[],
+                        help="Directory with <card_id>.png art (repeatable)")
+    stream.add_argument("--format", choices=("png", "webp", "jpeg"), default="png", help="Output format")
+    stream.add_argument("--quality", type=int, default=None, help="WebP/JPEG quality")
+    stream.add_argument("--max-pending", type=int, default=4,
+                        help="Cards in flight before rendering waits for the encoder (default: 4)")
+    stream.add_argument("--encode-threads", type=int, default=2, help="Encoder threads (default: 2)")
+    stream.add_argument("--workers", type=int, default=1,
+                        help="Render processes, handing cards over in shared memory (default: 1, in-process)")
+    stream.set_defaults(func=cmd_render_stream)
+
+    watch = commands.add_parser("watch", help="Re-render cards as their data, art or frame change")
+    watch.add_argument("--back", required=True, help="Card back/frame image")
+    watch.add_argument("--cards", default=DEFAULT_CARDS,
+                       help="Card source: .json, cards.js or .cdb (default: cards/basic_creatures.json)")
+    watch.add_argument("--out", default="rendered", help="Output directory")
+    watch.add_argument("--art-dir", action="append", default=[],
+                       help="Directory with <card_id>.png art (repeatable)")
+    watch.add_argument("--workers", type=int, default=None,
+                       help="Worker processes kept warm between changes (default: CPU count)")
+    watch.add_argument("--art-cache-dir", default=None,
+                       help="Keep art resized to the art window here so re-renders skip decoding it")
+    watch.add_argument("--debounce", type=float, default=0.3,
+                       help="Seconds without further changes before a batch is rendered (default: 0.3)")
+    watch.add_argument("--interval", type=float, default=0.25, help="Seconds between scans (default: 0.25)")
+    watch.add_argument("--notify-port", type=int, default=None,
+                       help="Tell the game (started with CARD_RELOAD_PORT=<port>) which images changed")
+    watch.set_defaults(func=cmd_watch)
+
+    sheets = commands.add_parser("print-sheets", help="Impose cards onto print pages (PDF or TIFF)")
+    sheets.add_argument("--back", required=True, help="Card back/frame image")
+    sheets.add_argument("--cards", default=DEFAULT_CARDS,
+                        help="Card source: .json, cards.js or .cdb (default: cards/basic_creatures.json)")
+    sheets.add_argument("--deck", help="JSON list of card ids to print, one entry per copy (default: every card)")
+    sheets.add_argument("--copies", type=int, default=1, help="Copies of each card without --deck (default: 1)")
+    sheets.add_argument("--out", default="sheets.pdf", help="Output .pdf or .tiff (default: sheets.pdf)")
+    sheets.add_argument("--render-dir", default="rendered", help="Where cards are rendered (default: rendered)")
+    sheets.add_argument("--art-dir", action="append", default=[],
+                        help="Directory with <card_id>.png art (repeatable)")
+    sheets.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    sheets.add_argument("--cache-dir", default=".render_cache",
+                        help="Content-addressed render cache (default: .render_cache)")
+    sheets.add_argument("--cache-size", type=int, default=512, help="Cache size limit in MB")
+    sheets.add_argument("--no-cache", action="store_true", help="Re-render every card")
+    sheets.add_argument("--art-cache-dir", default=None,
+                        help="Keep art resized to the art window here so re-renders skip decoding it")
+    sheets.add_argument("--page", default="letter", help="letter, legal, a4, a3 or WxH in mm (default: letter)")
+    sheets.add_argument("--dpi", type=int, default=300, help="Print resolution (default: 300)")
+    sheets.add_argument("--bleed", type=float, default=2.0, help="Bleed around each card in mm (default: 2)")
+    sheets.add_argument("--margin", type=float, default=5.0, help="Page margin in mm (default: 5)")
+    sheets.add_argument("--card-width", type=float, default=63.5,
+                        help="Trimmed card width in mm; height keeps the card's aspect (default: 63.5)")
+    sheets.add_argument("--quality", type=int, default=95, help="JPEG quality of card images in PDFs (default: 95)")
+    sheets.add_argument("--lossless", action="store_true", help="Embed card images in PDFs losslessly")
+    sheets.add_argument("--no-marks", action="store_true", help="Leave out crop marks")
+    sheets.set_defaults(func=cmd_print_sheets)
+
+    serve = commands.add_parser("serve", help="Render cards on demand over local HTTP")
+    serve.add_argument("--back", required=True, help="Card back/frame image")
+    serve.add_argument("--cards", default=DEFAULT_CARDS,
+                       help="Cards served as /card/<id>.<ext>: .json, cards.js or .cdb "
+                            "(default: cards/basic_creatures.json)")
+    serve.add_argument("--art-dir", action="append", default=[],
+                       help="Directory with <card_id>.png art (repeatable)")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=47620, help="Port (default: 47620)")
+    serve.add_argument("--workers", type=int, default=None, help="Warm worker processes (default: CPU count)")
+    serve.add_argument("--cache-mb", type=int, default=64, help="In-memory cache of recent renders in MB")
+    serve.add_argument("--art-cache-dir", default=None,
+                       help="Keep art resized to the art window here so re-renders skip decoding it")
+    serve.add_argument("--cache-dir", default=".render_cache", help="Where the frame pack is kept")
+    serve.add_argument("--no-frame-pack", action="store_true", help="Decode the back image in every worker")
+    serve.set_defaults(func=cmd_serve)
+
+    atlas = commands.add_parser("atlas", help="Pack rendered cards and UI images into atlas sheets")
+    atlas.add_argument("--cards-dir", default="rendered", help="Rendered cards (<card_id>.png)")
+    atlas.add_argument("--images-dir", default=DEFAULT_IMAGES,
+                       help="Hero portraits and UI images (default: game/images)")
+    atlas.add_argument("--out", default="atlas", help="Output directory for sheets and atlas.json")
+    atlas.add_argument("--card-scale", type=float, default=0.25,
+                       help="Scale applied to rendered cards (default: 0.25 -> 224x336)")
+    atlas.add_argument("--sheet-size", type=int, default=4096, help="Sheet width and height")
+    atlas.add_argument("--padding", type=int, default=2, help="Pixels between sprites")
+    atlas.add_argument("--sprite", action="append", default=[], help="Extra image to pack (repeatable)")
+    atlas.add_argument("--full", action="store_true", help="Ignore the previous packing and repack everything")
+    atlas.set_defaults(func=cmd_atlas)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+Creature Combat Matrix
+- Every creature against every other one in single combat, as N x N NumPy arrays
+- Rules from resolveCombat/resolveCombatAI in game/js/game.js: incorporeal,
+  deathstrike, drain, siphon, frenzy, rampage, and a second attack for feral
+- Phase is a 50% dodge per attack; results are expected values over the
+  dodge outcomes, so no sampling is involved
+- Creatures are held as a struct of arrays (one array per stat or keyword),
+  so changing a stat and recomputing takes a few milliseconds
+
+Row i attacks column j: [i, j] is the outcome of creature i attacking j on an
+otherwise empty board (a feral attacker swings again while both survive).
+Death triggers are not part of single combat.
+
+Usage:
+    python combat_matrix.py [--ai] [--top 15] [--csv matrix.csv] [--json matrix.json]
+    python combat_matrix.py --set crypt_crawler=3/5 --set wisp=2/1
+    python combat_matrix.py --check
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import engine
+from card_data import load_cards, parse_js_object
+
+DEFAULT_BASIC = os.path.join(engine.REPO_ROOT, "cards", "basic_creatures.json")
+
+# Keywords that change single combat; each is a boolean column of the table
+COMBAT_KEYWORDS = ("deathstrike", "incorporeal", "phase", "feral", "rampage", "drain", "siphon", "frenzy")
+
+PHASE_DODGE = 0.5
+
+
+class CreatureTable:
+    """
+    Struct of arrays: `attack`, `defense` and one boolean array per keyword in
+    COMBAT_KEYWORDS, all indexed like `ids`.
+    """
+
+    def __init__(self, cards):
+        self.ids = [card["id"] for card in cards]
+        self.names = [card.get("name", card["id"]) for card in cards]
+        self.index = {card_id: i for i, card_id in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            raise ValueError("duplicate creature ids")
+        self.attack = np.array([card.get("attack") or 0 for card in cards], dtype=np.int32)
+        self.defense = np.array([card.get("defense") or 0 for card in cards], dtype=np.int32)
+        self.keywords = {
+            keyword: np.array([keyword in (card.get("keywords") or ()) for card in cards], dtype=bool)
+            for keyword in COMBAT_KEYWORDS
+        }
+
+    @classmethod
+    def load(cls, cards_js=engine.DEFAULT_CARDS_JS, extra=(DEFAULT_BASIC,), tokens=False):
+        """
+        Creatures of CARD_DATABASE (and TOKENS if asked) plus those in each extra
+        card file. `cards_js` may be a compiled card database (card_db.py); its
+        extra files are already in it, so `extra` is ignored.
+        """
+        if cards_js.endswith(".cdb"):
+            from card_db import SOURCE_DATABASE, SOURCE_EXTRA, SOURCE_TOKENS, CardDB
+            with CardDB.open(cards_js) as db:
+                cards = db.cards(sources=(SOURCE_DATABASE, SOURCE_EXTRA) + ((SOURCE_TOKENS,) if tokens else ()))
+            return cls([card for card in cards if card.get("type", "").startswith(engine.CREATURE)])
+        with open(cards_js, encoding="utf-8") as f:
+            source = f.read()
+        sources = [parse_js_object(source, "CARD_DATABASE")]
+        if tokens:
+            sources.append(parse_js_object(source, "TOKENS"))
+        cards = [dict(card, id=card_id) for data in sources for card_id, card in data.items()]
+        for path in extra:
+            cards.extend(load_cards(path))
+        return cls([card for card in cards if card.get("type", "").startswith(engine.CREATURE)])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set(self, card_id, attack=None, defense=None, keywords=None):
+        """Change one creature in place (keywords: the full list of its keywords)"""
+        i = self.index[card_id]
+        if attack is not None:
+            self.attack[i] = attack
+        if defense is not None:
+            self.defense[i] = defense
+        if keywords is not None:
+            for keyword, column in self.keywords.items():
+                column[i] = keyword in keywords
+
+
+class CombatMatrix:
+    """
+    Expected outcomes of row attacking column, each an N x N float array:
+    attacker_dies/defender_dies (probabilities), attacker_defense/defender_defense
+    (remaining, 0 if dead), attacker_attack (after rampage, siphon and frenzy),
+    defender_attack (after siphon), healed (drain, before the max-health cap).
+    """
+
+    FIELDS = ("attacker_dies", "defender_dies", "attacker_defense", "defender_defense",
+              "attacker_attack", "defender_attack", "healed")
+
+    def __init__(self, table, ai, **fields):
+        self.table = table
+        self.ai = ai
+        for name in self.FIELDS:
+            setattr(self, name, fields[name])
+
+    def pair(self, attacker_id, defender_id):
+        i, j = self.table.index[attacker_id], self.table.index[defender_id]
+        return {name: float(getattr(self, name)[i, j]) for name in self.FIELDS}
+
+    def summary(self):
+        """Per creature, over all opponents: kill chance attacking, survival attacking and defending, and their mean"""
+        n = len(self.table)
+        off_diagonal = ~np.eye(n, dtype=bool)
+        kills = np.where(off_diagonal, self.defender_dies, 0).sum(axis=1) / max(1, n - 1)
+        survives_attack = np.where(off_diagonal, 1 - self.attacker_dies, 0).sum(axis=1) / max(1, n - 1)
+        survives_defense = np.where(off_diagonal, 1 - self.defender_dies, 0).sum(axis=0) / max(1, n - 1)
+        return [
+            {"id": card_id, "attack": int(self.table.attack[i]), "defense": int(self.table.defense[i]),
+             "kills": float(kills[i]), "survives_attacking": float(survives_attack[i]),
+             "survives_defending": float(survives_defense[i]),
+             "score": float(kills[i] + survives_attack[i] + survives_defense[i]) / 3}
+            for i, card_id in enumerate(self.table.ids)
+        ]
+
+
+def _strike(state, attacker_kw, defender_kw, ai):
+    """One resolveCombat on every pair at once; `state` arrays are not modified"""
+    a_attack, a_defense, d_attack, d_defense, frenzy_used = state
+
+    attack_damage = np.where(defender_kw["incorporeal"], np.maximum(1, a_attack - 1), a_attack)
+    defend_damage = np.where(attacker_kw["incorporeal"], np.maximum(1, d_attack - 1), d_attack)
+
+    a_defense = a_defense - defend_damage
+    d_defense = d_defense - attack_damage
+
+    d_defense = np.where(attacker_kw["deathstrike"] & (d_defense > 0), 0, d_defense)
+    a_defense = np.where(defender_kw["deathstrike"] & (a_defense > 0), 0, a_defense)
+
+    healed = np.where(attacker_kw["drain"], attack_damage, 0)
+
+    if not ai:
+        siphon = attacker_kw["siphon"] & (d_defense > 0)
+        a_attack = a_attack + siphon
+        a_defense = a_defense + siphon
+        d_attack = np.where(siphon, np.maximum(0, d_attack - 1), d_attack)
+
+        frenzy = attacker_kw["frenzy"] & ~frenzy_used & (a_defense > 0) & (defend_damage > 0)
+        a_attack = a_attack + 2 * frenzy
+        frenzy_used = frenzy_used | frenzy
+
+    a_attack = a_attack + (attacker_kw["rampage"] & (d_defense <= 0))
+    return (a_attack, a_defense, d_attack, d_defense, frenzy_used), healed
+
+
+def combat_matrix(table, ai=False):
+    """
+    All-pairs single combat as a CombatMatrix.
+
+    Args:
+        table: CreatureTable
+        ai: Use resolveCombatAI (the browser AI's attacks: no siphon or frenzy)
+    """
+    n = len(table)
+    shape = (n, n)
+    attacker_kw = {k: np.broadcast_to(v[:, None], shape) for k, v in table.keywords.items()}
+    defender_kw = {k: np.broadcast_to(v[None, :], shape) for k, v in table.keywords.items()}
+
+    start = (
+        np.broadcast_to(table.attack[:, None], shape),
+        np.broadcast_to(table.defense[:, None], shape),
+        np.broadcast_to(table.attack[None, :], shape),
+        np.broadcast_to(table.defense[None, :], shape),
+        np.zeros(shape, dtype=bool),
+    )
+    dodge = np.where(defender_kw["phase"], PHASE_DODGE, 0.0)
+    hit = 1 - dodge
+
+    # First attack: dodged (state unchanged) or hit
+    first_hit, first_healed = _strike(start, attacker_kw, defender_kw, ai)
+    branches = [(start, dodge, 0), (first_hit, hit, first_healed)]
+
+    # Feral: a second attack, on each branch, while both are still standing
+    leaves = []
+    for state, weight, healed in branches:
+        again = attacker_kw["feral"] & (state[1] > 0) & (state[3] > 0)
+        second, second_healed = _strike(state, attacker_kw, defender_kw, ai)
+        second_hit = tuple(np.where(again, after, before) for after, before in zip(second, state))
+        leaves.append((state, weight * np.where(again, dodge, 1.0), healed))
+        leaves.append((second_hit, weight * np.where(again, hit, 0.0), healed + np.where(again, second_healed, 0)))
+
+    fields = {name: np.zeros(shape) for name in CombatMatrix.FIELDS}
+    for (a_attack, a_defense, d_attack, d_defense, _), weight, healed in leaves:
+        fields["attacker_dies"] += weight * (a_defense <= 0)
+        fields["defender_dies"] += weight * (d_defense <= 0)
+        fields["attacker_defense"] += weight * np.maximum(a_defense, 0)
+        fields["defender_defense"] += weight * np.maximum(d_defense, 0)
+        fields["attacker_attack"] += weight * a_attack
+        fields["defender_attack"] += weight * d_attack
+        fields["healed"] += weight * healed
+    return CombatMatrix(table, ai, **fields)
+
+
+# ============================================================================
+# CHECK AGAINST THE ENGINE
+# ============================================================================
+
+def _engine_card(table, i):
+    """Bare engine creature with table i's combat stats and nothing that triggers on death"""
+    card = engine.Card(table.ids[i], {"type": engine.CREATURE, "attack": int(table.attack[i]),
+                                      "defense": int(table.defense[i]),
+                                      "keywords": [k for k, column in table.keywords.items() if column[i]]})
+    card.attacks = 0
+    card.can_attack = True
+    return card
+
+
+class _FixedRandom:
+    """random() from a list, then "no dodge" (0.99) once it runs out"""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def random(self):
+        return self.values.pop(0) if self.values else 0.99
+
+
+def check(table, matrix, pool=None):
+    """Replay every pair through engine.Game for each dodge pattern; returns (pairs, mismatches)"""
+    pool = pool or engine.CardPool({}, {})
+    mismatches = []
+    n = len(table)
+    for i in range(n):
+        for j in range(n):
+            expected = {name: 0.0 for name in CombatMatrix.FIELDS}
+            dodges = 2 if table.keywords["phase"][j] else 0
+            patterns = [(a, b) for a in (True, False) for b in (True, False)] if dodges else [(False, False)]
+            for pattern in patterns:
+                weight = 1.0
+                if dodges:
+                    weight = math.prod(PHASE_DODGE if dodge else 1 - PHASE_DODGE for dodge in pattern)
+                game = engine.Game(pool, _FixedRandom(0.0 if dodge else 0.99 for dodge in pattern))
+                player, enemy = game.players
+                player.health, player.max_health = 1, 10 ** 6
+                attacker, defender = _engine_card(table, i), _engine_card(table, j)
+                player.board.append(attacker)
+                enemy.board.append(defender)
+                for _ in range(2 if attacker.kw & engine.FERAL else 1):
+                    if attacker in player.board and defender in enemy.board:
+                        game.resolve_combat(attacker, defender, ai=matrix.ai)
+                outcome = {
+                    "attacker_dies": attacker.current_defense <= 0, "defender_dies": defender.current_defense <= 0,
+                    "attacker_defense": max(0, attacker.current_defense),
+                    "defender_defense": max(0, defender.current_defense),
+                    "attacker_attack": attacker.current_attack, "defender_attack": defender.current_attack,
+                    "healed": player.health - 1,
+                }
+                for name, value in outcome.items():
+                    expected[name] += weight * value
+            got = matrix.pair(table.ids[i], table.ids[j])
+            for name, value in expected.items():
+                if abs(got[name] - value) > 1e-9:
+                    mismatches.append((table.ids[i], table.ids[j], name, got[name], value))
+    return n * n, mismatches
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _parse_set(value):
+    card_id, _, stats = value.partition("=")
+    attack, _, defense = stats.partition("/")
+    if not card_id or not attack.isdigit() or not defense.isdigit():
+        raise argparse.ArgumentTypeError(f"expected <id>=<attack>/<defense>, got {value!r}")
+    return card_id, int(attack), int(defense)
+
+
+def write_csv(matrix, path, field="defender_dies"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["attacker \\ defender"] + matrix.table.ids)
+        for card_id, row in zip(matrix.table.ids, getattr(matrix, field)):
+            writer.writerow([card_id] + [f"{value:.3f}" for value in row])
+
+
+def write_json(matrix, path):
+    data = {"ids": matrix.table.ids, "ai": matrix.ai,
+            "fields": {name: np.round(getattr(matrix, name), 4).tolist() for name in CombatMatrix.FIELDS},
+            "summary": matrix.summary()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="All-pairs creature combat matrix",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--cards", default=engine.DEFAULT_CARDS_JS,
+                        help="cards.js with CARD_DATABASE, or a compiled .cdb")
+    parser.add_argument("--extra", action="append", default=None,
+                        help="Extra card file (repeatable; default: cards/basic_creatures.json)")
+    parser.add_argument("--tokens", action="store_true", help="Include TOKENS")
+    parser.add_argument("--ai", action="store_true", help="Use resolveCombatAI (no siphon or frenzy)")
+    parser.add_argument("--set", action="append", type=_parse_set, default=[], metavar="ID=ATK/DEF",
+                        help="Override a creature's stats (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="Creatures listed in the ranking")
+    parser.add_argument("--csv", help="Write the defender-dies matrix as CSV")
+    parser.add_argument("--json", help="Write every field and the summary as JSON")
+    parser.add_argument("--check", action="store_true", help="Verify every pair against engine.py")
+    args = parser.parse_args()
+
+    extra = args.extra if args.extra is not None else [DEFAULT_BASIC]
+    table = CreatureTable.load(args.cards, extra, tokens=args.tokens)
+    for card_id, attack, defense in args.set:
+        if card_id not in table.index:
+            parser.error(f"unknown creature {card_id}")
+        table.set(card_id, attack, defense)
+
+    start = time.perf_counter()
+    matrix = combat_matrix(table, ai=args.ai)
+    elapsed = time.perf_counter() - start
+    print(f"{len(table)} creatures, {len(table) ** 2} pairs in {elapsed * 1000:.1f} ms"
+          f"{' (resolveCombatAI)' if args.ai else ''}")
+
+    print(f"\n  {'creature':<24}{'stats':>7}{'kills':>8}{'survives':>10}{'defends':>9}{'score':>8}")
+    for row in sorted(matrix.summary(), key=lambda r: -r["score"])[:args.top]:
+        print(f"  {row['id']:<24}{row['attack']:>4}/{row['defense']:<2}{row['kills']:>8.1%}"
+              f"{row['survives_attacking']:>10.1%}{row['survives_defending']:>9.1%}{row['score']:>8.3f}")
+
+    if args.csv:
+        write_csv(matrix, args.csv)
+        print(f"\nWrote {args.csv}")
+    if args.json:
+        write_json(matrix, args.json)
+        print(f"Wrote {args.json}")
+
+    if args.check:
+        pairs, mismatches = check(table, matrix)
+        for attacker, defender, name, got, expected in mismatches[:20]:
+            print(f"  MISMATCH {attacker} -> {defender} {name}: matrix {got:.4f}, engine {expected:.4f}")
+        print(f"\nChecked {pairs} pairs against engine.py: {len(mismatches)} mismatch(es)")
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,712 @@
+"""
+Rules Conformance
+- Replays scenarios through engine.py and through the browser's game/js/game.js
+  (under node) and compares the game state after every step
+- Scenarios per keyword, battlecry, haunt, curse and spell, plus whole
+  greedy-vs-greedy games played from the same random stream
+- The search AI's side of game.js too: tryAttackAI, and serializeGameForAI()
+  against search_ai's game_to_state/game_from_state
+- game.js runs unmodified in a node vm context; the DOM, timers and the log
+  are stubbed and Math.random reads the shared stream
+
+Usage:
+    python conformance.py [--games 20] [--seed 1] [-k phase] [--node node]
+
+The exit code is 1 if any scenario diverges. Needs node on the PATH (or --node).
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+
+import engine
+import search_ai
+from engine import CardPool, Game, greedy_turn
+
+CARDS_JS = engine.DEFAULT_CARDS_JS
+GAME_JS = engine.os.path.join(engine.REPO_ROOT, "game", "js", "game.js")
+
+# Random values handed to each whole game (a game uses a few hundred)
+GAME_RANDOMS = 5000
+
+HARNESS_JS = r"""
+const fs = require("fs");
+const vm = require("vm");
+const [cardsPath, gamePath] = process.argv.slice(-2);
+const input = JSON.parse(fs.readFileSync(0, "utf8"));
+
+const noop = () => {};
+const context = vm.createContext({
+    console: { log: noop, warn: noop, error: noop },
+    document: { addEventListener: noop, getElementById: () => null, querySelectorAll: () => [] },
+    queue: [],
+    stream: { values: [], used: 0 },
+});
+context.setTimeout = fn => context.queue.push(fn);
+vm.runInContext(fs.readFileSync(cardsPath, "utf8"), context, { filename: cardsPath });
+vm.runInContext(fs.readFileSync(gamePath, "utf8"), context, { filename: gamePath });
+vm.runInContext(`
+Math.random = () => {
+    if (stream.used >= stream.values.length) throw new Error("ran out of random values");
+    return stream.values[stream.used++];
+};
+render = addLog = showGameOver = showScreen = cancelDrag = function () {};
+
+function num(x) { return typeof x === "number" && !Number.isNaN(x) ? x : null; }
+
+function dumpCard(c) {
+    return {
+        id: c.id, cost: c.cost, attack: num(c.currentAttack), defense: num(c.currentDefense),
+        can_attack: !!c.canAttack, attacks: num(c.attacksThisTurn), keywords: [...c.keywords].sort(),
+        curses: (c.curses || []).map(k => [k.type, k.turns ?? null]),
+    };
+}
+
+function dump(players) {
+    return {
+        turn: game.turnNumber, over: game.gameOver, dead: game.creaturesDeadThisTurn,
+        winner: game.winner ? players.indexOf(game.winner) : null,
+        current: players.indexOf(game.currentTurn), random_used: stream.used,
+        players: players.map(p => ({
+            health: p.health, max_health: p.maxHealth, mana: p.mana, max_mana: p.maxMana,
+            fatigue: p.fatigue, curses: p.curses.map(k => k.id), deck: p.deck.map(c => c.id),
+            hand: p.hand.map(c => [c.id, c.cost]), graveyard: p.graveyard.map(c => c.id),
+            board: p.board.map(dumpCard),
+        })),
+    };
+}
+
+function makeCard(spec) {
+    if (typeof spec === "string") spec = { id: spec };
+    return spec.token ? createToken(spec.id) : createCard(spec.id);
+}
+
+function boardCard(spec) {
+    if (typeof spec === "string") spec = { id: spec };
+    const c = makeCard(spec);
+    c.currentAttack = spec.attack ?? c.attack;
+    c.currentDefense = spec.defense ?? c.defense;
+    c.canAttack = spec.can_attack ?? true;
+    c.summonedThisTurn = spec.summoned ?? false;
+    c.hasAttacked = false;
+    c.attacksThisTurn = 0;
+    c.curses = (spec.curses || []).map(([type, turns]) => turns === null ? { type } : { type, turns });
+    for (const k of spec.keywords || []) if (!c.keywords.includes(k)) c.keywords.push(k);
+    return c;
+}
+
+function setupPlayer(p, spec) {
+    p.health = spec.health ?? 30;
+    p.maxHealth = spec.max_health ?? 30;
+    p.mana = p.maxMana = spec.mana ?? 10;
+    p.fatigue = spec.fatigue ?? 0;
+    p.curses = (spec.curses || []).map(id => ({ id }));
+    p.deck = (spec.deck || []).map(makeCard);
+    p.hand = (spec.hand || []).map(makeCard);
+    p.graveyard = (spec.graveyard || []).map(makeCard);
+    p.board = (spec.board || []).map(boardCard);
+}
+
+function runScenario(s, states) {
+    queue.length = 0;
+    game.player = createPlayer("You", false);
+    game.enemy = createPlayer("Enemy", true);
+    setupPlayer(game.player, s.player || {});
+    setupPlayer(game.enemy, s.enemy || {});
+    game.turnNumber = 1;
+    game.gameOver = false;
+    game.winner = null;
+    game.creaturesDeadThisTurn = 0;
+    game.currentTurn = s.current === "enemy" ? game.enemy : game.player;
+    const players = [game.player, game.enemy];
+    const side = name => name === "enemy" ? game.enemy : game.player;
+    const target = t => t === null ? null : typeof t === "string" ? t : side(t[0]).board[t[1]];
+
+    for (const [kind, ...args] of s.actions) {
+        if (kind === "attack") {
+            tryAttack(game.player.board[args[0]], args[1] === null ? null : game.enemy.board[args[1]]);
+        } else if (kind === "ai_attack") {
+            resolveCombatAI(game.enemy.board[args[0]], game.player.board[args[1]]);
+        } else if (kind === "ai_try_attack") {
+            tryAttackAI(game.enemy.board[args[0]], args[1] === null ? null : game.player.board[args[1]]);
+        } else if (kind === "snapshot") {
+            states.push(serializeGameForAI());
+            continue;
+        } else if (kind === "play") {
+            const p = side(args[0]);
+            playCard(p, p.hand[args[1]], args[3] ?? -1, target(args[2] ?? null));
+        } else if (kind === "destroy") {
+            destroyCreature(side(args[0]), side(args[0]).board[args[1]], !!args[2]);
+        } else if (kind === "start_turn") {
+            startTurn();
+        } else if (kind === "end_turn") {
+            endTurn();
+        } else if (kind === "ai_turn") {
+            doAITurn();
+            while (queue.length) queue.shift()();
+        }
+        queue.length = 0;
+        states.push(dump(players));
+    }
+}
+
+function runGame(g, states) {
+    queue.length = 0;
+    playerDeck = null;
+    startGame();
+    const players = [game.player, game.enemy];
+    states.push(dump(players));
+    while (!game.gameOver && game.turnNumber <= g.max_turns) {
+        // doAITurn plays for game.enemy: swap roles on the first player's turns
+        const swap = game.currentTurn === players[0];
+        if (swap) [game.player, game.enemy] = [players[1], players[0]];
+        queue.length = 0;
+        doAITurn();
+        for (let step = 0; step < 2 && queue.length; step++) queue.shift()();  // attacks, then the next turn
+        queue.length = 0;
+        if (swap) [game.player, game.enemy] = players;
+        states.push(dump(players));
+    }
+}
+`, context);
+
+const results = [];
+for (const item of input) {
+    context.stream.values = item.random;
+    context.stream.used = 0;
+    // On an exception, keep the states reached so far
+    const states = [];
+    try {
+        if (item.game) context.runGame(item.game, states);
+        else context.runScenario(item, states);
+        results.push({ states });
+    } catch (e) {
+        results.push({ states, error: String(e.stack || e) });
+    }
+}
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+class SequenceRandom:
+    """random() from a fixed list, shared with the JS side"""
+
+    def __init__(self, values):
+        self.values = values
+        self.used = 0
+
+    def random(self):
+        if self.used >= len(self.values):
+            raise RuntimeError("ran out of random values")
+        value = self.values[self.used]
+        self.used += 1
+        return value
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+
+def scenario(name, actions, player=None, enemy=None, random=(), current="player"):
+    return {"name": name, "actions": actions, "player": player or {}, "enemy": enemy or {},
+            "random": list(random), "current": current}
+
+
+def _spell(name, spell, target=None, player=None, enemy=None, random=(), then=()):
+    """The player casts `spell` (added to the front of their hand) at `target`"""
+    player = dict(player or {})
+    player["hand"] = [spell] + list(player.get("hand", []))
+    return scenario(f"spell {spell}: {name}", [["play", "player", 0, target]] + list(then), player, enemy, random)
+
+
+def keyword_scenarios():
+    return [
+        scenario("deathstrike: attacker kills a bigger creature", [["attack", 0, 0]],
+                 {"board": ["eternal_executioner"]}, {"board": ["grave_knight"]}),
+        scenario("deathstrike: defender kills the attacker", [["attack", 0, 0]],
+                 {"board": ["bone_colossus"]}, {"board": ["eternal_executioner"]}),
+        scenario("deathstrike: AI attacker", [["ai_attack", 0, 0]],
+                 {"board": ["hellfire_herald"]}, {"board": ["eternal_executioner"]}),
+        scenario("drain: face", [["attack", 0, None]], {"health": 20, "board": ["blood_knight"]}),
+        scenario("drain: combat", [["attack", 0, 0]], {"health": 20, "board": ["blood_knight"]},
+                 {"board": ["bone_walker"]}),
+        scenario("drain: capped at max health", [["attack", 0, None]], {"health": 28, "board": ["blood_knight"]}),
+        scenario("drain: AI combat heals the AI", [["ai_attack", 0, 0]], {"board": ["bone_walker"]},
+                 {"health": 12, "board": ["blood_knight"]}),
+        scenario("incorporeal: defender takes 1 less", [["attack", 0, 0]], {"board": ["blood_knight"]},
+                 {"board": ["void_specter"]}),
+        scenario("incorporeal: minimum 1", [["ai_attack", 0, 0]], {"board": ["bone_walker"]},
+                 {"board": ["void_specter"]}),
+        scenario("incorporeal: minimum 1 taken", [["attack", 0, 0]], {"board": ["bone_walker"]},
+                 {"board": ["void_specter"]}),
+        scenario("incorporeal: both sides", [["attack", 0, 0]], {"board": ["void_specter"]},
+                 {"board": [{"id": "void_specter", "attack": 1}]}),
+        scenario("phase: dodges", [["attack", 0, 0]], {"board": ["blood_knight"]},
+                 {"board": ["flickering_phantom"]}, random=[0.2]),
+        scenario("phase: hit", [["attack", 0, 0]], {"board": ["blood_knight"]},
+                 {"board": ["flickering_phantom"]}, random=[0.7]),
+        scenario("phase: AI dodge and hit", [["ai_attack", 0, 0], ["ai_attack", 1, 0]],
+                 {"board": ["flickering_phantom"]}, {"board": ["bone_walker", "grave_hound"]}, random=[0.49, 0.5]),
+        scenario("feral: two attacks, not three", [["attack", 0, None], ["attack", 0, None], ["attack", 0, None]],
+                 {"board": ["alpha_predator"]}),
+        scenario("feral: AI attacks twice", [["ai_turn"]], {"board": ["bone_walker", "grave_hound"]},
+                 {"board": ["alpha_predator"]}, current="enemy"),
+        scenario("rampage: grows on a kill only", [["attack", 0, 0], ["end_turn"], ["ai_turn"], ["attack", 0, 0]],
+                 {"board": ["hunting_horror"], "deck": ["bone_walker"] * 3},
+                 {"board": ["bone_walker", "tomb_guardian"], "deck": ["bone_walker"] * 3}),
+        scenario("packHunter: counts beasts on play",
+                 [["play", "player", 0], ["play", "player", 0], ["play", "player", 0]],
+                 {"hand": ["feral_hound", "dire_wolf", "nightmare_beast"], "board": ["grave_hound"]}),
+        scenario("packHunter: update drops other buffs", [["play", "player", 0]],
+                 {"hand": ["carrion_rat"], "board": [{"id": "feral_hound", "attack": 6, "defense": 6}]}),
+        scenario("taunt: must be attacked first", [["attack", 0, None], ["attack", 0, 0], ["attack", 0, 1]],
+                 {"board": ["blood_knight"]}, {"board": ["bone_walker", "tomb_guardian"]}),
+        scenario("stealth: can't be attacked", [["attack", 0, 0], ["attack", 1, 0]],
+                 {"board": ["blood_knight", "nightstalker"]}, {"board": ["thirsting_shade"]}),
+        scenario("stealth: lost on attacking", [["attack", 0, None]], {"board": ["thirsting_shade"]}),
+        scenario("stealth: ignored by the AI", [["ai_turn"]], {"board": ["thirsting_shade"]},
+                 {"board": ["blood_knight"]}, current="enemy"),
+        scenario("siphon: steals 1/1 from a survivor", [["attack", 0, 0]], {"board": ["soul_drinker"]},
+                 {"board": ["tomb_guardian"]}),
+        scenario("siphon: not on a kill", [["attack", 0, 0]], {"board": ["soul_drinker"]},
+                 {"board": ["bone_walker"]}),
+        scenario("siphon: skipped by resolveCombatAI", [["ai_attack", 0, 0]], {"board": ["tomb_guardian"]},
+                 {"board": ["soul_drinker"]}),
+        scenario("frenzy: once, after surviving damage",
+                 [["attack", 0, 0], ["end_turn"], ["ai_turn"], ["attack", 0, 0]],
+                 {"board": [{"id": "rabid_werewolf", "defense": 6}], "deck": ["bone_walker"] * 3},
+                 {"board": ["bone_walker", "bone_walker"], "deck": ["bone_walker"] * 3}),
+        scenario("undying: returns once", [["destroy", "player", 0], ["play", "player", 0], ["destroy", "player", 0]],
+                 {"board": ["relentless_revenant"]}),
+        scenario("soulchain: leaves a shade", [["attack", 0, 0]], {"board": ["blood_knight"]},
+                 {"board": ["shambling_corpse"]}),
+        scenario("graveStrength: counts graveyard creatures", [["play", "player", 0]],
+                 {"hand": ["crypt_crawler"], "graveyard": ["bone_walker", "bone_walker", "risen_soldier"]}),
+        scenario("nightfall: +2 and Vampire Lord charges", [["play", "player", 0], ["play", "player", 0],
+                                                             ["attack", 1, None]],
+                 {"hand": ["crimson_hunter", "vampire_lord"], "mana": 10}, {"health": 14}),
+        scenario("nightfall: not at 15", [["play", "player", 0]], {"hand": ["vampire_lord"]}, {"health": 15}),
+        scenario("zealot: hits the enemy hero", [["destroy", "player", 0]], {"board": ["fanatic"]}),
+        scenario("devoted: grows when a Cultist dies", [["destroy", "player", 1], ["destroy", "player", 1]],
+                 {"board": ["blood_ritualist", "fanatic", "bone_walker"]}),
+        scenario("darkPrayer: draws with 3 Cultists", [["end_turn"]],
+                 {"board": ["blood_oracle", "fanatic", "doom_preacher", "dark_acolyte"], "deck": ["wisp"]},
+                 {"deck": ["wisp"]}),
+        scenario("darkPrayer: needs 3 Cultists", [["end_turn"]],
+                 {"board": ["blood_oracle", "fanatic"], "deck": ["wisp"]}, {"deck": ["wisp"]}),
+        scenario("torment: start of turn", [["start_turn"]],
+                 {"board": ["flame_fiend", "tormented_behemoth"], "deck": ["wisp"]}),
+        scenario("doom: damages the owner", [["attack", 0, 0]], {"board": ["bone_colossus"]},
+                 {"board": ["doom_bringer"]}),
+        scenario("rush: attacks the turn it is played", [["play", "player", 0], ["attack", 0, None]],
+                 {"hand": ["carrion_rat"]}),
+        scenario("no rush: summoning sickness", [["play", "player", 0], ["attack", 0, None]],
+                 {"hand": ["bone_walker"]}),
+        scenario("martyr: createCard drops the effect", [["play", "player", 0]],
+                 {"hand": ["forbidden_rite"], "board": ["willing_sacrifice", "doom_preacher"], "deck": ["wisp"] * 3}),
+        scenario("rush tokens: no attack limit for the player",
+                 [["play", "player", 0], ["attack", 0, None], ["attack", 0, None], ["attack", 0, None]],
+                 {"hand": ["hunting_pack"]}),
+        scenario("rush tokens: the AI skips them", [["ai_turn"]], {"deck": ["wisp"]},
+                 {"hand": ["hunting_pack"], "board": ["bone_walker"]}, current="enemy"),
+        scenario("hp cost: paid, and blocks at low health", [["play", "player", 0], ["play", "player", 0]],
+                 {"hand": ["shadow_imp", "abyssal_overlord"], "health": 5}),
+        scenario("fatigue and burn", [["start_turn"], ["start_turn"], ["start_turn"]],
+                 {"hand": ["wisp"] * 9, "deck": ["bone_walker"]}),
+        scenario("board limit", [["play", "player", 0]], {"hand": ["bone_walker"], "board": ["wisp"] * 7}),
+        scenario("board position", [["play", "player", 0, None, 1]],
+                 {"hand": ["bone_walker"], "board": ["wisp", "fanatic"]}),
+    ]
+
+
+def battlecry_scenarios():
+    play = [["play", "player", 0]]
+    return [
+        scenario("battlecry summon_per_graveyard", play,
+                 {"hand": ["corpse_harvester"], "graveyard": ["bone_walker"] * 4, "board": ["wisp"] * 4}),
+        scenario("battlecry self_damage_draw", play, {"hand": ["blood_cultist"], "deck": ["wisp", "fanatic"]}),
+        scenario("battlecry buff_tribe", play, {"hand": ["bloodlord_vasara"], "board": ["blood_thrall", "wisp"]}),
+        scenario("battlecry damage_all_enemies", play, {"hand": ["crimson_countess"]},
+                 {"board": ["bone_walker", "bone_colossus", "risen_soldier"]}),
+        scenario("battlecry buff_tribe_rush", play + [["attack", 0, None]],
+                 {"hand": ["packmother"], "board": [{"id": "grave_hound", "summoned": True, "can_attack": False}]}),
+        scenario("battlecry consume_all", play,
+                 {"hand": ["doomsayer"], "board": ["fanatic", "willing_sacrifice", "blood_ritualist"]}),
+        scenario("battlecry summon_copies", play + [["attack", 1, None], ["attack", 1, None]],
+                 {"hand": ["swarm_of_bats"], "board": ["wisp"] * 5}),
+        scenario("battlecry consume (no handler)", play, {"hand": ["soul_glutton"], "board": ["bone_walker"]}),
+        scenario("battlecry sacrifice_deal_damage (no handler)", play,
+                 {"hand": ["ritual_master"], "board": ["bone_walker"]}),
+    ]
+
+
+def haunt_scenarios():
+    return [
+        scenario("haunt damage_enemy_hero", [["attack", 0, 0], ["attack", 1, 0]],
+                 {"board": ["blood_knight", "blood_knight"]}, {"board": ["risen_soldier", "tormented_soul"]}),
+        scenario("haunt draw", [["attack", 0, 0]], {"board": ["blood_knight"]},
+                 {"board": ["wisp"], "deck": ["fanatic"]}),
+        scenario("haunt summon_token", [["attack", 0, 0]], {"board": [{"id": "blood_knight", "attack": 9}]},
+                 {"board": ["bone_colossus"]}),
+        scenario("haunt debuff_enemy", [["attack", 0, 0]],
+                 {"board": ["nightstalker", "bone_walker", "blood_knight"]}, {"board": ["haunting_wraith"]},
+                 random=[0.9]),
+        scenario("haunt damage_all_enemies", [["attack", 0, 0]],
+                 {"board": [{"id": "blood_knight", "attack": 5}, "bone_walker", "risen_soldier"]},
+                 {"board": ["banshee", "tomb_guardian"]}),
+        scenario("haunt destroy_random_enemy", [["destroy", "enemy", 0]],
+                 {"board": ["bone_walker", "relentless_revenant", "shambling_corpse"]},
+                 {"board": ["dread_phantom"]}, random=[0.4]),
+    ]
+
+
+def curse_scenarios():
+    return [
+        scenario("curse creeping_doom ticks", [["play", "player", 0, ["enemy", 0]], ["end_turn"]],
+                 {"hand": ["creeping_doom"], "deck": ["wisp"]},
+                 {"board": ["bone_colossus", "tomb_guardian"], "deck": ["wisp"]}),
+        scenario("curse mark_of_doom destroys", [["play", "player", 0, ["enemy", 0]], ["end_turn"]],
+                 {"hand": ["mark_of_doom"], "deck": ["wisp"]},
+                 {"board": ["relentless_revenant"], "deck": ["wisp"]}),
+        scenario("curse soul_leech drains", [["play", "player", 0], ["end_turn"]],
+                 {"hand": ["soul_leech"], "health": 20, "deck": ["wisp"]}, {"deck": ["wisp"]}),
+        scenario("curse on a token", [["play", "player", 0, ["enemy", 0]], ["end_turn"]],
+                 {"hand": ["creeping_doom"], "deck": ["wisp"]},
+                 {"board": [{"id": "skeleton", "token": True}], "deck": ["wisp"]}),
+    ]
+
+
+def spell_scenarios():
+    board = {"board": ["bone_walker", "blood_thrall", "grave_hound"], "deck": ["wisp", "fanatic", "dark_acolyte"],
+             "graveyard": ["bone_walker", "risen_soldier"]}
+    foes = {"board": ["tomb_guardian", "risen_soldier", "blood_knight"], "hand": ["wisp", "fanatic", "banshee"]}
+    cultists = {"board": ["fanatic", "dark_acolyte", "blood_ritualist", "bone_walker"], "deck": ["wisp"] * 3}
+    return [
+        _spell("kills and leaves a shade", "grasp_of_the_grave", ["enemy", 1], board, foes),
+        _spell("survivor, no shade", "grasp_of_the_grave", ["enemy", 0], board, foes),
+        scenario("spell soul_harvest: draws per death this turn",
+                 [["attack", 0, 0], ["attack", 1, 0], ["play", "player", 0]],
+                 {"hand": ["soul_harvest"], "board": ["blood_knight", "blood_knight"], "deck": ["wisp"] * 3},
+                 {"board": ["bone_walker", "risen_soldier"]}),
+        _spell("undead cost -2", "raise_dead", None, board, foes),
+        _spell("friendly", "corpse_explosion", ["player", 1], board, foes),
+        _spell("enemy target fizzles", "corpse_explosion", ["enemy", 1], board, foes),
+        _spell("copies a small creature", "deaths_embrace", ["enemy", 1], board, foes),
+        _spell("a token is not copied", "deaths_embrace", ["enemy", 0], board,
+               {"board": [{"id": "skeleton", "token": True}]}),
+        _spell("random picks", "mass_resurrection", None, board, foes, random=[0.9, 0.1]),
+        _spell("skeletons per grave", "army_of_the_damned", None, board, foes),
+        _spell("mana from a friendly", "consume_soul", ["player", 2], board, foes),
+        _spell("3 damage", "blood_tithe", ["enemy", 2], board, foes),
+        _spell("+3/+3 for 3 health", "sanguine_pact", ["player", 0], board, foes),
+        _spell("heals", "drain_life", ["enemy", 1], dict(board, health=25), foes),
+        _spell("dies at end of turn", "blood_frenzy", ["player", 0], board, foes,
+               then=[["attack", 0, None], ["end_turn"]]),
+        _spell("vampires gain drain", "feast_of_blood", None, dict(board, board=["blood_thrall", "nightstalker",
+                                                                                   "bone_walker"]), foes),
+        _spell("draws 3", "dark_bargain", None, board, foes),
+        _spell("2 at high health", "hemorrhage", None, board, foes),
+        _spell("4 below 15", "hemorrhage", None, board, dict(foes, health=14)),
+        _spell("everyone takes 4", "bloodbath", None, board, foes),
+        _spell("hits an untouched creature", "shadow_strike", ["enemy", 1], board, foes),
+        scenario("spell shadow_strike: not one that attacked", [["attack", 0, None], ["play", "player", 0,
+                                                                                      ["player", 0]]],
+                 {"hand": ["shadow_strike"], "board": ["blood_knight"]}),
+        _spell("stealth and +1/+1", "fade_to_black", ["player", 0], board, foes, then=[["attack", 0, None]]),
+        _spell("beasts only", "ambush", ["player", 2], board, foes, then=[["attack", 2, None]]),
+        _spell("non-beast fizzles", "ambush", ["player", 0], board, foes),
+        _spell("flags only", "veil_of_shadows", None, board, foes),
+        _spell("draws", "nightmare_spell", ["enemy", 0], board, foes),
+        _spell("wolves with rush", "hunting_pack", None, board, foes),
+        _spell("bounce an enemy", "vanish", ["enemy", 2], board, foes),
+        _spell("bounce a token keeps its stats", "vanish", ["enemy", 0], board,
+               {"board": [{"id": "wolf", "token": True, "attack": 7}]}),
+        _spell("spares stealth and elusive", "eclipse", None,
+               dict(board, board=["thirsting_shade", "wisp", "bone_walker"]),
+               dict(foes, board=["relentless_revenant", "phantom_knight", "shambling_corpse"])),
+        _spell("+2 mana", "dark_ritual", ["player", 0], board, foes),
+        _spell("fiend", "summon_fiend", ["player", 0], board, foes),
+        _spell("two sacrifices", "forbidden_rite", None, board, foes),
+        _spell("one sacrifice only", "forbidden_rite", None, dict(board, board=["bone_walker"]), foes),
+        _spell("into a 5/5", "demonic_transformation", ["enemy", 2], board, foes),
+        _spell("three cultists", "cult_gathering", None, board, foes),
+        _spell("doubles", "infernal_summoning", ["player", 2], board, foes),
+        _spell("per cultist", "mass_sacrifice", None, cultists, foes),
+        _spell("pact demons", "demonic_pact", None, board, foes, then=[["attack", 3, None], ["attack", 3, None]]),
+        _spell("-2 attack", "wither", ["enemy", 2], board, foes),
+        _spell("-2/-2", "curse_of_weakness", ["enemy", 1], board, foes),
+        _spell("-2 attack to all", "enfeeble", None, board, foes),
+        _spell("random discards", "mind_rot", None, board, foes, random=[0.5, 0.99]),
+        _spell("-1/-1 to all", "plague", None, board, foes),
+        _spell("draws 2", "dark_insight", None, board, foes),
+        _spell("low attack dies", "soul_rend", ["enemy", 1], board, foes),
+        _spell("high attack survives", "soul_rend", ["enemy", 2], board, foes),
+        _spell("damaged only", "execute", ["enemy", 0], board, dict(foes, board=[{"id": "tomb_guardian",
+                                                                                 "defense": 3}])),
+        _spell("undamaged survives", "execute", ["enemy", 0], board, foes),
+        _spell("enemy hero", "dark_bolt", "enemy_hero", board, foes),
+        _spell("creature", "dark_bolt", ["enemy", 2], board, foes),
+        _spell("any creature", "obliterate", ["player", 1], board, foes),
+        _spell("everything", "annihilate", None, dict(board, board=["relentless_revenant", "shambling_corpse"]),
+               foes),
+    ]
+
+
+def ai_scenarios():
+    return [
+        scenario("AI turn: plays costliest first and trades",
+                 [["ai_turn"]],
+                 {"board": ["bone_walker", "blood_knight"], "health": 12, "deck": ["wisp"] * 2},
+                 {"mana": 6, "hand": ["blood_tithe", "grave_knight", "fanatic", "sanguine_pact", "hemorrhage"],
+                  "board": ["grave_hound", "hunting_horror"], "deck": ["wisp"] * 2}, current="enemy"),
+        scenario("AI turn: taunt first", [["ai_turn"]],
+                 {"board": ["bone_walker", "tomb_guardian"], "deck": ["wisp"]},
+                 {"board": ["blood_knight", "alpha_predator"], "deck": ["wisp"]}, current="enemy"),
+        scenario("AI turn: skips spells it can't aim", [["ai_turn"]], {"deck": ["wisp"]},
+                 {"hand": ["vanish", "dark_bolt", "wither"], "deck": ["wisp"]}, current="enemy"),
+        scenario("AI attack: face, drain heals the AI", [["ai_try_attack", 0, None]], {"health": 20},
+                 {"health": 12, "board": ["blood_knight"]}, current="enemy"),
+        scenario("AI attack: taunt, stealth and feral", [["ai_try_attack", 0, None], ["ai_try_attack", 0, 0],
+                                                          ["ai_try_attack", 1, 0], ["ai_try_attack", 1, None],
+                                                          ["ai_try_attack", 1, None], ["ai_try_attack", 1, None]],
+                 {"board": ["tomb_guardian", "thirsting_shade"]},
+                 {"board": ["blood_knight", "alpha_predator"]}, current="enemy"),
+        scenario("AI attack: skips Siphon, not the player's turn", [["ai_try_attack", 0, 0], ["end_turn"],
+                                                                     ["ai_try_attack", 0, 0]],
+                 {"board": ["tomb_guardian"], "deck": ["wisp"]}, {"board": ["soul_drinker"]}, current="enemy"),
+        scenario("AI state: serializeGameForAI round trip",
+                 [["snapshot"], ["play", "player", 0], ["attack", 0, 0], ["play", "player", 0, ["enemy", 0]],
+                  ["snapshot"], ["end_turn"], ["snapshot"]],
+                 {"hand": ["carrion_rat", "mark_of_doom", "raise_dead", "wisp"], "graveyard": ["bone_walker"],
+                  "board": [{"id": "relentless_revenant", "curses": [["creeping_doom", None]]}],
+                  "curses": ["soul_leech"], "deck": ["wisp"] * 3},
+                 {"board": ["flickering_phantom", "bone_walker"], "hand": ["vanish"], "deck": ["wisp"] * 2},
+                 random=[0.7]),
+    ]
+
+
+def all_scenarios():
+    return keyword_scenarios() + battlecry_scenarios() + haunt_scenarios() + curse_scenarios() + \
+        spell_scenarios() + ai_scenarios()
+
+
+# ============================================================================
+# PYTHON SIDE
+# ============================================================================
+
+def _curse_dump(curse):
+    return [curse[0], curse[1]]
+
+
+def _card_dump(c):
+    return {
+        "id": c.id, "cost": c.cost, "attack": c.current_attack, "defense": c.current_defense,
+        "can_attack": bool(c.can_attack), "attacks": None if c.attacks != c.attacks else c.attacks,
+        "keywords": sorted(c.keywords), "curses": [_curse_dump(k) for k in c.curses or ()],
+    }
+
+
+def dump(game, players):
+    return {
+        "turn": game.turn_number, "over": game.over, "dead": game.dead_this_turn,
+        "winner": players.index(game.winner) if game.winner else None,
+        "current": players.index(game.current), "random_used": game.rng.used,
+        "players": [{
+            "health": p.health, "max_health": p.max_health, "mana": p.mana, "max_mana": p.max_mana,
+            "fatigue": p.fatigue, "curses": list(p.curses), "deck": [c.id for c in p.deck],
+            "hand": [[c.id, c.cost] for c in p.hand], "graveyard": [c.id for c in p.graveyard],
+            "board": [_card_dump(c) for c in p.board],
+        } for p in players],
+    }
+
+
+def _make_card(pool, spec):
+    spec = {"id": spec} if isinstance(spec, str) else spec
+    return pool.token(spec["id"]) if spec.get("token") else pool.create(spec["id"])
+
+
+def _board_card(pool, spec):
+    spec = {"id": spec} if isinstance(spec, str) else spec
+    c = _make_card(pool, spec)
+    c.current_attack = spec.get("attack", c.attack)
+    c.current_defense = spec.get("defense", c.defense)
+    c.can_attack = spec.get("can_attack", True)
+    c.summoned = spec.get("summoned", False)
+    c.has_attacked = False
+    c.attacks = 0
+    c.curses = [list(curse) for curse in spec.get("curses", ())]
+    c.kw |= engine.keyword_bits(spec.get("keywords", ()))
+    return c
+
+
+def _setup_player(pool, player, spec):
+    player.health = spec.get("health", 30)
+    player.max_health = spec.get("max_health", 30)
+    player.mana = player.max_mana = spec.get("mana", 10)
+    player.fatigue = spec.get("fatigue", 0)
+    player.curses = list(spec.get("curses", ()))
+    player.deck = [pool.cards[card_id] for card_id in spec.get("deck", ())]
+    player.hand = [_make_card(pool, s) for s in spec.get("hand", ())]
+    player.graveyard = [_make_card(pool, s) for s in spec.get("graveyard", ())]
+    player.board = [_board_card(pool, s) for s in spec.get("board", ())]
+
+
+def run_scenario(pool, spec):
+    game = Game(pool, SequenceRandom(spec["random"]))
+    players = game.players
+    player, enemy = players
+    _setup_player(pool, player, spec["player"])
+    _setup_player(pool, enemy, spec["enemy"])
+    game.turn_number = 1
+    game.current = enemy if spec["current"] == "enemy" else player
+
+    def side(name):
+        return enemy if name == "enemy" else player
+
+    def target(t):
+        if t is None or isinstance(t, str):
+            return t
+        return side(t[0]).board[t[1]]
+
+    states = []
+    for kind, *args in spec["actions"]:
+        if kind == "attack":
+            if game.current is player:
+                game.attack(player.board[args[0]], None if args[1] is None else enemy.board[args[1]])
+        elif kind == "ai_attack":
+            current, game.current = game.current, enemy
+            game.resolve_combat(enemy.board[args[0]], player.board[args[1]], ai=True)
+            game.current = current
+        elif kind == "ai_try_attack":
+            if game.current is enemy:
+                game.attack(enemy.board[args[0]], None if args[1] is None else player.board[args[1]], ai=True)
+        elif kind == "snapshot":
+            # serializeGameForAI(), as search_ai rebuilds and re-serializes it
+            state = search_ai.game_to_state(game)
+            states.append(search_ai.game_to_state(search_ai.game_from_state(pool, json.loads(json.dumps(state)))))
+            continue
+        elif kind == "play":
+            p = side(args[0])
+            position = args[3] if len(args) > 3 else -1
+            game.play_card(p, p.hand[args[1]], position, target(args[2] if len(args) > 2 else None))
+        elif kind == "destroy":
+            game.destroy_creature(side(args[0]), side(args[0]).board[args[1]], len(args) > 2 and args[2])
+        elif kind == "start_turn":
+            game.start_turn()
+        elif kind == "end_turn":
+            if game.current is player:
+                game.end_turn()
+        elif kind == "ai_turn":
+            greedy_turn(game)
+            game.end_turn()
+        states.append(dump(game, players))
+    return states
+
+
+def run_game(pool, randoms, max_turns):
+    """Greedy vs greedy from the starter decks; roles swap like the JS harness so both sides run doAITurn"""
+    deck = pool.starter_deck()
+    game = Game.new(pool, deck, deck, rng=SequenceRandom(randoms))
+    players = game.players
+    states = [dump(game, players)]
+    while not game.over and game.turn_number <= max_turns:
+        if game.current is players[0]:
+            game.players = players[::-1]
+        greedy_turn(game)
+        game.end_turn()
+        game.players = players
+        states.append(dump(game, players))
+    return states
+
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+
+def first_difference(a, b, path=""):
+    """(path, a value, b value) of the first difference between two JSON values, or None"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b)):
+            found = first_difference(a.get(key), b.get(key), f"{path}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            found = first_difference(x, y, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    return None if a == b else (path or "(root)", a, b)
+
+
+def run_node(items, node="node"):
+    result = subprocess.run([node, "-e", HARNESS_JS, CARDS_JS, GAME_JS], input=json.dumps(items).encode(),
+                            capture_output=True, env={**engine.os.environ, "NODE_OPTIONS": ""}, check=False)
+    if result.returncode:
+        raise RuntimeError(f"node failed:\n{result.stderr.decode(errors='replace')}")
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check engine.py against game.js",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--games", type=int, default=20, help="Whole greedy-vs-greedy games to compare")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the games' random streams")
+    parser.add_argument("--max-turns", type=int, default=200, help="Turn limit per game")
+    parser.add_argument("-k", dest="filter", help="Only scenarios whose name contains this")
+    parser.add_argument("--node", default="node", help="node executable")
+    args = parser.parse_args()
+
+    pool = CardPool.from_js(CARDS_JS)
+    scenarios = [s for s in all_scenarios() if not args.filter or args.filter in s["name"]]
+    rng = random.Random(args.seed)
+    games = [] if args.filter else [
+        {"name": f"game {i + 1}", "game": {"max_turns": args.max_turns},
+         "random": [rng.random() for _ in range(GAME_RANDOMS)]}
+        for i in range(args.games)]
+
+    items = scenarios + games
+    js_results = run_node(items, args.node) if items else []
+
+    failures = 0
+    crashes = 0
+    for item, js in zip(items, js_results):
+        try:
+            if "game" in item:
+                py_states = run_game(pool, item["random"], item["game"]["max_turns"])
+            else:
+                py_states = run_scenario(pool, item)
+        except Exception as e:
+            failures += 1
+            print(f"  FAIL  {item['name']}")
+            print(f"        py: {type(e).__name__}: {e}")
+            continue
+
+        js_states = js["states"]
+        if "error" in js:
+            # game.js threw (e.g. Eclipse on a creature that already died): compare up to there
+            py_states = py_states[:len(js_states)]
+        difference = first_difference(py_states, js_states)
+        if difference is not None:
+            failures += 1
+            path, py_value, js_value = difference
+            print(f"  FAIL  {item['name']}")
+            print(f"        {path}: py={py_value!r} js={js_value!r}")
+        elif "error" in js:
+            crashes += 1
+            print(f"  js!   {item['name']}: game.js threw after {len(js_states)} states, matching until then")
+            print(f"        {js['error'].splitlines()[0]} ({js['error'].splitlines()[1].strip()})")
+        else:
+            detail = f"{len(py_states) - 1} turns" if "game" in item else f"{len(py_states)} steps"
+            print(f"  ok    {item['name']} ({detail})")
+
+    print(f"\n{len(items) - failures}/{len(items)} scenarios match game.js"
+          + (f" ({crashes} up to an exception in game.js)" if crashes else ""))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Deck Evaluation
+- Plays seeded matches between deck lists on engine.py and reports win rates
+  with Wilson confidence intervals
+- Matches are split into shards of games spread over a process pool; each
+  shard's seed is derived from (seed, deck names, shard index), so results do
+  not depend on the worker count or on scheduling
+- A matchup stops early once its interval is within --precision; shards are
+  counted in order, so where it stops is deterministic too
+- Seats alternate every game, so the first player's advantage cancels out
+- Decks: "starter" (buildStarterDeck), a tribe or tribes joined with "+"
+  (buildTribalDeck), or a JSON file holding a list of card ids
+
+Usage:
+    python deck_eval.py Undead Demon [--games 2000]
+    python deck_eval.py --gauntlet [--workers 8] [--precision 0.02] [--json results.json]
+    python deck_eval.py starter my_deck.json Vampire+Beast
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+from math import sqrt
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from engine import DEFAULT_CARDS_JS, CardPool, play_game
+
+TRIBES = ("Undead", "Demon", "Vampire", "Beast", "Spirit", "Cultist")
+
+DEFAULT_GAMES = 2000
+SHARD_GAMES = 50
+MIN_GAMES = 200
+# Stop a matchup once the 95% interval's half-width is at most this
+DEFAULT_PRECISION = 0.025
+Z = 1.96
+
+# Per-process card pool, loaded once by _init_worker
+_pool = None
+
+
+def _init_worker(cards_js):
+    global _pool
+    _pool = CardPool.load(cards_js)
+
+
+def load_deck(spec, pool):
+    """Deck list (card ids) for a deck spec: "starter", Tribe[+Tribe...] or a JSON file of card ids"""
+    if spec == "starter":
+        return pool.starter_deck()
+    if spec.endswith(".json"):
+        with open(spec, encoding="utf-8") as f:
+            deck = json.load(f)
+        unknown = sorted({card_id for card_id in deck if card_id not in pool.cards})
+        if unknown:
+            raise ValueError(f"{spec}: unknown cards {', '.join(unknown)}")
+        return deck
+    tribes = spec.split("+")
+    unknown = [tribe for tribe in tribes if not pool.ids_by_tribe(tribe)]
+    if unknown:
+        raise ValueError(f"Unknown tribe {', '.join(unknown)} (known: {', '.join(TRIBES)})")
+    return pool.tribal_deck(tribes)
+
+
+def shard_seed(seed, name_a, name_b, shard):
+    return random.Random(f"{seed}:{name_a}:{name_b}:{shard}").getrandbits(63)
+
+
+def wilson_interval(successes, n, z=Z):
+    """Wilson score interval for a proportion"""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _play_shard(job):
+    """(wins A, wins B, draws, turns) over one shard; deck A moves first in even games"""
+    deck_a, deck_b, seed, games, max_turns = job
+    rng = random.Random(seed)
+    wins_a = wins_b = draws = turns = 0
+    for i in range(games):
+        a_first = i % 2 == 0
+        first, second = (deck_a, deck_b) if a_first else (deck_b, deck_a)
+        game = play_game(_pool, first, second, seed=rng.getrandbits(63), max_turns=max_turns)
+        turns += game.turn_number
+        if game.winner is None:
+            draws += 1
+        elif (game.winner.index == 0) == a_first:
+            wins_a += 1
+        else:
+            wins_b += 1
+    return wins_a, wins_b, draws, turns
+
+
+class Matchup:
+    """Deck A against deck B: running totals over the shards counted so far"""
+
+    def __init__(self, name_a, name_b, deck_a, deck_b, games, precision, min_games, shard_games, seed, max_turns):
+        self.name_a = name_a
+        self.name_b = name_b
+        self.deck_a = deck_a
+        self.deck_b = deck_b
+        self.max_games = games
+        self.precision = precision
+        self.min_games = min_games
+        self.shard_games = shard_games
+        self.seed = seed
+        self.max_turns = max_turns
+        self.wins_a = self.wins_b = self.draws = self.turns = 0
+        self.done = False
+        self.stopped_early = False
+        self._next_shard = 0
+        self._next_counted = 0
+        self._finished = {}
+
+    @property
+    def games(self):
+        return self.wins_a + self.wins_b + self.draws
+
+    @property
+    def score(self):
+        """Deck A's wins, with draws as half a win"""
+        return self.wins_a + self.draws / 2
+
+    @property
+    def win_rate(self):
+        return self.score / self.games if self.games else 0.5
+
+    @property
+    def interval(self):
+        return wilson_interval(self.score, self.games)
+
+    def next_job(self):
+        """The next shard's job, or None if nothing is left to schedule"""
+        start = self._next_shard * self.shard_games
+        if self.done or start >= self.max_games:
+            return None
+        shard = self._next_shard
+        self._next_shard += 1
+        games = min(self.shard_games, self.max_games - start)
+        return shard, (self.deck_a, self.deck_b, shard_seed(self.seed, self.name_a, self.name_b, shard), games,
+                       self.max_turns)
+
+    def complete(self, shard, result):
+        """Record a shard; totals only advance over consecutive shards, then the stop rule is checked"""
+        self._finished[shard] = result
+        while not self.done and self._next_counted in self._finished:
+            wins_a, wins_b, draws, turns = self._finished.pop(self._next_counted)
+            self._next_counted += 1
+            self.wins_a += wins_a
+            self.wins_b += wins_b
+            self.draws += draws
+            self.turns += turns
+            low, high = self.interval
+            if self.games >= self.max_games:
+                self.done = True
+            elif self.games >= self.min_games and (high - low) / 2 <= self.precision:
+                self.done = self.stopped_early = True
+        if self.done:
+            self._finished.clear()
+
+    def to_dict(self):
+        low, high = self.interval
+        return {
+            "deck_a": self.name_a, "deck_b": self.name_b, "games": self.games, "wins_a": self.wins_a,
+            "wins_b": self.wins_b, "draws": self.draws, "win_rate_a": self.win_rate, "ci_low": low,
+            "ci_high": high, "stopped_early": self.stopped_early,
+            "turns_per_game": self.turns / self.games if self.games else 0,
+        }
+
+    def format(self):
+        low, high = self.interval
+        stop = ", stopped early" if self.stopped_early else ""
+        return (f"  {self.name_a:>16} vs {self.name_b:<16}{self.win_rate:>7.1%}  [{low:.1%}, {high:.1%}]  "
+                f"{self.games} games{stop}")
+
+
+def evaluate_decks(decks, games=DEFAULT_GAMES, precision=DEFAULT_PRECISION, min_games=MIN_GAMES, workers=None,
+                   seed=1, shard_games=SHARD_GAMES, max_turns=200, cards_js=DEFAULT_CARDS_JS, on_done=None):
+    """
+    Round-robin between decks.
+
+    Args:
+        decks: {name: deck list (card ids)}, at least two
+        games: Most games per matchup
+        precision: Stop a matchup once its 95% interval half-width is at most
+            this (after at least min_games); 0 plays every matchup in full
+        workers: Process count (default: CPU count, 1 = play in-process)
+        seed: Base seed; shard seeds derive from it and the deck names
+        shard_games: Games per shard, the unit of work handed to a worker
+        max_turns: Turns before a game is called a draw
+        on_done: Optional callback(matchup) as each matchup finishes
+
+    Returns:
+        Matchup per pair of decks, in pairing order
+    """
+    matchups = [Matchup(a, b, decks[a], decks[b], games, precision, min_games, shard_games, seed, max_turns)
+                for a, b in combinations(decks, 2)]
+    workers = workers or os.cpu_count() or 1
+
+    def finish(matchup, shard, result):
+        was_done = matchup.done
+        matchup.complete(shard, result)
+        if matchup.done and not was_done and on_done:
+            on_done(matchup)
+
+    if workers == 1:
+        _init_worker(cards_js)
+        for matchup in matchups:
+            job = matchup.next_job()
+            while job is not None:
+                finish(matchup, job[0], _play_shard(job[1]))
+                job = matchup.next_job()
+        return matchups
+
+    # Keep every worker busy, taking shards from the unfinished matchups in turn
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cards_js,)) as pool:
+        running = {}
+        turn = 0
+        while True:
+            while len(running) < workers * 2:
+                job = None
+                for i in range(len(matchups)):
+                    matchup = matchups[(turn + i) % len(matchups)]
+                    job = matchup.next_job()
+                    if job is not None:
+                        turn = (turn + i + 1) % len(matchups)
+                        running[pool.submit(_play_shard, job[1])] = (matchup, job[0])
+                        break
+                if job is None:
+                    break
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                matchup, shard = running.pop(future)
+                finish(matchup, shard, future.result())
+    return matchups
+
+
+def standings(matchups):
+    """[(deck, mean win rate over its matchups)], best first"""
+    rates = {}
+    for m in matchups:
+        rates.setdefault(m.name_a, []).append(m.win_rate)
+        rates.setdefault(m.name_b, []).append(1 - m.win_rate)
+    return sorted(((name, sum(r) / len(r)) for name, r in rates.items()), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate deck win rates from seeded engine matches",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("decks", nargs="*", help="Decks: starter, Tribe[+Tribe], or a JSON list of card ids")
+    parser.add_argument("--gauntlet", action="store_true", help=f"Round-robin of the tribes: {', '.join(TRIBES)}")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="Most games per matchup")
+    parser.add_argument("--precision", type=float, default=DEFAULT_PRECISION,
+                        help="Stop a matchup at this 95%% interval half-width (0 = never stop early)")
+    parser.add_argument("--min-games", type=int, default=MIN_GAMES, help="Games before a matchup may stop early")
+    parser.add_argument("--shard", type=int, default=SHARD_GAMES, help="Games per shard")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=1, help="Base seed")
+    parser.add_argument("--max-turns", type=int, default=200, help="Turn limit per game (then a draw)")
+    parser.add_argument("--cards", default=DEFAULT_CARDS_JS,
+                        help="cards.js or compiled .cdb to load (default: game/js/cards.js)")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    specs = list(TRIBES) if args.gauntlet else args.decks
+    if len(specs) < 2:
+        parser.error("give at least two decks, or --gauntlet")
+    if len(set(specs)) != len(specs):
+        parser.error("decks must be distinct")
+
+    pool = CardPool.load(args.cards)
+    try:
+        decks = {spec: load_deck(spec, pool) for spec in specs}
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    matchups = evaluate_decks(decks, args.games, args.precision, args.min_games, args.workers, args.seed,
+                              args.shard, args.max_turns, args.cards, on_done=lambda m: print(m.format()))
+    elapsed = time.perf_counter() - start
+    total = sum(m.games for m in matchups)
+
+    print(f"\n{len(matchups)} matchups, {total} games in {elapsed:.1f}s ({total / elapsed:.0f} games/s)")
+    print("\nStandings (mean win rate):")
+    for name, rate in standings(matchups):
+        print(f"  {name:<24}{rate:>7.1%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "precision": args.precision, "max_games": args.games,
+                       "matchups": [m.to_dict() for m in matchups],
+                       "standings": [{"deck": name, "win_rate": rate} for name, rate in standings(matchups)]},
+                      f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
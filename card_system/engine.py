@@ -0,0 +1,1324 @@
+"""
+Headless Rules Engine
+- A Python port of the rules in game/js/game.js for mass simulation: no DOM,
+  no timers, no text log
+- Optionally records structured events (play, attack, damage, death, trigger,
+  draw) for analysis instead; see event_log.py
+- Loads the same card definitions (CARD_DATABASE and TOKENS in game/js/cards.js)
+- Compact __slots__ state; keywords are bit flags
+- Games are seeded: every random choice comes from the game's own random.Random
+- greedy_turn() is the browser AI (doAITurn), so whole games run with play_game()
+
+game.players[0] is the browser's "player" (moves first), players[1] the "enemy".
+Method names follow the JS functions they port (startTurn -> start_turn, ...).
+
+The rules are mirrored as shipped, quirks included; conformance.py replays
+scenarios through both engines under node to keep it that way:
+- createCard does not copy martyrEffect, so Martyr never triggers
+  (CardPool(martyr_effects=True) plays the card text instead)
+- The "consume" and "sacrifice_deal_damage" battlecries do nothing
+- Elusive only matters to Eclipse; Veil of Shadows and Nightmare set flags
+  nothing reads, so they are not tracked here
+- updatePackHunters recomputes Pack Hunter stats from the printed ones,
+  dropping other buffs
+- Tokens put on the board with canAttack (Bats, Wolves, Pact Demons) have no
+  attack counter until the next turn: the player can attack with them any
+  number of times, the AI not at all. The counter is NaN here, as in JS
+- greedy_turn() attacks like doAITurn: Stealth is ignored and combat skips
+  Siphon and Frenzy (resolveCombatAI)
+- Eclipse on a creature an earlier death already removed throws in game.js
+  (findOwner returns null); here that creature is skipped
+
+Usage:
+    python engine.py [--games 2000] [--seed 1] [--tribes Undead,Demon]
+"""
+
+from functools import reduce
+import argparse
+import os
+import random
+import sys
+import time
+
+from card_data import parse_js_object
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CARDS_JS = os.path.join(REPO_ROOT, "game", "js", "cards.js")
+
+STARTING_HEALTH = 30
+STARTING_HAND = 4
+MAX_HAND = 10
+MAX_BOARD = 7
+MANA_CAP = 10
+
+CREATURE = "Creature"
+
+# JS `undefined` as an attack counter: never < or >= anything, stays NaN on ++
+UNSET = float("nan")
+
+# Keyword -> bit, in KEYWORDS order; keywords not listed get the next free bit
+KEYWORD_NAMES = (
+    "rush", "drain", "deathstrike", "taunt", "elusive", "stealth",
+    "battlecry", "haunt", "frenzy", "awakened",
+    "undying", "reassemble", "graveStrength", "soulchain",
+    "torment", "consume", "offering", "doom",
+    "siphon", "nightfall", "bloodScent",
+    "packHunter", "feral", "rampage",
+    "incorporeal", "phase", "possess",
+    "martyr", "devoted", "zealot", "darkPrayer",
+)
+KEYWORD_BITS = {name: 1 << i for i, name in enumerate(KEYWORD_NAMES)}
+
+RUSH = KEYWORD_BITS["rush"]
+DRAIN = KEYWORD_BITS["drain"]
+DEATHSTRIKE = KEYWORD_BITS["deathstrike"]
+TAUNT = KEYWORD_BITS["taunt"]
+ELUSIVE = KEYWORD_BITS["elusive"]
+STEALTH = KEYWORD_BITS["stealth"]
+FRENZY = KEYWORD_BITS["frenzy"]
+UNDYING = KEYWORD_BITS["undying"]
+GRAVE_STRENGTH = KEYWORD_BITS["graveStrength"]
+SOULCHAIN = KEYWORD_BITS["soulchain"]
+SIPHON = KEYWORD_BITS["siphon"]
+NIGHTFALL = KEYWORD_BITS["nightfall"]
+BLOOD_SCENT = KEYWORD_BITS["bloodScent"]
+PACK_HUNTER = KEYWORD_BITS["packHunter"]
+FERAL = KEYWORD_BITS["feral"]
+RAMPAGE = KEYWORD_BITS["rampage"]
+INCORPOREAL = KEYWORD_BITS["incorporeal"]
+PHASE = KEYWORD_BITS["phase"]
+MARTYR = KEYWORD_BITS["martyr"]
+DEVOTED = KEYWORD_BITS["devoted"]
+ZEALOT = KEYWORD_BITS["zealot"]
+DARK_PRAYER = KEYWORD_BITS["darkPrayer"]
+
+# Structured events (Game.events, see event_log.py); a trigger's amount is the
+# keyword's index in KEYWORD_NAMES
+EVENT_KINDS = ("play", "attack", "damage", "death", "trigger", "draw", "end")
+EVENT_PLAY, EVENT_ATTACK, EVENT_DAMAGE, EVENT_DEATH, EVENT_TRIGGER, EVENT_DRAW, EVENT_END = range(len(EVENT_KINDS))
+TRIGGER_CODES = {name: i for i, name in enumerate(KEYWORD_NAMES)}
+
+# getSpellTargetType; anything not listed takes no target
+SPELL_TARGETS = {}
+for _target_type, _spell_ids in (
+    ("friendly", ("sanguine_pact", "blood_frenzy", "fade_to_black", "ambush", "dark_ritual", "summon_fiend",
+                  "corpse_explosion", "consume_soul", "infernal_summoning")),
+    ("enemy", ("grasp_of_the_grave", "blood_tithe", "drain_life", "shadow_strike", "nightmare_spell", "wither",
+               "curse_of_weakness", "creeping_doom", "mark_of_doom")),
+    ("any", ("vanish", "deaths_embrace", "demonic_transformation", "soul_rend", "execute", "obliterate")),
+    ("any_or_hero", ("dark_bolt",)),
+):
+    for _spell_id in _spell_ids:
+        SPELL_TARGETS[_spell_id] = _target_type
+
+
+def keyword_bits(names):
+    """Bit mask for a list of keyword names; names the engine has no rules for are ignored"""
+    mask = 0
+    for name in names:
+        # Never grow KEYWORD_BITS: names come from client JSON in search_ai --serve
+        mask |= KEYWORD_BITS.get(name, 0)
+    return mask
+
+
+def keyword_names(mask):
+    """Keyword names set in a bit mask, in KEYWORD_BITS order"""
+    return [name for name, bit in KEYWORD_BITS.items() if mask & bit]
+
+
+def shuffle(items, rng):
+    """In-place Fisher-Yates exactly as game.js does it (same draws for the same random() stream)"""
+    draw = rng.random
+    for i in range(len(items) - 1, 0, -1):
+        j = int(draw() * (i + 1))
+        items[i], items[j] = items[j], items[i]
+
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+class Card:
+    """A card instance (createCard/createToken); pool templates are Cards too"""
+
+    __slots__ = ("id", "name", "type", "tribe", "cost", "hp_cost", "attack", "defense",
+                 "current_attack", "current_defense", "kw", "can_attack", "has_attacked", "summoned",
+                 "attacks", "curses", "haunt", "battlecry", "martyr", "torment", "doom", "is_token",
+                 "undying_used", "frenzy_used", "dies_eot")
+
+    def __init__(self, card_id, data, is_token=False, martyr=False):
+        self.id = card_id
+        self.name = data.get("name", card_id)
+        self.type = data.get("type")
+        self.tribe = data.get("tribe")
+        self.cost = data.get("cost", 0)
+        self.hp_cost = 0 if is_token else data.get("hpCost") or 0
+        self.attack = self.current_attack = data.get("attack")
+        self.defense = self.current_defense = data.get("defense")
+        self.kw = keyword_bits(data.get("keywords") or ())
+        self.can_attack = False
+        self.has_attacked = False
+        self.summoned = False
+        self.attacks = UNSET
+        self.curses = None
+        self.is_token = is_token
+        self.haunt = None if is_token else data.get("hauntEffect")
+        self.battlecry = None if is_token else data.get("battlecryEffect")
+        self.martyr = data.get("martyrEffect") if martyr and not is_token else None
+        self.torment = 0 if is_token else data.get("tormentDamage") or 0
+        self.doom = 0 if is_token else data.get("doomDamage") or 0
+        self.undying_used = False
+        self.frenzy_used = False
+        self.dies_eot = False
+
+    def copy(self):
+        card = Card.__new__(Card)
+        card.id = self.id
+        card.name = self.name
+        card.type = self.type
+        card.tribe = self.tribe
+        card.cost = self.cost
+        card.hp_cost = self.hp_cost
+        card.attack = self.attack
+        card.defense = self.defense
+        card.current_attack = self.current_attack
+        card.current_defense = self.current_defense
+        card.kw = self.kw
+        card.can_attack = self.can_attack
+        card.has_attacked = self.has_attacked
+        card.summoned = self.summoned
+        card.attacks = self.attacks
+        card.curses = [curse[:] for curse in self.curses] if self.curses is not None else None
+        card.haunt = self.haunt
+        card.battlecry = self.battlecry
+        card.martyr = self.martyr
+        card.torment = self.torment
+        card.doom = self.doom
+        card.is_token = self.is_token
+        card.undying_used = self.undying_used
+        card.frenzy_used = self.frenzy_used
+        card.dies_eot = self.dies_eot
+        return card
+
+    @property
+    def keywords(self):
+        return keyword_names(self.kw)
+
+    def __repr__(self):
+        if self.type == CREATURE:
+            return f"<{self.id} {self.current_attack}/{self.current_defense}>"
+        return f"<{self.id}>"
+
+
+class CardPool:
+    """
+    Card and token templates by id.
+
+    Args:
+        cards: {card_id: CARD_DATABASE entry}
+        tokens: {token_id: TOKENS entry}
+        martyr_effects: Give cards their martyrEffect. createCard drops it, so
+                        the browser game never triggers Martyr; the default
+                        plays the same way
+    """
+
+    def __init__(self, cards, tokens, martyr_effects=False):
+        self.cards = {card_id: Card(card_id, data, martyr=martyr_effects) for card_id, data in cards.items()}
+        self.tokens = {token_id: Card(token_id, data, is_token=True) for token_id, data in tokens.items()}
+
+    @classmethod
+    def from_js(cls, path=DEFAULT_CARDS_JS, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        return cls(parse_js_object(source, "CARD_DATABASE"), parse_js_object(source, "TOKENS"), **kwargs)
+
+    @classmethod
+    def from_db(cls, path, **kwargs):
+        """CARD_DATABASE and TOKENS out of a compiled card database (card_db.py)"""
+        from card_db import SOURCE_DATABASE, SOURCE_TOKENS, CardDB
+        with CardDB.open(path) as db:
+            cards, tokens = ({card["id"]: card for card in db.cards(sources=(source,))}
+                             for source in (SOURCE_DATABASE, SOURCE_TOKENS))
+        return cls(cards, tokens, **kwargs)
+
+    @classmethod
+    def load(cls, path=DEFAULT_CARDS_JS, **kwargs):
+        """from_db for a .cdb file, else from_js"""
+        return cls.from_db(path, **kwargs) if path.endswith(".cdb") else cls.from_js(path, **kwargs)
+
+    def create(self, card_id):
+        template = self.cards.get(card_id)
+        return template.copy() if template is not None else None
+
+    def token(self, token_id):
+        template = self.tokens.get(token_id)
+        return template.copy() if template is not None else None
+
+    def ids_by_tribe(self, tribe):
+        return [card_id for card_id, card in self.cards.items() if card.tribe == tribe]
+
+    def starter_deck(self):
+        """buildStarterDeck: two of every card (unshuffled; Game shuffles)"""
+        return [card_id for card_id in self.cards for _ in range(2)]
+
+    def tribal_deck(self, tribes, copies=2):
+        """buildTribalDeck: `copies` of every card of the given tribes (unshuffled)"""
+        return [card_id for tribe in tribes for card_id in self.ids_by_tribe(tribe) for _ in range(copies)]
+
+
+class Player:
+    """createPlayer; `deck` holds pool templates, instanced when drawn (last = top)"""
+
+    __slots__ = ("name", "index", "health", "max_health", "mana", "max_mana", "deck", "hand", "board",
+                 "graveyard", "fatigue", "curses", "opponent")
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+        self.health = self.max_health = STARTING_HEALTH
+        self.mana = self.max_mana = 0
+        self.deck = []
+        self.hand = []
+        self.board = []
+        self.graveyard = []
+        self.fatigue = 0
+        self.curses = []
+        self.opponent = None
+
+    def clone(self):
+        player = Player.__new__(Player)
+        player.name = self.name
+        player.index = self.index
+        player.health = self.health
+        player.max_health = self.max_health
+        player.mana = self.mana
+        player.max_mana = self.max_mana
+        player.deck = self.deck[:]
+        player.hand = [c.copy() for c in self.hand]
+        player.board = [c.copy() for c in self.board]
+        player.graveyard = [c.copy() for c in self.graveyard]
+        player.fatigue = self.fatigue
+        player.curses = self.curses[:]
+        player.opponent = None
+        return player
+
+
+# ============================================================================
+# GAME
+# ============================================================================
+
+class Game:
+    """
+    One match. Build it with Game.new() to deal and start the first turn, then
+    drive it with play_card/attack/end_turn or a policy such as greedy_turn.
+
+    Args:
+        pool: CardPool
+        rng: Anything with a random() method returning floats in [0, 1)
+        events: Optional recorder with record(turn, kind, side, card_id, target,
+            amount), such as event_log.EventWriter; None records nothing
+    """
+
+    __slots__ = ("pool", "rng", "players", "current", "turn_number", "over", "winner", "dead_this_turn", "events")
+
+    def __init__(self, pool, rng, events=None):
+        self.pool = pool
+        self.rng = rng
+        self.events = events
+        player, enemy = Player("You", 0), Player("Enemy", 1)
+        player.opponent, enemy.opponent = enemy, player
+        self.players = (player, enemy)
+        self.current = player
+        self.turn_number = 0
+        self.over = False
+        self.winner = None
+        self.dead_this_turn = 0
+
+    @classmethod
+    def new(cls, pool, deck_a, deck_b, seed=None, rng=None, events=None):
+        """startGame with two deck lists (card ids); unknown ids are dropped like createCard's nulls"""
+        game = cls(pool, rng if rng is not None else random.Random(seed), events)
+        for player, deck in zip(game.players, (deck_a, deck_b)):
+            player.deck = [pool.cards[card_id] for card_id in deck if card_id in pool.cards]
+            shuffle(player.deck, game.rng)
+        for _ in range(STARTING_HAND):
+            game.draw_card(game.players[0])
+            game.draw_card(game.players[1])
+        game.start_turn()
+        return game
+
+    def clone(self, rng=None):
+        """Independent copy of the game (sharing the pool and deck templates), drawing from `rng`; records no events"""
+        game = Game.__new__(Game)
+        game.pool = self.pool
+        game.rng = rng if rng is not None else self.rng
+        game.events = None
+        players = tuple(p.clone() for p in self.players)
+        players[0].opponent, players[1].opponent = players[1], players[0]
+        game.players = players
+        game.current = players[0] if self.current is self.players[0] else players[1]
+        game.winner = None if self.winner is None else players[0] if self.winner is self.players[0] else players[1]
+        game.turn_number = self.turn_number
+        game.over = self.over
+        game.dead_this_turn = self.dead_this_turn
+        return game
+
+    # === EVENTS ===
+
+    def _record(self, kind, side, card_id=None, target=None, amount=0):
+        """
+        Append an event for player index `side` (callers check self.events first).
+        `target` is a card id, "enemy_hero"/"player_hero" (relative to `side`) or None.
+        """
+        self.events.record(self.turn_number, kind, side, card_id, target, amount)
+
+    def _trigger(self, side, card, keyword):
+        self.events.record(self.turn_number, EVENT_TRIGGER, side, card.id, None, TRIGGER_CODES[keyword])
+
+    # === TURNS ===
+
+    def start_turn(self):
+        self.turn_number += 1
+        player = self.current
+        self.dead_this_turn = 0
+
+        self.process_torment(player)
+        self.process_curses(player)
+
+        if player.max_mana < MANA_CAP:
+            player.max_mana += 1
+        player.mana = player.max_mana
+
+        self.draw_card(player)
+
+        for c in player.board:
+            c.can_attack = True if c.kw & RUSH else not c.summoned
+            c.summoned = False
+            c.has_attacked = False
+            c.attacks = 0
+
+    def end_turn(self):
+        """endTurn (and the tail of doAITurn): end-of-turn effects, then the other side's turn"""
+        if self.over:
+            return
+        self.process_end_of_turn(self.current)
+        self.current = self.current.opponent
+        self.start_turn()
+
+    def process_torment(self, player):
+        for c in player.board:
+            if c.torment:
+                player.health -= c.torment
+                if self.events is not None:
+                    self._trigger(player.index, c, "torment")
+                    self._record(EVENT_DAMAGE, player.index, c.id, "player_hero", c.torment)
+        self.check_game_over()
+
+    def process_curses(self, player):
+        opponent = player.opponent
+        for curse in list(player.curses):
+            if curse == "soul_leech":
+                player.health -= 2
+                opponent.health = min(opponent.max_health, opponent.health + 2)
+                if self.events is not None:
+                    self._record(EVENT_DAMAGE, opponent.index, "soul_leech", "enemy_hero", 2)
+
+        for c in list(player.board):
+            if c.curses:
+                for curse in list(c.curses):
+                    if curse[0] == "creeping_doom":
+                        c.current_defense -= 2
+                        if self.events is not None:
+                            self._record(EVENT_DAMAGE, opponent.index, "creeping_doom", c.id, 2)
+                    if curse[0] == "mark_of_doom":
+                        curse[1] -= 1
+                        if curse[1] <= 0:
+                            self.destroy_creature(player, c)
+        self.remove_dead_creatures(player)
+        self.check_game_over()
+
+    def process_end_of_turn(self, player):
+        board = player.board
+        if any(c.kw & DARK_PRAYER for c in board) and sum(c.tribe == "Cultist" for c in board) >= 3:
+            if self.events is not None:
+                self._trigger(player.index, next(c for c in board if c.kw & DARK_PRAYER), "darkPrayer")
+            self.draw_card(player)
+
+        for c in list(board):
+            if c.dies_eot:
+                self.destroy_creature(player, c, True)
+
+    def draw_card(self, player):
+        if not player.deck:
+            player.fatigue += 1
+            player.health -= player.fatigue
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, None, "player_hero", player.fatigue)
+            self.check_game_over()
+            return None
+        if len(player.hand) >= MAX_HAND:
+            # Burned: an amount of 1 marks the drawn card as discarded
+            burned = player.deck.pop()
+            if self.events is not None:
+                self._record(EVENT_DRAW, player.index, burned.id, None, 1)
+            return None
+        card = player.deck.pop().copy()
+        player.hand.append(card)
+        if self.events is not None:
+            self._record(EVENT_DRAW, player.index, card.id)
+        return card
+
+    def check_game_over(self):
+        player, enemy = self.players
+        if player.health <= 0:
+            self.over = True
+            self.winner = enemy
+        elif enemy.health <= 0:
+            self.over = True
+            self.winner = player
+
+    # === PLAYING CARDS ===
+
+    def can_play_card(self, player, card):
+        if card.cost > player.mana:
+            return False
+        if card.hp_cost and card.hp_cost >= player.health:
+            return False
+        if card.type == CREATURE and len(player.board) >= MAX_BOARD:
+            return False
+        return True
+
+    def play_card(self, player, card, position=-1, target=None):
+        """
+        Play a card from `player`'s hand; returns False if it can't be played.
+
+        `target` is a Card on either board, "enemy_hero" or "player_hero"
+        (relative to `player`), or None. Like playCard it is not validated
+        against spell_targets(); spells fizzle on a missing or wrong target.
+        """
+        if not self.can_play_card(player, card) or card not in player.hand:
+            return False
+        player.hand.remove(card)
+        if self.events is not None:
+            self._record(EVENT_PLAY, player.index, card.id, target.id if isinstance(target, Card) else target,
+                         card.cost)
+
+        player.mana -= card.cost
+        if card.hp_cost:
+            player.health -= card.hp_cost
+
+        if card.type == CREATURE:
+            self.play_creature(player, card, position)
+        else:
+            self.play_spell(player, card, target)
+
+        self.check_game_over()
+        return True
+
+    def play_creature(self, player, card, position):
+        card.current_attack = card.attack
+        card.current_defense = card.defense
+        card.can_attack = bool(card.kw & RUSH)
+        card.summoned = True
+        card.has_attacked = False
+        card.attacks = 0
+        card.curses = []
+
+        kw = card.kw
+        events = self.events
+        if kw & GRAVE_STRENGTH:
+            bonus = sum(c.type == CREATURE for c in player.graveyard)
+            card.current_attack += bonus
+            if bonus and events is not None:
+                self._trigger(player.index, card, "graveStrength")
+        if kw & PACK_HUNTER:
+            bonus = sum(c.tribe == "Beast" for c in player.board)
+            card.current_attack += bonus
+            card.current_defense += bonus
+            if bonus and events is not None:
+                self._trigger(player.index, card, "packHunter")
+        if kw & NIGHTFALL and player.opponent.health < 15:
+            card.current_attack += 2
+            if card.id == "vampire_lord":
+                card.can_attack = True
+            if events is not None:
+                self._trigger(player.index, card, "nightfall")
+
+        if 0 <= position <= len(player.board):
+            player.board.insert(position, card)
+        else:
+            player.board.append(card)
+
+        if card.battlecry:
+            self.process_battlecry(player, card)
+        self.update_pack_hunters(player)
+
+    def process_battlecry(self, player, card):
+        effect = card.battlecry
+        kind = effect["type"]
+        enemy = player.opponent
+        events = self.events
+        if events is not None:
+            self._trigger(player.index, card, "battlecry")
+
+        if kind == "summon_per_graveyard":
+            count = min(effect["max"], sum(c.type == CREATURE for c in player.graveyard))
+            for _ in range(count):
+                self.summon_token(player, effect["token"])
+        elif kind == "self_damage_draw":
+            player.health -= effect["damage"]
+            if events is not None:
+                self._record(EVENT_DAMAGE, player.index, card.id, "player_hero", effect["damage"])
+            for _ in range(effect["draw"]):
+                self.draw_card(player)
+        elif kind == "buff_tribe":
+            for c in player.board:
+                if c.tribe == effect["tribe"] and c is not card:
+                    c.current_attack += effect["attack"]
+                    c.current_defense += effect["defense"]
+        elif kind == "damage_all_enemies":
+            for c in enemy.board:
+                c.current_defense -= effect["amount"]
+                if events is not None:
+                    self._record(EVENT_DAMAGE, player.index, card.id, c.id, effect["amount"])
+            self.remove_dead_creatures(enemy)
+        elif kind == "buff_tribe_rush":
+            for c in player.board:
+                if c.tribe == effect["tribe"] and c is not card:
+                    c.current_attack += effect["attack"]
+                    c.can_attack = True
+        elif kind == "consume_all":
+            for c in list(player.board):
+                if c is not card:
+                    card.current_attack += 2
+                    card.current_defense += 2
+                    self.destroy_creature(player, c, True)
+        elif kind == "summon_copies":
+            for _ in range(effect["count"]):
+                if len(player.board) >= MAX_BOARD:
+                    break
+                bat = self.pool.token("bat")
+                bat.can_attack = True
+                player.board.append(bat)
+
+    def update_pack_hunters(self, player):
+        bonus = sum(c.tribe == "Beast" for c in player.board) - 1
+        for c in player.board:
+            if c.kw & PACK_HUNTER:
+                c.current_attack = c.attack + bonus
+                c.current_defense = c.defense + bonus
+
+    def summon_token(self, player, token_id):
+        if len(player.board) >= MAX_BOARD:
+            return None
+        token = self.pool.token(token_id)
+        if token is not None:
+            player.board.append(token)
+        return token
+
+    def find_owner(self, creature):
+        for player in self.players:
+            if creature in player.board:
+                return player
+        return None
+
+    def reset_card(self, card):
+        template = self.pool.cards.get(card.id)
+        if template is not None:
+            card.current_attack = template.attack
+            card.current_defense = template.defense
+            card.kw = template.kw
+
+    def spell_targets(self, player, card):
+        """Targets the browser UI lets `player` pick for a spell: [None] if it takes none"""
+        target_type = SPELL_TARGETS.get(card.id, "none")
+        if target_type == "none":
+            return [None]
+        if target_type == "friendly":
+            return list(player.board)
+        if target_type == "enemy":
+            return list(player.opponent.board)
+        if target_type == "any":
+            return player.opponent.board + player.board
+        return player.opponent.board + ["enemy_hero"]
+
+    # === SPELLS ===
+
+    def play_spell(self, player, card, target):
+        handler = _SPELLS.get(card.id)
+        if handler is not None:
+            handler(self, player, player.opponent, target)
+        self.check_game_over()
+
+    def _damage_target(self, player, enemy, target, amount, source):
+        target.current_defense -= amount
+        if self.events is not None:
+            self._record(EVENT_DAMAGE, player.index, source, target.id, amount)
+        self.remove_dead_creatures(enemy)
+        self.remove_dead_creatures(player)
+
+    # DEATH
+
+    def _spell_grasp_of_the_grave(self, player, enemy, target):
+        if target:
+            target.current_defense -= 2
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, "grasp_of_the_grave", target.id, 2)
+            if target.current_defense <= 0:
+                self.summon_token(player, "shade")
+            self.remove_dead_creatures(enemy)
+            self.remove_dead_creatures(player)
+
+    def _spell_soul_harvest(self, player, enemy, target):
+        for _ in range(self.dead_this_turn):
+            self.draw_card(player)
+
+    def _spell_raise_dead(self, player, enemy, target):
+        if player.graveyard:
+            c = player.graveyard.pop()
+            if c.tribe == "Undead":
+                c.cost = max(0, c.cost - 2)
+            player.hand.append(c)
+
+    def _spell_corpse_explosion(self, player, enemy, target):
+        if target and target in player.board:
+            damage = target.current_attack
+            self.destroy_creature(player, target, True)
+            for c in enemy.board:
+                c.current_defense -= damage
+                if self.events is not None:
+                    self._record(EVENT_DAMAGE, player.index, "corpse_explosion", c.id, damage)
+            self.remove_dead_creatures(enemy)
+
+    def _spell_deaths_embrace(self, player, enemy, target):
+        if target:
+            owner = self.find_owner(target)
+            if target.current_attack <= 4 and len(player.board) < MAX_BOARD:
+                copy = self.pool.create(target.id)
+                if copy is not None:
+                    player.board.append(copy)
+            self.destroy_creature(owner, target)
+
+    def _spell_mass_resurrection(self, player, enemy, target):
+        for _ in range(3):
+            if not player.graveyard or len(player.board) >= MAX_BOARD:
+                break
+            c = player.graveyard.pop(int(self.rng.random() * len(player.graveyard)))
+            c.current_defense = 1
+            c.current_attack = c.attack
+            c.can_attack = False
+            player.board.append(c)
+
+    def _spell_army_of_the_damned(self, player, enemy, target):
+        for _ in range(sum(c.type == CREATURE for c in player.graveyard)):
+            if len(player.board) >= MAX_BOARD:
+                break
+            self.summon_token(player, "skeleton")
+
+    def _spell_consume_soul(self, player, enemy, target):
+        if target and target in player.board:
+            player.mana += target.cost
+            self.destroy_creature(player, target, True)
+
+    # BLOOD
+
+    def _spell_blood_tithe(self, player, enemy, target):
+        if target:
+            self._damage_target(player, enemy, target, 3, "blood_tithe")
+
+    def _spell_sanguine_pact(self, player, enemy, target):
+        player.health -= 3
+        if self.events is not None:
+            self._record(EVENT_DAMAGE, player.index, "sanguine_pact", "player_hero", 3)
+        if target:
+            target.current_attack += 3
+            target.current_defense += 3
+
+    def _spell_drain_life(self, player, enemy, target):
+        if target:
+            target.current_defense -= 3
+            player.health = min(player.max_health, player.health + 3)
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, "drain_life", target.id, 3)
+            self.remove_dead_creatures(enemy)
+            self.remove_dead_creatures(player)
+
+    def _spell_blood_frenzy(self, player, enemy, target):
+        if target:
+            target.current_attack += 2
+            target.can_attack = True
+            target.dies_eot = True
+
+    def _spell_feast_of_blood(self, player, enemy, target):
+        for c in player.board:
+            if c.tribe == "Vampire":
+                c.current_attack += 2
+                c.current_defense += 2
+                c.kw |= DRAIN
+
+    def _spell_dark_bargain(self, player, enemy, target):
+        for _ in range(3):
+            self.draw_card(player)
+
+    def _spell_hemorrhage(self, player, enemy, target):
+        damage = 4 if enemy.health < 15 else 2
+        enemy.health -= damage
+        if self.events is not None:
+            self._record(EVENT_DAMAGE, player.index, "hemorrhage", "enemy_hero", damage)
+
+    def _spell_bloodbath(self, player, enemy, target):
+        for c in player.board + enemy.board:
+            c.current_defense -= 4
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, "bloodbath", c.id, 4)
+        self.remove_dead_creatures(player)
+        self.remove_dead_creatures(enemy)
+
+    # SHADOW
+
+    def _spell_shadow_strike(self, player, enemy, target):
+        if target and not target.has_attacked:
+            self._damage_target(player, enemy, target, 3, "shadow_strike")
+
+    def _spell_fade_to_black(self, player, enemy, target):
+        if target:
+            target.current_attack += 1
+            target.current_defense += 1
+            target.kw |= STEALTH
+
+    def _spell_ambush(self, player, enemy, target):
+        if target and target.tribe == "Beast":
+            target.current_attack += 2
+            target.can_attack = True
+
+    def _spell_nightmare_spell(self, player, enemy, target):
+        self.draw_card(player)
+
+    def _spell_hunting_pack(self, player, enemy, target):
+        for _ in range(2):
+            if len(player.board) >= MAX_BOARD:
+                break
+            wolf = self.pool.token("wolf")
+            wolf.can_attack = True
+            player.board.append(wolf)
+
+    def _spell_vanish(self, player, enemy, target):
+        if target:
+            owner = self.find_owner(target)
+            if owner is not None:
+                owner.board.remove(target)
+                self.reset_card(target)
+                owner.hand.append(target)
+
+    def _spell_eclipse(self, player, enemy, target):
+        for c in player.board + enemy.board:
+            if not c.kw & (STEALTH | ELUSIVE):
+                self.destroy_creature(self.find_owner(c), c)
+
+    # RITUAL
+
+    def _spell_dark_ritual(self, player, enemy, target):
+        if target and target in player.board:
+            self.destroy_creature(player, target, True)
+            player.mana += 2
+
+    def _spell_summon_fiend(self, player, enemy, target):
+        if target and target in player.board:
+            self.destroy_creature(player, target, True)
+            self.summon_token(player, "fiend")
+
+    def _spell_forbidden_rite(self, player, enemy, target):
+        sacrificed = 0
+        for c in list(player.board):
+            if sacrificed >= 2:
+                break
+            self.destroy_creature(player, c, True)
+            sacrificed += 1
+        if sacrificed >= 2:
+            for _ in range(3):
+                self.draw_card(player)
+            enemy.health -= 3
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, "forbidden_rite", "enemy_hero", 3)
+
+    def _spell_demonic_transformation(self, player, enemy, target):
+        if target:
+            owner = self.find_owner(target)
+            if owner is not None:
+                demon = self.pool.token("fiend")
+                demon.attack = demon.current_attack = 5
+                demon.defense = demon.current_defense = 5
+                demon.name = "Demon"
+                owner.board[owner.board.index(target)] = demon
+
+    def _spell_cult_gathering(self, player, enemy, target):
+        for _ in range(3):
+            if len(player.board) >= MAX_BOARD:
+                break
+            self.summon_token(player, "cultist")
+
+    def _spell_infernal_summoning(self, player, enemy, target):
+        if target and target in player.board:
+            attack = target.current_attack * 2
+            defense = target.current_defense * 2
+            self.destroy_creature(player, target, True)
+            if len(player.board) < MAX_BOARD:
+                demon = self.pool.token("fiend")
+                demon.attack = demon.current_attack = attack
+                demon.defense = demon.current_defense = defense
+                demon.name = f"{attack}/{defense} Demon"
+                player.board.append(demon)
+
+    def _spell_mass_sacrifice(self, player, enemy, target):
+        cultists = [c for c in player.board if c.tribe == "Cultist"]
+        for c in cultists:
+            self.destroy_creature(player, c, True)
+        enemy.health -= len(cultists) * 2
+        if cultists and self.events is not None:
+            self._record(EVENT_DAMAGE, player.index, "mass_sacrifice", "enemy_hero", len(cultists) * 2)
+
+    def _spell_demonic_pact(self, player, enemy, target):
+        for _ in range(2):
+            if len(player.board) >= MAX_BOARD:
+                break
+            demon = self.pool.token("pact_demon")
+            demon.can_attack = True
+            player.board.append(demon)
+
+    # AFFLICTION
+
+    def _spell_wither(self, player, enemy, target):
+        if target:
+            target.current_attack = max(0, target.current_attack - 2)
+
+    def _spell_curse_of_weakness(self, player, enemy, target):
+        if target:
+            target.current_attack = max(0, target.current_attack - 2)
+            self._damage_target(player, enemy, target, 2, "curse_of_weakness")
+
+    def _spell_creeping_doom(self, player, enemy, target):
+        if target:
+            if target.curses is None:
+                target.curses = []
+            target.curses.append(["creeping_doom", None])
+
+    def _spell_soul_leech(self, player, enemy, target):
+        enemy.curses.append("soul_leech")
+
+    def _spell_enfeeble(self, player, enemy, target):
+        for c in enemy.board:
+            c.current_attack = max(0, c.current_attack - 2)
+
+    def _spell_mind_rot(self, player, enemy, target):
+        for _ in range(2):
+            if not enemy.hand:
+                break
+            del enemy.hand[int(self.rng.random() * len(enemy.hand))]
+
+    def _spell_plague(self, player, enemy, target):
+        for c in enemy.board:
+            c.current_attack = max(0, c.current_attack - 1)
+            c.current_defense -= 1
+            if self.events is not None:
+                self._record(EVENT_DAMAGE, player.index, "plague", c.id, 1)
+        self.remove_dead_creatures(enemy)
+
+    def _spell_mark_of_doom(self, player, enemy, target):
+        if target:
+            if target.curses is None:
+                target.curses = []
+            target.curses.append(["mark_of_doom", 1])
+
+    # GENERIC
+
+    def _spell_dark_insight(self, player, enemy, target):
+        self.draw_card(player)
+        self.draw_card(player)
+
+    def _spell_soul_rend(self, player, enemy, target):
+        if target and target.current_attack <= 3:
+            self.destroy_creature(self.find_owner(target), target)
+
+    def _spell_execute(self, player, enemy, target):
+        if target and target.current_defense < target.defense:
+            self.destroy_creature(self.find_owner(target), target)
+
+    def _spell_dark_bolt(self, player, enemy, target):
+        if target == "enemy_hero":
+            enemy.health -= 3
+        elif target == "player_hero":
+            player.health -= 3
+        elif target:
+            self._damage_target(player, enemy, target, 3, "dark_bolt")
+            return
+        if target and self.events is not None:
+            self._record(EVENT_DAMAGE, player.index, "dark_bolt", target, 3)
+
+    def _spell_obliterate(self, player, enemy, target):
+        if target:
+            self.destroy_creature(self.find_owner(target), target)
+
+    def _spell_annihilate(self, player, enemy, target):
+        for c in list(player.board):
+            self.destroy_creature(player, c)
+        for c in list(enemy.board):
+            self.destroy_creature(enemy, c)
+
+    # === DEATH ===
+
+    def destroy_creature(self, owner, creature, is_sacrifice=False):
+        if owner is None or creature not in owner.board:
+            return
+        owner.board.remove(creature)
+        self.dead_this_turn += 1
+        if self.events is not None:
+            # Amount 1 marks a sacrifice
+            self._record(EVENT_DEATH, owner.index, creature.id, None, int(is_sacrifice))
+
+        if creature.kw & UNDYING and not creature.undying_used:
+            if self.events is not None:
+                self._trigger(owner.index, creature, "undying")
+            creature.undying_used = True
+            creature.current_defense = creature.defense
+            creature.current_attack = creature.attack
+            owner.hand.append(creature)
+            return
+
+        self.process_death_triggers(owner, creature, is_sacrifice)
+        owner.graveyard.append(creature)
+
+    def process_death_triggers(self, owner, creature, is_sacrifice):
+        enemy = owner.opponent
+        events = self.events
+
+        if creature.kw & SOULCHAIN:
+            if events is not None:
+                self._trigger(owner.index, creature, "soulchain")
+            self.summon_token(owner, "shade")
+
+        effect = creature.haunt
+        if effect:
+            if events is not None:
+                self._trigger(owner.index, creature, "haunt")
+            kind = effect["type"]
+            if kind == "damage_enemy_hero":
+                enemy.health -= effect["amount"]
+                if events is not None:
+                    self._record(EVENT_DAMAGE, owner.index, creature.id, "enemy_hero", effect["amount"])
+            elif kind == "draw":
+                for _ in range(effect["count"]):
+                    self.draw_card(owner)
+            elif kind == "summon_token":
+                for _ in range(effect["count"]):
+                    self.summon_token(owner, effect["token"])
+            elif kind == "debuff_enemy":
+                if enemy.board:
+                    t = enemy.board[int(self.rng.random() * len(enemy.board))]
+                    t.current_attack = max(0, t.current_attack + effect["attack"])
+                    t.current_defense += effect["defense"]
+            elif kind == "damage_all_enemies":
+                for c in enemy.board:
+                    c.current_defense -= effect["amount"]
+                    if events is not None:
+                        self._record(EVENT_DAMAGE, owner.index, creature.id, c.id, effect["amount"])
+                self.remove_dead_creatures(enemy)
+            elif kind == "destroy_random_enemy":
+                if enemy.board:
+                    self.destroy_creature(enemy, enemy.board[int(self.rng.random() * len(enemy.board))])
+
+        if creature.doom:
+            owner.health -= creature.doom
+            if events is not None:
+                self._trigger(owner.index, creature, "doom")
+                self._record(EVENT_DAMAGE, owner.index, creature.id, "player_hero", creature.doom)
+
+        if creature.kw & ZEALOT:
+            enemy.health -= 2
+            if events is not None:
+                self._trigger(owner.index, creature, "zealot")
+                self._record(EVENT_DAMAGE, owner.index, creature.id, "enemy_hero", 2)
+
+        if is_sacrifice and creature.kw & MARTYR and creature.martyr:
+            effect = creature.martyr
+            times = 2 if any(c.id == "doom_preacher" for c in owner.board) else 1
+            for _ in range(times):
+                if events is not None:
+                    self._trigger(owner.index, creature, "martyr")
+                kind = effect["type"]
+                if kind == "damage_enemy_hero":
+                    enemy.health -= effect["amount"]
+                    if events is not None:
+                        self._record(EVENT_DAMAGE, owner.index, creature.id, "enemy_hero", effect["amount"])
+                elif kind == "draw":
+                    for _ in range(effect["count"]):
+                        self.draw_card(owner)
+                elif kind == "summon_token":
+                    for _ in range(effect["count"]):
+                        self.summon_token(owner, effect["token"])
+
+        if creature.tribe == "Cultist":
+            for c in owner.board:
+                if c.kw & DEVOTED:
+                    c.current_attack += 1
+                    c.current_defense += 1
+                    if events is not None:
+                        self._trigger(owner.index, c, "devoted")
+
+    def remove_dead_creatures(self, player):
+        for c in player.board:
+            if c.current_defense <= 0:
+                break
+        else:
+            return
+        for c in list(player.board):
+            if c.current_defense <= 0:
+                self.destroy_creature(player, c)
+
+    # === COMBAT ===
+
+    def can_attack(self, attacker, target=None):
+        """tryAttack's checks for the side to move; target None means the enemy hero"""
+        player = self.current
+        enemy = player.opponent
+        if self.over or not attacker.can_attack or attacker not in player.board:
+            return False
+        if attacker.attacks >= (2 if attacker.kw & FERAL else 1):
+            return False
+        if target is not None and target not in enemy.board:
+            return False
+        if (target is None or not target.kw & TAUNT) and any(c.kw & TAUNT for c in enemy.board):
+            return False
+        if target is not None and target.kw & STEALTH and not attacker.kw & BLOOD_SCENT:
+            return False
+        return True
+
+    def attack(self, attacker, target=None, ai=False):
+        """
+        tryAttack for the side to move; returns False if the attack isn't allowed.
+        With ai=True combat resolves like resolveCombatAI (the browser AI's seat).
+        """
+        if not self.can_attack(attacker, target):
+            return False
+        player = self.current
+
+        attacker.kw &= ~STEALTH
+        attacker.attacks += 1
+        attacker.has_attacked = True
+        if attacker.attacks >= (2 if attacker.kw & FERAL else 1):
+            attacker.can_attack = False
+
+        if self.events is not None:
+            self._record(EVENT_ATTACK, player.index, attacker.id, "enemy_hero" if target is None else target.id)
+        if target is None:
+            damage = attacker.current_attack
+            player.opponent.health -= damage
+            if attacker.kw & DRAIN:
+                player.health = min(player.max_health, player.health + damage)
+            if self.events is not None:
+                self._record_hero_hit(player, attacker, damage)
+        else:
+            self.resolve_combat(attacker, target, ai)
+
+        self.check_game_over()
+        return True
+
+    def _record_hero_hit(self, player, attacker, damage):
+        self._record(EVENT_DAMAGE, player.index, attacker.id, "enemy_hero", damage)
+        if attacker.kw & DRAIN:
+            self._trigger(player.index, attacker, "drain")
+
+    def resolve_combat(self, attacker, defender, ai=False):
+        """
+        resolveCombat, or resolveCombatAI with ai=True (no Siphon or Frenzy).
+        Drain heals the side to move, which is always the attacker's owner.
+        """
+        events = self.events
+        if defender.kw & PHASE and self.rng.random() < 0.5:
+            if events is not None:
+                self._trigger(self.current.opponent.index, defender, "phase")
+            return
+
+        attack_damage = attacker.current_attack
+        defend_damage = defender.current_attack
+        if defender.kw & INCORPOREAL:
+            attack_damage = max(1, attack_damage - 1)
+        if attacker.kw & INCORPOREAL:
+            defend_damage = max(1, defend_damage - 1)
+
+        attacker.current_defense -= defend_damage
+        defender.current_defense -= attack_damage
+        if events is not None:
+            side = self.current.index
+            self._record(EVENT_DAMAGE, side, attacker.id, defender.id, attack_damage)
+            self._record(EVENT_DAMAGE, 1 - side, defender.id, attacker.id, defend_damage)
+
+        if attacker.kw & DEATHSTRIKE and defender.current_defense > 0:
+            defender.current_defense = 0
+            if events is not None:
+                self._trigger(self.current.index, attacker, "deathstrike")
+        if defender.kw & DEATHSTRIKE and attacker.current_defense > 0:
+            attacker.current_defense = 0
+            if events is not None:
+                self._trigger(self.current.opponent.index, defender, "deathstrike")
+
+        if attacker.kw & DRAIN:
+            player = self.current
+            player.health = min(player.max_health, player.health + attack_damage)
+            if events is not None:
+                self._trigger(player.index, attacker, "drain")
+
+        if not ai:
+            if attacker.kw & SIPHON and defender.current_defense > 0:
+                attacker.current_attack += 1
+                attacker.current_defense += 1
+                defender.current_attack = max(0, defender.current_attack - 1)
+                if events is not None:
+                    self._trigger(self.current.index, attacker, "siphon")
+            if (attacker.kw & FRENZY and not attacker.frenzy_used and attacker.current_defense > 0
+                    and defend_damage > 0):
+                attacker.frenzy_used = True
+                attacker.current_attack += 2
+                if events is not None:
+                    self._trigger(self.current.index, attacker, "frenzy")
+
+        if attacker.kw & RAMPAGE and defender.current_defense <= 0:
+            attacker.current_attack += 1
+            if events is not None:
+                self._trigger(self.current.index, attacker, "rampage")
+
+        self.remove_dead_creatures(self.players[0])
+        self.remove_dead_creatures(self.players[1])
+
+
+_SPELLS = {name[len("_spell_"):]: func for name, func in vars(Game).items() if name.startswith("_spell_")}
+
+
+# ============================================================================
+# AI
+# ============================================================================
+
+def _by_cost_desc(card):
+    return -card.cost
+
+
+def _highest_attack(a, b):
+    return a if a.current_attack > b.current_attack else b
+
+
+def greedy_turn(game):
+    """doAITurn for the side to move: plays (costliest first), then attacks. Call end_turn() after"""
+    if game.over:
+        return
+    me = game.current
+    opponent = me.opponent
+
+    playable = [c for c in me.hand if game.can_play_card(me, c)]
+    playable.sort(key=_by_cost_desc)
+    for card in playable:
+        if not game.can_play_card(me, card):
+            continue
+        if card.type == CREATURE:
+            game.play_card(me, card, len(me.board))
+            continue
+        # playAISpell
+        target_type = SPELL_TARGETS.get(card.id, "none")
+        if target_type == "enemy" and opponent.board:
+            game.play_card(me, card, -1, reduce(_highest_attack, opponent.board))
+        elif target_type == "friendly" and me.board:
+            game.play_card(me, card, -1, me.board[0])
+        elif target_type == "none":
+            game.play_card(me, card)
+
+    for attacker in list(me.board):
+        if game.over:
+            break
+        max_attacks = 2 if attacker.kw & FERAL else 1
+        while attacker.can_attack and attacker.attacks < max_attacks:
+            target = None
+            for c in opponent.board:
+                if c.kw & TAUNT:
+                    target = c
+                    break
+            if target is None and opponent.board and attacker.current_attack < opponent.health:
+                # Look for good trades
+                for c in opponent.board:
+                    if (attacker.current_attack >= c.current_defense
+                            and c.current_attack < attacker.current_defense):
+                        target = c
+                        break
+
+            attacker.kw &= ~STEALTH
+            attacker.attacks += 1
+            attacker.has_attacked = True
+            if attacker.attacks >= max_attacks:
+                attacker.can_attack = False
+
+            if game.events is not None:
+                game._record(EVENT_ATTACK, me.index, attacker.id, "enemy_hero" if target is None else target.id)
+            if target is None:
+                opponent.health -= attacker.current_attack
+                if attacker.kw & DRAIN:
+                    me.health = min(me.max_health, me.health + attacker.current_attack)
+                if game.events is not None:
+                    game._record_hero_hit(me, attacker, attacker.current_attack)
+                game.check_game_over()
+            else:
+                game.resolve_combat(attacker, target, ai=True)
+
+
+def play_game(pool, deck_a, deck_b, seed=None, policies=(greedy_turn, greedy_turn), max_turns=200, events=None):
+    """
+    Play one full game; deck_a moves first.
+
+    Args:
+        pool: CardPool
+        deck_a, deck_b: Deck lists (card ids)
+        seed: Seed for the game's random.Random (shuffles, Phase, random targets)
+        policies: Per side, a function(game) that plays the side to move's
+                  turn without ending it
+        max_turns: Turns (both sides counted) before the game is called a draw
+        events: Optional event recorder (see Game); the game ends with an "end"
+                event whose side is the winner's index (2 for a draw)
+
+    Returns:
+        The finished Game; game.winner is None for a draw
+    """
+    game = Game.new(pool, deck_a, deck_b, seed, events=events)
+    while not game.over and game.turn_number <= max_turns:
+        policies[game.current.index](game)
+        game.end_turn()
+    if events is not None:
+        game._record(EVENT_END, 2 if game.winner is None else game.winner.index, amount=game.turn_number)
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play greedy-vs-greedy games headless and report throughput",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--cards", default=DEFAULT_CARDS_JS,
+                        help="cards.js or compiled .cdb to load (default: game/js/cards.js)")
+    parser.add_argument("--games", type=int, default=2000, help="Games to play")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the first game; game i uses seed + i")
+    parser.add_argument("--tribes", help="Comma-separated tribes for buildTribalDeck (default: starter deck)")
+    args = parser.parse_args()
+
+    pool = CardPool.load(args.cards)
+    deck = pool.tribal_deck(args.tribes.split(",")) if args.tribes else pool.starter_deck()
+
+    wins = [0, 0, 0]
+    turns = 0
+    start = time.perf_counter()
+    for i in range(args.games):
+        game = play_game(pool, deck, deck, seed=args.seed + i)
+        wins[game.winner.index if game.winner else 2] += 1
+        turns += game.turn_number
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games in {elapsed:.2f}s: {args.games / elapsed:.0f} games/s, "
+          f"{turns / args.games:.1f} turns per game")
+    print(f"First player {wins[0]}, second player {wins[1]}, draws {wins[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
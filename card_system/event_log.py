@@ -0,0 +1,438 @@
+"""
+Event Log
+- Compact binary, append-only log of structured game events recorded by
+  engine.py: play, attack, damage, death, trigger and draw, plus one "end"
+  event per game, each with card ids, side and turn number
+- Columnar blocks: every column (game, turn, kind, side, card, target, amount)
+  is a packed little-endian array, and the block is zlib-compressed as a whole
+- Card ids are interned; each block carries only the ids new to the file, so a
+  reader builds the id table as it streams
+- Blocks hold whole games. A torn last block (an interrupted run) is ignored by
+  readers and cut off when the log is appended to
+- EventStats aggregates block by block (vectorised with NumPy when installed):
+  damage per card, average turn of death, how often each keyword triggers,
+  plays, win rates by seat, so files of any size stream in constant memory
+
+Usage:
+    python event_log.py record --games 100000 --out games.evl [Undead Demon] [--seed 1] [--append]
+    python event_log.py stats games.evl [more.evl ...] [--top 20] [--json stats.json]
+"""
+
+from array import array
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; aggregation falls back to plain loops
+    np = None
+
+from engine import (DEFAULT_CARDS_JS, EVENT_DAMAGE, EVENT_DEATH, EVENT_DRAW, EVENT_END, EVENT_KINDS, EVENT_PLAY,
+                    EVENT_TRIGGER, KEYWORD_NAMES, CardPool, play_game)
+
+EVENT_LOG_MAGIC = b"CGEVLOG\n"
+EVENT_LOG_VERSION = 1
+FILE_HEADER = struct.Struct("<8sI")
+# magic, events, games in the file after this block, id bytes, compressed column bytes
+BLOCK_HEADER = struct.Struct("<4sIIII")
+BLOCK_MAGIC = b"EVBK"
+
+# (name, array typecode) in storage order
+COLUMNS = (("game", "I"), ("turn", "H"), ("kind", "B"), ("side", "B"), ("card", "H"), ("target", "H"),
+           ("amount", "h"))
+NUMPY_TYPES = {"I": "<u4", "H": "<u2", "B": "u1", "h": "<i2"}
+
+# Card/target codes 0-2; interned card ids follow
+RESERVED_IDS = ("", "enemy_hero", "player_hero")
+
+BLOCK_GAMES = 2000
+
+
+def _pack(values, typecode):
+    data = array(typecode, values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack(data, typecode):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class EventWriter:
+    """
+    Appends events to a log file; pass it as `events` to engine.play_game.
+
+    Events are buffered and written a block at a time, every `block_games`
+    finished games and on close().
+
+    Args:
+        path: Log file; created if missing
+        append: Add to an existing log (its id table and game count carry on)
+            instead of replacing it
+        block_games: Games per block
+    """
+
+    def __init__(self, path, append=False, block_games=BLOCK_GAMES):
+        self.path = path
+        self.block_games = block_games
+        self.ids = list(RESERVED_IDS)
+        self.games = 0
+        self._codes = {card_id: code for code, card_id in enumerate(self.ids)}
+        self._rows = []
+        self._block_start = 0
+
+        if append and os.path.exists(path) and os.path.getsize(path):
+            end = FILE_HEADER.size
+            for block in _scan(path):
+                self.ids.extend(block.new_ids)
+                self.games = block.games
+                end = block.end
+            self._codes = {card_id: code for code, card_id in enumerate(self.ids)}
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(FILE_HEADER.pack(EVENT_LOG_MAGIC, EVENT_LOG_VERSION))
+        self._saved_ids = len(self.ids)
+        self._block_start = self.games
+
+    def record(self, turn, kind, side, card_id, target, amount=0):
+        """Buffer one event of the current game (engine.Game's recorder interface)"""
+        self._rows.append((self.games, turn, kind, side, card_id, target, amount))
+        if kind == EVENT_END:
+            self.games += 1
+            if self.games - self._block_start >= self.block_games:
+                self.flush()
+
+    def _code(self, card_id):
+        code = self._codes.get(card_id)
+        if code is None:
+            code = self._codes[card_id] = len(self.ids)
+            self.ids.append(card_id)
+        return code
+
+    def flush(self):
+        """Write buffered events of finished games as one block"""
+        end = len(self._rows)
+        while end and self._rows[end - 1][2] != EVENT_END:
+            end -= 1
+        if not end:
+            return
+        rows, self._rows = self._rows[:end], self._rows[end:]
+
+        games, turns, kinds, sides, cards, targets, amounts = zip(*rows)
+        code = self._code
+        columns = (games, turns, kinds, sides, [0 if c is None else code(c) for c in cards],
+                   [0 if t is None else code(t) for t in targets],
+                   [max(-32768, min(32767, a)) for a in amounts])
+        body = zlib.compress(b"".join(_pack(values, typecode) for values, (_, typecode) in zip(columns, COLUMNS)))
+        new_ids = "\n".join(self.ids[self._saved_ids:]).encode("utf-8")
+
+        self._file.write(BLOCK_HEADER.pack(BLOCK_MAGIC, len(rows), self.games, len(new_ids), len(body)))
+        self._file.write(new_ids)
+        self._file.write(body)
+        self._file.flush()
+        self._saved_ids = len(self.ids)
+        self._block_start = self.games
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class Block:
+    """One block: `columns` maps column name -> array; `ids` is the file's id table so far"""
+
+    __slots__ = ("events", "games", "new_ids", "ids", "columns", "end")
+
+    def __init__(self, events, games, new_ids, ids, columns, end):
+        self.events = events
+        self.games = games
+        self.new_ids = new_ids
+        self.ids = ids
+        self.columns = columns
+        self.end = end
+
+
+def _scan(path, decode=False):
+    """Blocks of a log in file order; stops quietly at a torn last block"""
+    ids = list(RESERVED_IDS)
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or not header.startswith(EVENT_LOG_MAGIC):
+            raise ValueError(f"{path}: not an event log")
+        magic, version = FILE_HEADER.unpack(header)
+        if version != EVENT_LOG_VERSION:
+            raise ValueError(f"{path}: event log version {version}, expected {EVENT_LOG_VERSION}")
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            magic, events, games, ids_len, body_len = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC:
+                raise ValueError(f"{path}: corrupt block at byte {f.tell() - BLOCK_HEADER.size}")
+            new_ids = f.read(ids_len)
+            if len(new_ids) < ids_len:
+                return
+            new_ids = new_ids.decode("utf-8").split("\n") if ids_len else []
+            columns = None
+            if decode:
+                body = f.read(body_len)
+                if len(body) < body_len:
+                    return
+                data = memoryview(zlib.decompress(body))
+                columns = {}
+                offset = 0
+                for name, typecode in COLUMNS:
+                    size = events * array(typecode).itemsize
+                    columns[name] = _unpack(data[offset:offset + size], typecode)
+                    offset += size
+            else:
+                f.seek(body_len, os.SEEK_CUR)
+                if f.tell() > os.fstat(f.fileno()).st_size:
+                    return
+            ids.extend(new_ids)
+            yield Block(events, games, new_ids, ids, columns, f.tell())
+
+
+def read_blocks(path):
+    """Decoded blocks of a log, one at a time"""
+    return _scan(path, decode=True)
+
+
+# ============================================================================
+# ANALYTICS
+# ============================================================================
+
+class EventStats:
+    """
+    Streaming aggregates over one or more logs; add() blocks as they are read.
+
+    Card statistics are keyed by card id (spell ids for spell damage); hero
+    targets and events without a card are left out of them.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.turns = 0
+        self.events = 0
+        self.wins = [0, 0, 0]
+        self.kinds = [0] * len(EVENT_KINDS)
+        self.triggers = {}
+        self.damage = {}
+        self.plays = {}
+        self.draws = {}
+        self.deaths = {}
+        self.death_turns = {}
+
+    def add_file(self, path):
+        for block in read_blocks(path):
+            self.add(block)
+        return self
+
+    def add(self, block):
+        self.events += block.events
+        if np is not None:
+            self._add_numpy(block)
+        else:
+            self._add_loop(block)
+
+    def _add_loop(self, block):
+        ids = block.ids
+        c = block.columns
+        kinds = self.kinds
+        for turn, kind, side, card, amount in zip(c["turn"], c["kind"], c["side"], c["card"], c["amount"]):
+            kinds[kind] += 1
+            if kind == EVENT_END:
+                self.games += 1
+                self.turns += amount
+                self.wins[side] += 1
+            elif kind == EVENT_TRIGGER:
+                name = KEYWORD_NAMES[amount]
+                self.triggers[name] = self.triggers.get(name, 0) + 1
+            elif card > 2:
+                card_id = ids[card]
+                if kind == EVENT_DAMAGE:
+                    self.damage[card_id] = self.damage.get(card_id, 0) + amount
+                elif kind == EVENT_PLAY:
+                    self.plays[card_id] = self.plays.get(card_id, 0) + 1
+                elif kind == EVENT_DRAW:
+                    self.draws[card_id] = self.draws.get(card_id, 0) + 1
+                elif kind == EVENT_DEATH:
+                    self.deaths[card_id] = self.deaths.get(card_id, 0) + 1
+                    self.death_turns[card_id] = self.death_turns.get(card_id, 0) + turn
+
+    def _add_numpy(self, block):
+        c = {name: np.frombuffer(block.columns[name], NUMPY_TYPES[typecode]) for name, typecode in COLUMNS}
+        kind, card, amount = c["kind"], c["card"], c["amount"].astype(np.int64)
+        n = len(block.ids)
+        for i, count in enumerate(np.bincount(kind, minlength=len(EVENT_KINDS))):
+            self.kinds[i] += int(count)
+
+        end = kind == EVENT_END
+        self.games += int(end.sum())
+        self.turns += int(amount[end].sum())
+        for side, count in enumerate(np.bincount(c["side"][end], minlength=3)[:3]):
+            self.wins[side] += int(count)
+
+        trigger = kind == EVENT_TRIGGER
+        for code, count in enumerate(np.bincount(amount[trigger], minlength=0)):
+            if count:
+                name = KEYWORD_NAMES[code]
+                self.triggers[name] = self.triggers.get(name, 0) + int(count)
+
+        def per_card(totals, mask, weights=None):
+            sums = np.bincount(card[mask], weights, minlength=n)
+            for code in np.flatnonzero(sums[3:]) + 3:
+                card_id = block.ids[code]
+                totals[card_id] = totals.get(card_id, 0) + int(sums[code])
+
+        damage = kind == EVENT_DAMAGE
+        per_card(self.damage, damage, amount[damage])
+        per_card(self.plays, kind == EVENT_PLAY)
+        per_card(self.draws, kind == EVENT_DRAW)
+        death = kind == EVENT_DEATH
+        per_card(self.deaths, death)
+        per_card(self.death_turns, death, c["turn"][death].astype(np.int64))
+
+    def average_death_turn(self, card_id):
+        return self.death_turns[card_id] / self.deaths[card_id]
+
+    def to_dict(self):
+        cards = sorted(self.damage.keys() | self.plays.keys() | self.deaths.keys() | self.draws.keys())
+        return {
+            "games": self.games,
+            "events": self.events,
+            "turns_per_game": self.turns / self.games if self.games else 0,
+            "wins": {"first": self.wins[0], "second": self.wins[1], "draw": self.wins[2]},
+            "events_by_kind": dict(zip(EVENT_KINDS, self.kinds)),
+            "triggers": dict(sorted(self.triggers.items(), key=lambda item: -item[1])),
+            "cards": {card_id: {
+                "damage": self.damage.get(card_id, 0),
+                "plays": self.plays.get(card_id, 0),
+                "draws": self.draws.get(card_id, 0),
+                "deaths": self.deaths.get(card_id, 0),
+                "average_death_turn": self.average_death_turn(card_id) if self.deaths.get(card_id) else None,
+            } for card_id in cards},
+        }
+
+    def format(self, top=15):
+        games = self.games or 1
+        lines = [f"{self.games} games, {self.events} events, {self.turns / games:.1f} turns per game",
+                 f"First seat {self.wins[0] / games:.1%}, second seat {self.wins[1] / games:.1%}, "
+                 f"draws {self.wins[2] / games:.1%}",
+                 "", "Damage dealt per game (top cards):"]
+        for card_id, damage in sorted(self.damage.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {card_id:<28}{damage / games:>9.2f}")
+        lines += ["", "Average turn of death (most deaths first):"]
+        for card_id, deaths in sorted(self.deaths.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {card_id:<28}{self.average_death_turn(card_id):>9.1f}   {deaths} deaths")
+        lines += ["", "Keyword triggers per game:"]
+        for name, count in sorted(self.triggers.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<28}{count / games:>9.2f}")
+        return "\n".join(lines)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def cmd_record(args):
+    from deck_eval import load_deck
+
+    pool = CardPool.load(args.cards)
+    specs = args.decks or ["starter", "starter"]
+    if len(specs) != 2:
+        print("Error: give two decks (or none for starter vs starter)", file=sys.stderr)
+        return 1
+    try:
+        deck_a, deck_b = (load_deck(spec, pool) for spec in specs)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    with EventWriter(args.out, append=args.append) as log:
+        first = log.games
+        for i in range(args.games):
+            # Seats alternate so neither deck always moves first
+            decks = (deck_a, deck_b) if i % 2 == 0 else (deck_b, deck_a)
+            play_game(pool, *decks, seed=args.seed + first + i, max_turns=args.max_turns, events=log)
+        total = log.games
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.out)
+    print(f"Recorded {args.games} games in {elapsed:.1f}s ({args.games / elapsed:.0f} games/s) -> {args.out}: "
+          f"{total} games, {size / 1024 / 1024:.1f} MB ({size / max(total, 1):.0f} bytes/game)")
+    return 0
+
+
+def cmd_stats(args):
+    start = time.perf_counter()
+    stats = EventStats()
+    try:
+        for path in args.logs:
+            stats.add_file(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(stats.format(args.top))
+    print(f"\nRead {stats.events} events in {elapsed:.2f}s ({stats.events / max(elapsed, 1e-9) / 1e6:.1f}M events/s)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, indent=1)
+        print(f"Wrote {args.json}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record simulated games as a binary event log and analyse it",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Play seeded games and append their events to a log")
+    record.add_argument("decks", nargs="*", help="Two decks: starter, Tribe[+Tribe], or a JSON list of card ids")
+    record.add_argument("--out", default="games.evl", help="Event log to write (default: games.evl)")
+    record.add_argument("--games", type=int, default=10000, help="Games to play")
+    record.add_argument("--seed", type=int, default=1, help="Seed of the log's first game; game n uses seed + n")
+    record.add_argument("--max-turns", type=int, default=200, help="Turn limit per game (then a draw)")
+    record.add_argument("--append", action="store_true", help="Add to an existing log instead of replacing it")
+    record.add_argument("--cards", default=DEFAULT_CARDS_JS,
+                        help="cards.js or compiled .cdb to load (default: game/js/cards.js)")
+    record.set_defaults(func=cmd_record)
+
+    stats = commands.add_parser("stats", help="Stream one or more logs and print aggregates")
+    stats.add_argument("logs", nargs="+", help="Event log files")
+    stats.add_argument("--top", type=int, default=15, help="Cards listed per table")
+    stats.add_argument("--json", help="Write every aggregate to this JSON file")
+    stats.set_defaults(func=cmd_stats)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
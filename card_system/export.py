@@ -0,0 +1,140 @@
+"""
+Card Export
+- Turns one rendered card into several client sizes in a single pass
+- Each target has its own format and encoder settings (PNG, WebP, AVIF)
+- Reports encoded bytes and encode time per target
+"""
+
+from PIL import Image, features
+import hashlib
+import io
+import json
+import os
+import time
+
+# Encoder options per format, passed straight to Image.save
+FORMAT_DEFAULTS = {
+    "png": {"compress_level": 9},
+    "webp": {"quality": 88, "method": 4},
+    "avif": {"quality": 70, "speed": 6},
+}
+EXTENSIONS = {"png": ".png", "webp": ".webp", "avif": ".avif"}
+
+
+class ExportTarget:
+    """One output size with its own encoder"""
+
+    def __init__(self, name, size, format="webp", **options):
+        if format not in FORMAT_DEFAULTS:
+            raise ValueError(f"Unknown format {format!r} for target {name}")
+        if format in ("webp", "avif") and not features.check(format):
+            raise ValueError(f"Pillow was built without {format.upper()} support (target {name})")
+        self.name = name
+        self.size = tuple(size)
+        self.format = format
+        self.options = dict(FORMAT_DEFAULTS[format], **options)
+
+    def spec(self):
+        return {"name": self.name, "size": list(self.size), "format": self.format, "options": self.options}
+
+    def __repr__(self):
+        return f"ExportTarget({self.name!r}, {self.size}, {self.format!r})"
+
+
+def default_targets(card_size=(896, 1344)):
+    """Zoom, hand and board sizes as successive halvings of the full card"""
+    w, h = card_size
+    return [
+        ExportTarget("zoom", (w // 2, h // 2), "webp", quality=90),
+        ExportTarget("hand", (w // 4, h // 4), "webp", quality=88),
+        ExportTarget("board", (w // 8, h // 8), "webp", quality=92),
+    ]
+
+
+def parse_target(text):
+    """Parse "name:WxH:format[:key=value,...]", e.g. "hand:224x336:webp:quality=85" """
+    parts = text.split(":")
+    if len(parts) < 3:
+        raise ValueError(f"Expected name:WxH:format[:options], got {text!r}")
+    name, size, format = parts[:3]
+    width, height = (int(v) for v in size.lower().split("x"))
+    options = {}
+    if len(parts) > 3 and parts[3]:
+        for item in parts[3].split(","):
+            key, value = item.split("=", 1)
+            options[key] = json.loads(value.lower()) if value.lower() in ("true", "false") else _number(value)
+    return ExportTarget(name, (width, height), format, **options)
+
+
+def _number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+class ExportStat:
+    """Encoded size and time for one target of one card"""
+
+    __slots__ = ("target", "path", "bytes", "resize_seconds", "encode_seconds")
+
+    def __init__(self, target, path, size, resize_seconds, encode_seconds):
+        self.target = target
+        self.path = path
+        self.bytes = size
+        self.resize_seconds = resize_seconds
+        self.encode_seconds = encode_seconds
+
+
+class Exporter:
+    """
+    Writes every target for a card image to <out_dir>/<target>/<card_id>.<ext>.
+
+    Args:
+        targets: ExportTarget list (default: default_targets())
+        out_dir: Root output directory
+        chain: Resize each target from the previous, larger one (mip chain)
+               instead of from the full card every time
+    """
+
+    def __init__(self, out_dir, targets=None, chain=True):
+        self.out_dir = out_dir
+        self.targets = sorted(targets or default_targets(), key=lambda t: -t.size[0] * t.size[1])
+        self.chain = chain
+        for target in self.targets:
+            os.makedirs(os.path.join(out_dir, target.name), exist_ok=True)
+
+    def signature(self):
+        """Hash of the export settings; part of the incremental render key"""
+        payload = {"chain": self.chain, "targets": [t.spec() for t in self.targets]}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+    def paths(self, card_id):
+        return [os.path.join(self.out_dir, t.name, card_id + EXTENSIONS[t.format]) for t in self.targets]
+
+    def export(self, image, card_id):
+        """Encode every target for one card; returns a list of ExportStat"""
+        stats = []
+        source = image
+        for target, path in zip(self.targets, self.paths(card_id)):
+            start = time.perf_counter()
+            resized = source.resize(target.size, Image.LANCZOS)
+            if target.format != "png" and resized.mode == "RGBA" and resized.getextrema()[3][0] == 255:
+                resized = resized.convert("RGB")  # opaque: skip encoding an alpha plane
+            resize_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            buffer = io.BytesIO()
+            resized.save(buffer, target.format.upper(), **target.options)
+            encode_seconds = time.perf_counter() - start
+
+            data = buffer.getvalue()
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            stats.append(ExportStat(target.name, path, len(data), resize_seconds, encode_seconds))
+            if self.chain:
+                source = resized
+        return stats
@@ -0,0 +1,103 @@
+"""
+Font Registry
+- One process-wide cache of loaded fonts keyed by (path, size)
+- Font files are found by name on a configurable list of search paths
+- A missing font falls back to Pillow's default font with a warning
+"""
+
+from PIL import ImageFont
+import os
+import warnings
+
+# Extra font directories, os.pathsep-separated, searched before the defaults
+FONT_PATH_ENV = "CARD_FONT_PATH"
+
+DEFAULT_FONT_DIRS = (
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"),
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/share/fonts/dejavu",
+    "/usr/local/share/fonts",
+    "~/.fonts",
+    "~/Library/Fonts",
+    "/Library/Fonts",
+    "C:/Windows/Fonts",
+)
+
+
+def default_search_paths():
+    """$CARD_FONT_PATH entries followed by the bundled and system font directories"""
+    env_paths = [p for p in os.environ.get(FONT_PATH_ENV, "").split(os.pathsep) if p]
+    return [os.path.expanduser(p) for p in env_paths + list(DEFAULT_FONT_DIRS)]
+
+
+class FontRegistry:
+    """
+    Loads each (font file, size) once and hands out the same object afterwards.
+
+    Args:
+        search_paths: Directories searched in order for relative font names
+                      (default: default_search_paths())
+    """
+
+    def __init__(self, search_paths=None):
+        self.search_paths = list(search_paths) if search_paths is not None else default_search_paths()
+        self._fonts = {}
+        self._resolved = {}
+        self._missing = set()
+
+    def add_path(self, path, first=True):
+        """Add a search directory (searched first by default)"""
+        path = os.path.expanduser(path)
+        if first:
+            self.search_paths.insert(0, path)
+        else:
+            self.search_paths.append(path)
+        self._resolved.clear()
+
+    def resolve(self, filename):
+        """Absolute path of a font file, or None if no search path has it"""
+        if filename not in self._resolved:
+            if os.path.isabs(filename):
+                found = filename if os.path.isfile(filename) else None
+            else:
+                candidates = (os.path.join(d, filename) for d in self.search_paths)
+                found = next((p for p in candidates if os.path.isfile(p)), None)
+            self._resolved[filename] = found
+        return self._resolved[filename]
+
+    def get(self, filename, size):
+        """FreeType font for `filename` at `size`, or Pillow's default font if it can't be loaded"""
+        path = self.resolve(filename)
+        key = (path or filename, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._load(filename, path, size)
+            self._fonts[key] = font
+        return font
+
+    def _load(self, filename, path, size):
+        if path:
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError as e:
+                reason = f"could not be loaded from {path} ({e})"
+        else:
+            reason = f"not found in {os.pathsep.join(self.search_paths)}"
+
+        if filename not in self._missing:
+            self._missing.add(filename)
+            warnings.warn(f"Font {filename} {reason}; using Pillow's default font "
+                          f"(set ${FONT_PATH_ENV} to add font directories)", stacklevel=3)
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:  # Pillow < 10.1 has no sized default font
+            return ImageFont.load_default()
+
+    def clear(self):
+        self._fonts.clear()
+        self._resolved.clear()
+
+
+# Shared by every CardBuilder in the process
+registry = FontRegistry()
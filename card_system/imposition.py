@@ -0,0 +1,338 @@
+"""
+Print Sheet Imposition
+- Lays rendered cards out on printer pages at a target DPI, as many per page
+  as fit inside the margins, with bleed around every card and crop marks at
+  each trim line
+- Bleed is made by stretching each card's outermost pixels outwards, so a
+  slightly-off cut never shows paper
+- Writes multi-page PDF or TIFF one page at a time:
+  - PDF places every card as its own image tile and draws the crop marks as
+    vectors, so no sheet is ever rasterized; a card repeated in a deck is
+    embedded once and reused
+  - TIFF rasterizes one sheet, appends it and drops it
+  Either way, a print run never holds more than one sheet in memory
+"""
+
+from abc import ABC, abstractmethod
+from PIL import Image, ImageDraw, TiffImagePlugin
+import io
+import os
+import zlib
+
+MM_PER_INCH = 25.4
+PT_PER_MM = 72 / MM_PER_INCH
+
+PAGE_SIZES = {
+    "letter": (215.9, 279.4),
+    "legal": (215.9, 355.6),
+    "a4": (210.0, 297.0),
+    "a3": (297.0, 420.0),
+}
+
+DEFAULT_DPI = 300
+DEFAULT_BLEED_MM = 2.0
+DEFAULT_MARGIN_MM = 5.0
+# Poker-card width; the height follows the rendered card's aspect ratio
+DEFAULT_CARD_WIDTH_MM = 63.5
+
+# Crop marks start this far outside the bleed and are at most this long
+MARK_OFFSET_MM = 1.5
+MARK_LENGTH_MM = 5.0
+MARK_WIDTH_PT = 0.3
+
+
+def parse_size(spec):
+    """(width, height) in mm for a page name (letter, a4, ...) or "WxH" in mm"""
+    if spec.lower() in PAGE_SIZES:
+        return PAGE_SIZES[spec.lower()]
+    try:
+        width, height = (float(part) for part in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Bad size {spec!r}: use {', '.join(PAGE_SIZES)} or WxH in mm") from None
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Bad size {spec!r}: width and height must be positive")
+    return width, height
+
+
+class SheetLayout:
+    """
+    Where cards and crop marks go on a page. Positions are in mm from the
+    page's top-left corner.
+
+    Args:
+        page: Page (width, height) in mm
+        card: Trimmed card (width, height) in mm
+        bleed: Bleed added on every side of each card, in mm
+        margin: Smallest distance from the page edge to a card's bleed, in mm
+        dpi: Resolution cards are resampled to
+        marks: Draw crop marks
+    """
+
+    def __init__(self, page, card, bleed=DEFAULT_BLEED_MM, margin=DEFAULT_MARGIN_MM, dpi=DEFAULT_DPI, marks=True):
+        self.page = page
+        self.card = card
+        self.bleed = bleed
+        self.margin = margin
+        self.dpi = dpi
+        self.marks = marks
+
+        self.cell = (card[0] + 2 * bleed, card[1] + 2 * bleed)
+        self.cols = int((page[0] - 2 * margin) // self.cell[0])
+        self.rows = int((page[1] - 2 * margin) // self.cell[1])
+        if self.cols < 1 or self.rows < 1:
+            raise ValueError(f"A {card[0]:g}x{card[1]:g} mm card with {bleed:g} mm bleed does not fit on a "
+                             f"{page[0]:g}x{page[1]:g} mm page with {margin:g} mm margins")
+        self.per_page = self.cols * self.rows
+
+        # Cells are butted together (neighbouring bleeds touch) and centred
+        self.grid = (self.cols * self.cell[0], self.rows * self.cell[1])
+        self.origin = ((page[0] - self.grid[0]) / 2, (page[1] - self.grid[1]) / 2)
+
+    def px(self, mm):
+        return round(mm / MM_PER_INCH * self.dpi)
+
+    @property
+    def page_px(self):
+        return self.px(self.page[0]), self.px(self.page[1])
+
+    def cells(self):
+        """Top-left corner (mm) of each cell, bleed included, row by row"""
+        x0, y0 = self.origin
+        return [(x0 + col * self.cell[0], y0 + row * self.cell[1])
+                for row in range(self.rows) for col in range(self.cols)]
+
+    def cells_px(self):
+        """Top-left corner (pixels) of each cell on a whole-pixel grid, so raster cells never leave a seam"""
+        x0, y0 = self.px(self.origin[0]), self.px(self.origin[1])
+        cell_w, cell_h = self.px(self.cell[0]), self.px(self.cell[1])
+        return [(x0 + col * cell_w, y0 + row * cell_h) for row in range(self.rows) for col in range(self.cols)]
+
+    def crop_marks(self):
+        """Crop mark segments ((x1, y1), (x2, y2)) in mm, in the margin around the grid"""
+        if not self.marks:
+            return []
+        x0, y0 = self.origin
+        x1, y1 = x0 + self.grid[0], y0 + self.grid[1]
+        length = min(MARK_LENGTH_MM, min(x0, y0) - MARK_OFFSET_MM)
+        if length <= 0:
+            return []
+
+        trim_xs = [x0 + col * self.cell[0] + self.bleed + edge
+                   for col in range(self.cols) for edge in (0, self.card[0])]
+        trim_ys = [y0 + row * self.cell[1] + self.bleed + edge
+                   for row in range(self.rows) for edge in (0, self.card[1])]
+        near, far = MARK_OFFSET_MM, MARK_OFFSET_MM + length
+        segments = []
+        for x in trim_xs:
+            segments.append(((x, y0 - far), (x, y0 - near)))
+            segments.append(((x, y1 + near), (x, y1 + far)))
+        for y in trim_ys:
+            segments.append(((x0 - far, y), (x0 - near, y)))
+            segments.append(((x1 + near, y), (x1 + far, y)))
+        return segments
+
+    def prepare_card(self, path):
+        """A rendered card resampled to the trim size at this DPI, with bleed added (RGB)"""
+        with Image.open(path) as image:
+            card = image.convert("RGB").resize((self.px(self.card[0]), self.px(self.card[1])), Image.LANCZOS)
+        return add_bleed(card, self.px(self.cell[0]) - card.width, self.px(self.cell[1]) - card.height)
+
+
+def add_bleed(image, extra_w, extra_h):
+    """Grow an image by (extra_w, extra_h) pixels, stretching its outermost rows and columns outwards"""
+    w, h = image.size
+    left, top = extra_w // 2, extra_h // 2
+    right, bottom = extra_w - left, extra_h - top
+    out = Image.new(image.mode, (w + extra_w, h + extra_h))
+    out.paste(image, (left, top))
+    if top:
+        out.paste(image.crop((0, 0, w, 1)).resize((w, top), Image.NEAREST), (left, 0))
+    if bottom:
+        out.paste(image.crop((0, h - 1, w, h)).resize((w, bottom), Image.NEAREST), (left, top + h))
+    # Columns are taken from `out`, whose top and bottom are already filled, so the corners are too
+    if left:
+        out.paste(out.crop((left, 0, left + 1, out.height)).resize((left, out.height), Image.NEAREST), (0, 0))
+    if right:
+        out.paste(out.crop((left + w - 1, 0, left + w, out.height)).resize((right, out.height), Image.NEAREST),
+                  (left + w, 0))
+    return out
+
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+class SheetWriter(ABC):
+    """
+    Multi-page output written one page at a time; use as a context manager.
+    The file appears under its name only once it is complete.
+    """
+
+    def __init__(self, path, layout):
+        self.path = path
+        self.layout = layout
+        self.pages = 0
+        self.tmp_path = f"{path}.tmp{os.getpid()}"
+
+    @abstractmethod
+    def add_page(self, card_paths):
+        """Write one page holding up to layout.per_page rendered cards, in reading order"""
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        self._finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._finish()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PdfSheetWriter(SheetWriter):
+    """
+    PDF with one image per card and vector crop marks, written object by
+    object; only the page list and object offsets are kept until close().
+
+    Args:
+        quality: JPEG quality for the card images, or None for lossless (Flate)
+    """
+
+    def __init__(self, path, layout, quality=95):
+        super().__init__(path, layout)
+        self.quality = quality
+        self._file = open(self.tmp_path, "wb")
+        self._offsets = {}
+        self._page_ids = []
+        self._images = {}  # card path -> image object id, so repeated cards are embedded once
+        self._next_id = 3  # 1: catalog, 2: page tree (written at the end)
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _object(self, body, obj_id=None):
+        if obj_id is None:
+            obj_id = self._next_id
+            self._next_id += 1
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+        return obj_id
+
+    def _stream(self, entries, data):
+        return self._object(f"<< {entries} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    def _image(self, path):
+        obj_id = self._images.get(path)
+        if obj_id is None:
+            card = self.layout.prepare_card(path)
+            entries = f"/Type /XObject /Subtype /Image /Width {card.width} /Height {card.height} " \
+                      f"/ColorSpace /DeviceRGB /BitsPerComponent 8"
+            if self.quality is None:
+                obj_id = self._stream(f"{entries} /Filter /FlateDecode", zlib.compress(card.tobytes(), 6))
+            else:
+                buffer = io.BytesIO()
+                card.save(buffer, "JPEG", quality=self.quality, subsampling=0)
+                obj_id = self._stream(f"{entries} /Filter /DCTDecode", buffer.getvalue())
+            self._images[path] = obj_id
+        return obj_id
+
+    def add_page(self, card_paths):
+        layout = self.layout
+        page_h = layout.page[1]
+        cell_w, cell_h = (size * PT_PER_MM for size in layout.cell)
+        names = {}
+        ops = []
+        for (x, y), path in zip(layout.cells(), card_paths):
+            name = names.setdefault(self._image(path), f"Im{len(names)}")
+            # PDF space starts at the bottom-left, in points
+            ops.append(f"q {cell_w:.3f} 0 0 {cell_h:.3f} {x * PT_PER_MM:.3f} "
+                       f"{(page_h - y - layout.cell[1]) * PT_PER_MM:.3f} cm /{name} Do Q")
+        marks = layout.crop_marks()
+        if marks:
+            ops.append(f"0 G {MARK_WIDTH_PT} w")
+            for (x1, y1), (x2, y2) in marks:
+                ops.append(f"{x1 * PT_PER_MM:.3f} {(page_h - y1) * PT_PER_MM:.3f} m "
+                           f"{x2 * PT_PER_MM:.3f} {(page_h - y2) * PT_PER_MM:.3f} l S")
+        contents = self._stream("", "\n".join(ops).encode())
+
+        xobjects = " ".join(f"/{name} {obj_id} 0 R" for obj_id, name in names.items())
+        width, height = (size * PT_PER_MM for size in layout.page)
+        page = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.3f} {height:.3f}] "
+                f"/Resources << /XObject << {xobjects} >> >> /Contents {contents} 0 R >>")
+        self._page_ids.append(self._object(page.encode()))
+        self.pages += 1
+
+    def _finish(self):
+        if self._file.closed:
+            return
+        kids = " ".join(f"{obj_id} 0 R" for obj_id in self._page_ids)
+        self._object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode(), 2)
+        self._object(b"<< /Type /Catalog /Pages 2 0 R >>", 1)
+        xref = self._file.tell()
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self._offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self._file.write("".join(lines).encode())
+        self._file.close()
+
+
+class TiffSheetWriter(SheetWriter):
+    """Multi-page TIFF; each sheet is rasterized, appended and released"""
+
+    def __init__(self, path, layout, compression="tiff_lzw"):
+        super().__init__(path, layout)
+        self.compression = compression
+        self._tiff = TiffImagePlugin.AppendingTiffWriter(self.tmp_path, new=True)
+
+    def add_page(self, card_paths):
+        layout = self.layout
+        sheet = Image.new("RGB", layout.page_px, "white")
+        for position, path in zip(layout.cells_px(), card_paths):
+            sheet.paste(layout.prepare_card(path), position)
+        draw = ImageDraw.Draw(sheet)
+        width = max(1, round(MARK_WIDTH_PT / 72 * layout.dpi))
+        for (x1, y1), (x2, y2) in layout.crop_marks():
+            draw.line([layout.px(x1), layout.px(y1), layout.px(x2), layout.px(y2)], fill="black", width=width)
+        sheet.save(self._tiff, "TIFF", dpi=(layout.dpi, layout.dpi), compression=self.compression)
+        self._tiff.newFrame()
+        self.pages += 1
+
+    def _finish(self):
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
+
+
+def open_sheet_writer(path, layout, quality=95):
+    """SheetWriter for *.pdf or *.tif/*.tiff; `quality` applies to PDF (None = lossless)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return PdfSheetWriter(path, layout, quality)
+    if ext in (".tif", ".tiff"):
+        return TiffSheetWriter(path, layout)
+    raise ValueError(f"{path}: print sheets are written as .pdf or .tiff")
+
+
+def impose(card_paths, writer):
+    """Write the cards (rendered PNG paths, one per printed copy) page by page; yields each page's card count"""
+    per_page = writer.layout.per_page
+    for start in range(0, len(card_paths), per_page):
+        page = card_paths[start:start + per_page]
+        writer.add_page(page)
+        yield len(page)
+
+
+def card_size_for(path, width_mm=DEFAULT_CARD_WIDTH_MM):
+    """Trim size in mm for a rendered card `width_mm` wide, keeping its aspect ratio"""
+    with Image.open(path) as image:
+        return width_mm, width_mm * image.height / image.width
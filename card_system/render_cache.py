@@ -0,0 +1,119 @@
+"""
+Render Cache
+- Content-addressed store of rendered card PNGs
+- Keys hash the card fields, art file contents, frame image and layout version
+- Size-bounded, least-recently-used files are evicted first
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+from card_builder import CardBuilder
+
+# Card fields that affect the rendered image (see card_data.build_kwargs)
+RENDER_FIELDS = ("name", "type", "tribe", "school", "abilities", "text", "flavor", "attack", "defense")
+
+_file_hashes = {}
+
+
+def file_digest(path):
+    """sha256 of a file's contents, memoized per (path, size, mtime) for this process"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def card_key(card, art_path, frame_digest, layout_version=None):
+    """Cache key for one card render"""
+    fields = {name: card.get(name) for name in RENDER_FIELDS}
+    payload = {
+        "card": fields,
+        "art": file_digest(art_path) if art_path else None,
+        "frame": frame_digest,
+        "layout": layout_version or CardBuilder.layout_version(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class RenderCache:
+    """On-disk store of <key>.png files with LRU eviction by total size"""
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.png")
+
+    def get(self, key):
+        """Path of the cached render, or None; marks the entry as recently used"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)
+        return path
+
+    def put(self, key, src_path):
+        """Copy a finished render into the store"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def entries(self):
+        """(mtime, size, path) for every stored render"""
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".png"):
+                    path = os.path.join(dirpath, name)
+                    stat = os.stat(path)
+                    found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def evict(self):
+        """Delete least-recently-used renders until the store fits max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+
+class OutputManifest:
+    """Remembers which cache key produced each file in an output directory"""
+
+    FILENAME = ".render_keys.json"
+
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, self.FILENAME)
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.keys = json.load(f)
+        except (OSError, ValueError):
+            self.keys = {}
+
+    def is_current(self, card_id, key, paths):
+        return self.keys.get(card_id) == key and all(os.path.exists(path) for path in paths)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.keys, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,429 @@
+"""
+Render Service
+- Local HTTP service (asyncio, stdlib only) that renders cards on demand, so
+  the client can show an edited card without a batch rebuild
+- GET /card/<id>.<png|webp|jpg>[?width=N] renders a card from --cards, which is
+  re-read whenever the file changes; POST /render[?format=&width=] renders the
+  card definition (JSON) in the request body, with its art looked up by id in --art-dir
+- GET /cards lists a version per card (its render key), so the client can put
+  it in image URLs and only refetch the cards that changed
+- Renders run in a warm process pool (each worker keeps its CardBuilder and
+  art loader); identical requests in flight share one render, and recent
+  results are kept in an in-memory LRU keyed by render key, format and width
+- Responses carry an ETag; revalidating an unchanged card is a 304 without a render
+- No CORS headers: web pages can't read renders, and POST /render needs a JSON
+  Content-Type, which browsers preflight; the game reaches it from main.js
+- GET /metrics: requests by outcome, latency and render-time percentiles,
+  throughput and cache occupancy; GET /health
+
+A card rendered at the deck builder's size (?width=280, JPEG) takes ~60 ms on
+one core. Full-size PNGs are dominated by PNG encoding (>100 ms); ask for the
+size the client shows.
+
+Usage:
+    python cli.py serve --back frame.png --cards ../game/js/cards.js --art-dir art/ [--port 47620]
+    CARD_RENDER_URL=http://127.0.0.1:47620 npm start
+    curl -o bone_walker.jpg "http://127.0.0.1:47620/card/bone_walker.jpg?width=280"
+"""
+
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from urllib.parse import parse_qs, unquote, urlsplit
+import asyncio
+import io
+import json
+import os
+import re
+import time
+import traceback
+
+from art_loader import ArtLoader
+from card_builder import CardBuilder
+from card_data import build_kwargs, find_art, load_cards
+from render_cache import card_key, file_digest
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47620
+DEFAULT_CACHE_MB = 64
+
+# extension -> (PIL format, content type, encoder options); tuned for latency
+FORMATS = {
+    "png": ("PNG", "image/png", {"compress_level": 1}),
+    "webp": ("WEBP", "image/webp", {"quality": 85, "method": 0}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 90}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 90}),
+}
+MIN_WIDTH = 16
+MAX_WIDTH = 2048  # about the full card; each width is its own cache entry, and huge ones exhaust a worker
+CARD_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+LATENCY_SAMPLES = 4096  # most recent requests kept for percentiles
+THROUGHPUT_WINDOW = 60  # seconds
+MAX_BODY = 1 << 20
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large",
+               415: "Unsupported Media Type", 500: "Internal Server Error"}
+
+# Per-process builder, created once by _init_worker
+_builder = None
+
+
+def _init_worker(back_path, art_cache_dir=None, frame_pack_dir=None):
+    global _builder
+    art_loader = ArtLoader(disk_dir=art_cache_dir)
+    if frame_pack_dir:
+        _builder = CardBuilder.cached(back_path, frame_pack_dir, art_loader)
+    else:
+        _builder = CardBuilder(back_path, art_loader)
+    # Every build is encoded before the worker takes the next job
+    _builder.low_memory = True
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def _render(job):
+    """(encoded bytes, seconds) for one card in the current worker"""
+    card, art_dirs, ext, width = job
+    start = time.perf_counter()
+    image = _builder.build(**build_kwargs(card, _builder, art_dirs))
+    if width and width != image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+    pil_format, _, options = FORMATS[ext]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """{"p50": ..., "max": ...} by nearest rank, in the values' unit"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{p}": ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))] for p in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+class Rendered:
+    """An encoded card image"""
+
+    __slots__ = ("etag", "data", "content_type", "seconds")
+
+    def __init__(self, etag, data, content_type, seconds):
+        self.etag = etag
+        self.data = data
+        self.content_type = content_type
+        self.seconds = seconds
+
+
+class RenderLRU:
+    """Encoded renders by key, least recently used dropped first past max_bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key, item):
+        if len(item.data) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old.data)
+        self._items[key] = item
+        self.bytes += len(item.data)
+        while self.bytes > self.max_bytes:
+            _, dropped = self._items.popitem(last=False)
+            self.bytes -= len(dropped.data)
+
+
+class Metrics:
+    """Request outcomes, latencies and throughput since start"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.outcomes = Counter()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.render_times = deque(maxlen=LATENCY_SAMPLES)
+        self._finished = deque()
+        self.in_flight = 0
+
+    def record(self, outcome, seconds):
+        now = time.monotonic()
+        self.outcomes[outcome] += 1
+        if outcome in ("hit", "miss", "coalesced", "not_modified"):
+            self.latencies.append(seconds)
+        self._finished.append(now)
+        while self._finished and self._finished[0] < now - THROUGHPUT_WINDOW:
+            self._finished.popleft()
+
+    def snapshot(self, cache):
+        uptime = time.monotonic() - self.started
+        window = min(uptime, THROUGHPUT_WINDOW) or 1
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests": sum(self.outcomes.values()),
+            "outcomes": dict(self.outcomes),
+            "in_flight": self.in_flight,
+            "latency_ms": {name: round(value * 1000, 2) for name, value in percentiles(self.latencies).items()},
+            "render_ms": {name: round(value * 1000, 2) for name, value in percentiles(self.render_times).items()},
+            "throughput_rps": round(len(self._finished) / window, 2),
+            "cache": {"items": len(cache), "bytes": cache.bytes, "max_bytes": cache.max_bytes},
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RenderService:
+    """
+    Renders cards for HTTP requests.
+
+    Args:
+        back_path: Card back/frame image
+        cards_path: Card source served under /card/<id> (optional)
+        art_dirs: Directories searched for <id>.<ext> art
+        workers: Render processes kept warm (default: CPU count)
+        cache_bytes: Size of the in-memory LRU of encoded renders
+        art_cache_dir: Optional on-disk store of art fitted to the art window
+        frame_pack_dir: Optional directory of CardBuilder frame packs
+        log: print-like callable for startup and card file messages
+    """
+
+    def __init__(self, back_path, cards_path=None, art_dirs=None, workers=None, cache_bytes=DEFAULT_CACHE_MB << 20,
+                 art_cache_dir=None, frame_pack_dir=None, log=print):
+        self.back_path = back_path
+        self.cards_path = cards_path
+        self.art_dirs = list(art_dirs or ())
+        self.workers = workers or os.cpu_count() or 1
+        self.log = log
+        if frame_pack_dir:
+            CardBuilder.cached(back_path, frame_pack_dir)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(back_path, art_cache_dir, frame_pack_dir))
+        self.cache = RenderLRU(cache_bytes)
+        self.metrics = Metrics()
+        self.layout_version = CardBuilder.layout_version()
+        self._in_flight = {}
+        self._cards = {}
+        self._cards_stat = None
+
+    def warm_up(self):
+        """Start every worker (and its CardBuilder) now rather than on the first request"""
+        list(self.pool.map(_ping, range(self.workers)))
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    # ==================================================================
+    # CARDS AND KEYS
+    # ==================================================================
+
+    def cards(self):
+        """Cards from cards_path by id, re-read when the file changes; the previous cards if it doesn't parse"""
+        if not self.cards_path:
+            return {}
+        stat = os.stat(self.cards_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._cards_stat:
+            self._cards_stat = stamp
+            try:
+                self._cards = {card["id"]: card for card in load_cards(self.cards_path)}
+            except (OSError, ValueError) as e:
+                self.log(f"{self.cards_path}: {e} (keeping the previous cards)")
+        return self._cards
+
+    def version(self, card):
+        """Render key of a card: changes whenever its image would (reads and hashes files; blocking)"""
+        return card_key(card, find_art(card, self.art_dirs), file_digest(self.back_path), self.layout_version)
+
+    def versions(self):
+        """Short render key of every card in cards_path (blocking)"""
+        return {card_id: self.version(card)[:20] for card_id, card in self.cards().items()}
+
+    # ==================================================================
+    # RENDERING
+    # ==================================================================
+
+    async def render(self, card, ext="png", width=None):
+        """(Rendered, "hit" | "miss" | "coalesced"); identical concurrent calls share one render"""
+        loop = asyncio.get_running_loop()
+        key = f"{await loop.run_in_executor(None, self.version, card)}:{ext}:{width or ''}"
+        item = self.cache.get(key)
+        if item is not None:
+            return item, "hit"
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), "coalesced"
+
+        pending = self._in_flight[key] = loop.create_future()
+        try:
+            data, seconds = await loop.run_in_executor(self.pool, _render, (card, self.art_dirs, ext, width))
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved when nothing else was waiting
+            raise
+        finally:
+            del self._in_flight[key]
+        self.metrics.render_times.append(seconds)
+        item = Rendered(f'"{key.replace(":", "-")}"', data, FORMATS[ext][1], seconds)
+        self.cache.put(key, item)
+        pending.set_result(item)
+        return item, "miss"
+
+    # ==================================================================
+    # HTTP
+    # ==================================================================
+
+    async def dispatch(self, method, target, headers, body):
+        """(status, content type, payload, extra headers, outcome) for one request"""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = unquote(url.path)
+
+        if path == "/health" and method == "GET":
+            return 200, "application/json", b'{"ok": true}', {}, "other"
+        if path == "/metrics" and method == "GET":
+            payload = json.dumps(self.metrics.snapshot(self.cache), indent=1).encode()
+            return 200, "application/json", payload, {}, "other"
+        if path == "/cards" and method == "GET":
+            versions = await asyncio.get_running_loop().run_in_executor(None, self.versions)
+            return 200, "application/json", json.dumps(versions).encode(), {"Cache-Control": "no-cache"}, "other"
+
+        if path.startswith("/card/") and method == "GET":
+            card_id, _, ext = path[len("/card/"):].rpartition(".")
+            cards = await asyncio.get_running_loop().run_in_executor(None, self.cards)
+            card = cards.get(card_id)
+            if card is None:
+                raise HTTPError(404, f"Unknown card {card_id!r}")
+        elif path == "/render" and method == "POST":
+            if headers.get("content-type", "").split(";")[0].strip() != "application/json":
+                raise HTTPError(415, "Content-Type must be application/json")
+            try:
+                card = json.loads(body)
+            except ValueError as e:
+                raise HTTPError(400, f"Card JSON: {e}") from None
+            if not isinstance(card, dict):
+                raise HTTPError(400, "Card JSON must be an object")
+            # Art comes from art_dirs only: a posted path could read any image on the machine
+            card.pop("art", None)
+            card.setdefault("id", "preview")
+            if not isinstance(card["id"], str) or not CARD_ID.fullmatch(card["id"]):
+                raise HTTPError(400, "Card id must be letters, digits, '_' or '-'")
+            ext = query.get("format", ["png"])[0]
+        elif path.startswith("/card/") or path == "/render":
+            raise HTTPError(405, f"{method} not allowed on {path}")
+        else:
+            raise HTTPError(404, f"No such endpoint {path}")
+
+        if ext not in FORMATS:
+            raise HTTPError(400, f"Format must be one of {', '.join(FORMATS)}")
+        width = query.get("width", [None])[0]
+        if width is not None:
+            try:
+                width = int(width)
+            except ValueError:
+                raise HTTPError(400, "width must be an integer") from None
+            if width < MIN_WIDTH:
+                raise HTTPError(400, f"width must be at least {MIN_WIDTH}")
+            if width > MAX_WIDTH:
+                raise HTTPError(400, f"width must be at most {MAX_WIDTH}")
+
+        item, outcome = await self.render(card, ext, width)
+        extra = {"ETag": item.etag, "Cache-Control": "no-cache", "X-Render-Cache": outcome,
+                 "Server-Timing": f"render;dur={item.seconds * 1000:.1f}"}
+        if headers.get("if-none-match") == item.etag:
+            return 304, None, b"", extra, "not_modified"
+        return 200, item.content_type, item.data, extra, outcome
+
+    async def handle(self, reader, writer):
+        """One connection; keeps serving requests while the client keeps it alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                self.metrics.in_flight += 1
+                try:
+                    keep_alive = await self._respond(request_line, reader, writer, start)
+                finally:
+                    self.metrics.in_flight -= 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request_line, reader, writer, start):
+        keep_alive = False
+        try:
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                raise HTTPError(400, "Malformed request line") from None
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                raise HTTPError(400, "Content-Length must be an integer") from None
+            if length < 0:
+                raise HTTPError(400, "Content-Length must not be negative")
+            if length > MAX_BODY:
+                raise HTTPError(413, f"Body over {MAX_BODY} bytes")
+            body = await reader.readexactly(length) if length else b""
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            status, content_type, payload, extra, outcome = await self.dispatch(method, target, headers, body)
+        except HTTPError as e:
+            status, content_type, payload, extra, outcome = e.status, "text/plain", str(e).encode(), {}, "error"
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception:
+            status, content_type, payload, extra, outcome = (500, "text/plain", traceback.format_exc().encode(), {},
+                                                             "error")
+
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                 f"Content-Length: {len(payload)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+        self.metrics.record(outcome, time.perf_counter() - start)
+        return keep_alive
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Serve until cancelled"""
+        server = await asyncio.start_server(self.handle, host, port)
+        await asyncio.get_running_loop().run_in_executor(None, self.warm_up)
+        cards = f", {len(self.cards())} cards from {self.cards_path}" if self.cards_path else ""
+        self.log(f"Rendering on http://{host}:{port} with {self.workers} worker(s){cards}")
+        async with server:
+            await server.serve_forever()
+
@@ -0,0 +1,570 @@
+"""
+Search AI
+- A time-budgeted Monte Carlo tree search over engine.py that plans the side
+  to move's whole turn, as a stronger opponent than doAITurn's greedy rules
+- Anytime: searches until the turn's millisecond budget runs out and plays
+  the best action found so far. Only time spent searching counts against the
+  budget, so pauses between a client's requests don't eat into it
+- Positions are keyed by what the side to move can see (its own hand, the
+  opponent's hand size, both boards, health, mana, curses); the transposition
+  table merges move orders that reach the same position and survives between
+  calls, so the next decision of the turn and the next turn start from the
+  statistics already gathered
+- Hidden information is sampled: every iteration re-deals the opponent's hand
+  and the top of both decks before descending the tree
+- Leaves are played out with greedy_turn for a few turns, then scored by
+  health, board and hand size
+- --serve answers JSON-lines requests on stdin for main.js: the Electron app
+  sends serializeGameForAI() and plays the returned action
+
+Requests and replies (one JSON object per line):
+
+    {"id": 1, "state": {...}, "budget_ms": 400}
+    {"id": 1, "action": {"type": "play", "hand": 2, "target": ["opponent", 0]},
+     "plan": [...], "iterations": 1830, "nodes": 5120, "value": 0.61, "ms": 201.4}
+
+Actions index the acting side's hand and board: {"type": "play", "hand": i,
+"target": null | "enemy_hero" | ["own" | "opponent", j]}, {"type": "attack",
+"attacker": i, "target": j | null (the hero)} and {"type": "end"}.
+
+Usage:
+    python search_ai.py [--games 20] [--budget 200] [--seed 1] [--tribes Undead,Demon]
+    python search_ai.py --serve [--budget 400]
+"""
+
+from math import exp, log, sqrt
+import argparse
+import json
+import random
+import sys
+import time
+
+from engine import (CREATURE, DEFAULT_CARDS_JS, UNSET, CardPool, Game, greedy_turn, keyword_bits,
+                    keyword_names, play_game)
+
+DEFAULT_BUDGET_MS = 200
+
+# Turns (both sides counted) searched and played out past the one being planned
+HORIZON = 3
+
+# UCB1 exploration constant (values are win probabilities in [0, 1])
+EXPLORATION = 0.7
+
+# Cards dealt fresh from the top of each deck per iteration: enough for the
+# draws within the horizon, without shuffling the whole deck every time
+SAMPLED_DRAWS = 8
+
+# Leaf evaluation: logistic over health difference plus weighted board and hand
+BOARD_WEIGHT = 0.8
+HAND_WEIGHT = 1.5
+SCORE_SCALE = 10.0
+
+# Transposition table size; past it, positions untouched for KEEP_GENERATIONS searches go first
+MAX_NODES = 300_000
+KEEP_GENERATIONS = 4
+
+# The first decision of a turn gets this share of the turn's budget, each later one
+# the same share of what is left unsearched, but never less than MIN_STEP_MS
+FIRST_STEP_SHARE = 0.5
+MIN_STEP_MS = 5
+
+END = ("end",)
+
+
+# ============================================================================
+# ACTIONS
+# ============================================================================
+
+def _target_code(player, target):
+    if target is None or isinstance(target, str):
+        return target
+    if target in player.board:
+        return ("own", player.board.index(target))
+    return ("opponent", player.opponent.board.index(target))
+
+
+def _resolve_target(player, code):
+    """Card (or hero string / None) for a target code; False if it doesn't exist"""
+    if code is None or isinstance(code, str):
+        return code
+    board = player.board if code[0] == "own" else player.opponent.board
+    return board[code[1]] if code[1] < len(board) else False
+
+
+def legal_actions(game):
+    """
+    Moves of the side to move: ("play", card_id, target code), ("attack",
+    attacker index, defender index or None for the hero) and END. Copies of a
+    card count once; spells only get the targets the browser UI offers.
+    """
+    me = game.current
+    if game.over:
+        return []
+    actions = []
+    seen = set()
+    for card in me.hand:
+        if card.id in seen or not game.can_play_card(me, card):
+            continue
+        seen.add(card.id)
+        if card.type == CREATURE:
+            actions.append(("play", card.id, None))
+        else:
+            actions.extend(("play", card.id, _target_code(me, target)) for target in game.spell_targets(me, card))
+
+    defenders = me.opponent.board
+    for i, attacker in enumerate(me.board):
+        if not attacker.can_attack:
+            continue
+        if game.can_attack(attacker):
+            actions.append(("attack", i, None))
+        actions.extend(("attack", i, j) for j, c in enumerate(defenders) if game.can_attack(attacker, c))
+    actions.append(END)
+    return actions
+
+
+def apply_action(game, action, ai=False):
+    """Play `action` for the side to move (END ends the turn); returns False if it isn't legal here"""
+    me = game.current
+    kind = action[0]
+    if kind == "end":
+        game.end_turn()
+        return True
+    if kind == "play":
+        card = next((c for c in me.hand if c.id == action[1] and game.can_play_card(me, c)), None)
+        target = _resolve_target(me, action[2])
+        if card is None or target is False:
+            return False
+        return game.play_card(me, card, len(me.board), target)
+    i, j = action[1], action[2]
+    defenders = me.opponent.board
+    if i >= len(me.board) or (j is not None and j >= len(defenders)):
+        return False
+    return game.attack(me.board[i], None if j is None else defenders[j], ai)
+
+
+def action_to_json(game, action):
+    """Wire form of an action for the side to move (hand and board indices, see the module docstring)"""
+    kind = action[0]
+    if kind == "play":
+        me = game.current
+        hand = next(i for i, c in enumerate(me.hand) if c.id == action[1] and game.can_play_card(me, c))
+        target = action[2]
+        return {"type": "play", "hand": hand, "target": list(target) if isinstance(target, tuple) else target}
+    if kind == "attack":
+        return {"type": "attack", "attacker": action[1], "target": action[2]}
+    return {"type": "end"}
+
+
+# ============================================================================
+# POSITIONS
+# ============================================================================
+
+def _card_key(c):
+    attacks = c.attacks
+    return (c.id, c.cost, c.current_attack, c.current_defense, c.kw, c.can_attack,
+            -1 if attacks != attacks else attacks, tuple(map(tuple, c.curses)) if c.curses else (),
+            c.undying_used, c.frenzy_used, c.dies_eot)
+
+
+def position_key(game, viewer):
+    """Hashable position as players[viewer] sees it: the opponent's hand and both deck orders are hidden"""
+    me = game.players[viewer]
+    opponent = me.opponent
+    return (
+        game.current is me, game.turn_number, game.over, game.dead_this_turn,
+        me.health, me.max_health, me.mana, me.max_mana, me.fatigue, tuple(me.curses), len(me.deck),
+        tuple((c.id, c.cost) for c in me.hand), tuple(map(_card_key, me.board)),
+        tuple(c.id for c in me.graveyard),
+        opponent.health, opponent.max_health, opponent.mana, opponent.max_mana, opponent.fatigue,
+        tuple(opponent.curses), len(opponent.deck), len(opponent.hand), tuple(map(_card_key, opponent.board)),
+        tuple(c.id for c in opponent.graveyard),
+    )
+
+
+def _board_value(player):
+    return sum(max(0, c.current_attack) + c.current_defense for c in player.board)
+
+
+def evaluate(game, viewer):
+    """Estimated win probability of players[viewer]: 1 or 0 once the game is over"""
+    me = game.players[viewer]
+    if game.over:
+        return 1.0 if game.winner is me else 0.0
+    opponent = me.opponent
+    score = (me.health - opponent.health + BOARD_WEIGHT * (_board_value(me) - _board_value(opponent))
+             + HAND_WEIGHT * (len(me.hand) - len(opponent.hand)))
+    return 1.0 / (1.0 + exp(-score / SCORE_SCALE))
+
+
+def _deal(cards, count, rng):
+    """Shuffle the last `count` positions of `cards` (the next ones drawn) uniformly from the whole list"""
+    random_ = rng.random
+    for i in range(len(cards) - 1, max(0, len(cards) - count), -1):
+        j = int(random_() * (i + 1))
+        cards[i], cards[j] = cards[j], cards[i]
+
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+class Node:
+    """Transposition table entry: visits and per-action [visits, summed value] for the viewer"""
+
+    __slots__ = ("visits", "edges", "generation")
+
+    def __init__(self, generation):
+        self.visits = 0
+        self.edges = {}
+        self.generation = generation
+
+
+class SearchResult:
+    """Outcome of one search: the planned actions of the turn, best first"""
+
+    __slots__ = ("plan", "iterations", "nodes", "seconds", "value")
+
+    def __init__(self, plan, iterations, nodes, seconds, value):
+        self.plan = plan
+        self.iterations = iterations
+        self.nodes = nodes
+        self.seconds = seconds
+        self.value = value
+
+    @property
+    def action(self):
+        return self.plan[0] if self.plan else END
+
+
+class SearchAI:
+    """
+    Monte Carlo tree search with a persistent transposition table.
+
+    Args:
+        budget_ms: Thinking time per turn; decide() splits it over the turn's decisions
+        horizon: Turns (both sides counted) searched and played out past the current one
+        exploration: UCB1 exploration constant
+        max_nodes: Transposition table entries kept between searches
+        ai_combat: Per seat (players[0], players[1]), whether attacks resolve like
+                   resolveCombatAI. The browser plays the AI's attacks that way
+        seed: Seed for sampling hidden cards and playouts
+    """
+
+    def __init__(self, budget_ms=DEFAULT_BUDGET_MS, horizon=HORIZON, exploration=EXPLORATION,
+                 max_nodes=MAX_NODES, ai_combat=(False, True), seed=None):
+        self.budget_ms = budget_ms
+        self.horizon = horizon
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.ai_combat = ai_combat
+        self.rng = random.Random(seed)
+        self.table = {}
+        self.generation = 0
+        self._turn = None
+        self._turn_spent = 0.0
+
+    def reset(self):
+        self.table.clear()
+        self._turn = None
+
+    def search(self, game, budget_ms):
+        """Search from the side to move's position for `budget_ms` (at least one iteration)"""
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000
+        self.generation += 1
+        viewer = game.players.index(game.current)
+
+        actions = legal_actions(game)
+        iterations = 0
+        if len(actions) > 1:
+            while True:
+                self._iterate(game, viewer)
+                iterations += 1
+                if time.perf_counter() >= deadline:
+                    break
+
+        plan, value = self._principal_plan(game, viewer)
+        self._trim()
+        return SearchResult(plan, iterations, len(self.table), time.perf_counter() - start, value)
+
+    def decide(self, game):
+        """
+        Search the side to move's next action within what is left of this turn's budget.
+
+        The budget is spent only while searching: time between decide() calls
+        (a client animating the previous action) is not charged to the turn.
+        """
+        turn = (game.turn_number, game.players.index(game.current))
+        if turn != self._turn:
+            self._turn = turn
+            self._turn_spent = 0.0
+        remaining_ms = self.budget_ms - self._turn_spent * 1000
+        result = self.search(game, max(MIN_STEP_MS, remaining_ms * FIRST_STEP_SHARE))
+        self._turn_spent += result.seconds
+        return result
+
+    def play_turn(self, game):
+        """Policy for engine.play_game: plays the side to move's turn, leaving end_turn() to the caller"""
+        ai = self.ai_combat[game.current.index]
+        while not game.over:
+            action = self.decide(game).action
+            if action == END or not apply_action(game, action, ai):
+                break
+
+    # === ITERATIONS ===
+
+    def _sample(self, root, viewer):
+        """Copy of the root with the opponent's hand and the top of both decks re-dealt"""
+        game = root.clone(self.rng)
+        me = game.players[viewer]
+        opponent = me.opponent
+        templates = game.pool.cards
+        hand_size = len(opponent.hand)
+        hidden = opponent.deck + [templates.get(c.id, c) for c in opponent.hand]
+        _deal(hidden, hand_size + SAMPLED_DRAWS, self.rng)
+        if hand_size:
+            opponent.hand = [c.copy() for c in hidden[-hand_size:]]
+            del hidden[-hand_size:]
+        opponent.deck = hidden
+        _deal(me.deck, SAMPLED_DRAWS, self.rng)
+        return game
+
+    def _iterate(self, root, viewer):
+        game = self._sample(root, viewer)
+        last_turn = root.turn_number + self.horizon
+        table = self.table
+        generation = self.generation
+        viewer_player = game.players[viewer]
+        path = []
+
+        # Selection and expansion: descend by UCB1 until an action is tried for the first time
+        while not game.over and game.turn_number <= last_turn:
+            key = position_key(game, viewer)
+            node = table.get(key)
+            if node is None:
+                node = table[key] = Node(generation)
+            node.generation = generation
+
+            actions = legal_actions(game)
+            untried = [a for a in actions if a not in node.edges]
+            if untried:
+                action = untried[int(self.rng.random() * len(untried))]
+                node.edges[action] = [0, 0.0]
+            else:
+                action = self._select(node, actions, game.current is viewer_player)
+            path.append((node, action))
+            apply_action(game, action, self.ai_combat[game.current.index])
+            if untried:
+                break
+
+        # Playout: greedy turns up to the horizon
+        while not game.over and game.turn_number <= last_turn:
+            greedy_turn(game)
+            game.end_turn()
+
+        value = evaluate(game, viewer)
+        for node, action in path:
+            node.visits += 1
+            edge = node.edges[action]
+            edge[0] += 1
+            edge[1] += value
+
+    def _select(self, node, actions, maximize):
+        c = self.exploration * sqrt(log(node.visits + 1))
+        best = None
+        best_score = -1.0
+        edges = node.edges
+        for action in actions:
+            n, total = edges[action]
+            mean = total / n if maximize else 1.0 - total / n
+            score = mean + c / sqrt(n)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def _principal_plan(self, root, viewer):
+        """Most visited actions from the root until the turn ends, with the root's value estimate"""
+        game = root.clone(random.Random(0))
+        ai = self.ai_combat[game.current.index]
+        side = game.current
+        plan = []
+        value = evaluate(root, viewer)
+        while not game.over and game.current is side and len(plan) < 50:
+            node = self.table.get(position_key(game, viewer))
+            if node is None:
+                break
+            legal = set(legal_actions(game))
+            edges = [(edge[0], action, edge) for action, edge in node.edges.items() if action in legal and edge[0]]
+            if not edges:
+                break
+            _, action, edge = max(edges, key=lambda e: e[0])
+            if not plan:
+                value = edge[1] / edge[0]
+            plan.append(action)
+            if action == END:
+                break
+            apply_action(game, action, ai)
+        return plan, value
+
+    def _trim(self):
+        if len(self.table) <= self.max_nodes:
+            return
+        oldest = self.generation - KEEP_GENERATIONS
+        self.table = {key: node for key, node in self.table.items() if node.generation > oldest}
+        if len(self.table) > self.max_nodes:
+            self.table = {key: node for key, node in self.table.items() if node.generation == self.generation}
+
+
+# ============================================================================
+# BROWSER STATE
+# ============================================================================
+
+def _card_to_state(c):
+    attacks = c.attacks
+    return {
+        "id": c.id, "isToken": c.is_token, "cost": c.cost, "hpCost": c.hp_cost,
+        "attack": c.attack, "defense": c.defense, "currentAttack": c.current_attack,
+        "currentDefense": c.current_defense, "keywords": sorted(keyword_names(c.kw)),
+        "canAttack": bool(c.can_attack), "hasAttacked": bool(c.has_attacked), "summonedThisTurn": bool(c.summoned),
+        "attacksThisTurn": None if attacks != attacks else attacks,
+        "curses": [[curse[0], curse[1]] for curse in c.curses or ()],
+        "undyingUsed": c.undying_used, "frenzyUsed": c.frenzy_used, "diesEndOfTurn": c.dies_eot,
+    }
+
+
+def _player_to_state(p):
+    return {
+        "health": p.health, "maxHealth": p.max_health, "mana": p.mana, "maxMana": p.max_mana,
+        "fatigue": p.fatigue, "curses": list(p.curses), "deck": [c.id for c in p.deck],
+        "hand": [_card_to_state(c) for c in p.hand], "board": [_card_to_state(c) for c in p.board],
+        "graveyard": [_card_to_state(c) for c in p.graveyard],
+    }
+
+
+def game_to_state(game):
+    """The game as serializeGameForAI() in game.js writes it (players[0] is "player")"""
+    player, enemy = game.players
+    return {
+        "turnNumber": game.turn_number, "creaturesDeadThisTurn": game.dead_this_turn, "gameOver": game.over,
+        "current": "enemy" if game.current is enemy else "player",
+        "player": _player_to_state(player), "enemy": _player_to_state(enemy),
+    }
+
+
+def _card_from_state(pool, data, on_board):
+    c = pool.token(data["id"]) if data.get("isToken") else pool.create(data["id"])
+    if c is None:
+        raise ValueError(f"Unknown card: {data['id']}")
+    c.cost = data["cost"]
+    c.hp_cost = data.get("hpCost") or 0
+    c.attack = data.get("attack")
+    c.defense = data.get("defense")
+    c.current_attack = data.get("currentAttack")
+    c.current_defense = data.get("currentDefense")
+    c.kw = keyword_bits(data.get("keywords") or ())
+    c.can_attack = data.get("canAttack", False)
+    c.has_attacked = data.get("hasAttacked", False)
+    c.summoned = data.get("summonedThisTurn", False)
+    attacks = data.get("attacksThisTurn")
+    c.attacks = UNSET if attacks is None else attacks
+    curses = data.get("curses") or []
+    c.curses = [list(curse) for curse in curses] if curses or on_board else None
+    c.undying_used = data.get("undyingUsed", False)
+    c.frenzy_used = data.get("frenzyUsed", False)
+    c.dies_eot = data.get("diesEndOfTurn", False)
+    return c
+
+
+def game_from_state(pool, state, rng=None):
+    """Rebuild a Game from serializeGameForAI() output"""
+    game = Game(pool, rng if rng is not None else random.Random())
+    for player, data in zip(game.players, (state["player"], state["enemy"])):
+        player.health = data["health"]
+        player.max_health = data["maxHealth"]
+        player.mana = data["mana"]
+        player.max_mana = data["maxMana"]
+        player.fatigue = data["fatigue"]
+        player.curses = list(data["curses"])
+        player.deck = [pool.cards[card_id] for card_id in data["deck"] if card_id in pool.cards]
+        player.hand = [_card_from_state(pool, c, False) for c in data["hand"]]
+        player.board = [_card_from_state(pool, c, True) for c in data["board"]]
+        player.graveyard = [_card_from_state(pool, c, False) for c in data["graveyard"]]
+    game.current = game.players[1] if state["current"] == "enemy" else game.players[0]
+    game.turn_number = state["turnNumber"]
+    game.dead_this_turn = state.get("creaturesDeadThisTurn", 0)
+    game.over = state.get("gameOver", False)
+    return game
+
+
+def serve(ai, pool, stdin=sys.stdin, stdout=sys.stdout):
+    """Answer JSON-lines requests until stdin closes; a bad request gets {"id", "error"} back"""
+    for line in stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            if request.get("reset"):
+                ai.reset()
+                reply = {"id": request_id, "ok": True}
+            else:
+                if request.get("budget_ms"):
+                    ai.budget_ms = request["budget_ms"]
+                game = game_from_state(pool, request["state"], ai.rng)
+                result = ai.decide(game)
+                reply = {
+                    "id": request_id, "action": action_to_json(game, result.action),
+                    "plan": [list(action) for action in result.plan], "iterations": result.iterations,
+                    "nodes": result.nodes, "value": round(result.value, 4), "ms": round(result.seconds * 1000, 1),
+                }
+        except Exception as e:
+            reply = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+        stdout.write(json.dumps(reply) + "\n")
+        stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search AI: benchmark against the greedy AI, or serve the game",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument("--cards", default=DEFAULT_CARDS_JS,
+                        help="cards.js or compiled .cdb to load (default: game/js/cards.js)")
+    parser.add_argument("--serve", action="store_true", help="Answer JSON-lines requests on stdin")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MS, help="Thinking time per turn (ms)")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Turns searched past the current one")
+    parser.add_argument("--games", type=int, default=20, help="Games against the greedy AI (half as each seat)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the first game; game i uses seed + i")
+    parser.add_argument("--tribes", help="Comma-separated tribes for both decks (default: starter deck)")
+    args = parser.parse_args()
+
+    pool = CardPool.load(args.cards)
+    if args.serve:
+        serve(SearchAI(args.budget, args.horizon), pool)
+        return 0
+
+    deck = pool.tribal_deck(args.tribes.split(",")) if args.tribes else pool.starter_deck()
+    ai = SearchAI(args.budget, args.horizon, seed=args.seed)
+    wins = draws = 0
+    start = time.perf_counter()
+    for i in range(args.games):
+        seat = i % 2
+        ai.ai_combat = (False, False)
+        policies = (ai.play_turn, greedy_turn) if seat == 0 else (greedy_turn, ai.play_turn)
+        game = play_game(pool, deck, deck, seed=args.seed + i, policies=policies)
+        ai.reset()
+        if game.winner is None:
+            draws += 1
+        elif game.winner.index == seat:
+            wins += 1
+        print(f"  game {i + 1}: search AI {'first' if seat == 0 else 'second'}, "
+              f"{'draw' if game.winner is None else 'won' if game.winner.index == seat else 'lost'} "
+              f"in {game.turn_number} turns")
+    elapsed = time.perf_counter() - start
+
+    print(f"\nSearch AI ({args.budget:g} ms/turn) vs greedy: {wins}/{args.games} won, {draws} drawn "
+          f"({elapsed:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
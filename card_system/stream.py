@@ -0,0 +1,239 @@
+"""
+Streaming Renderer
+- build_many() renders cards one at a time and yields each encoded file as it finishes
+- Encoding runs on a small thread pool while the next card is drawn
+- At most `max_pending` cards are in flight: rendering waits for the encoder
+  (and for the consumer), so memory stays flat however many cards are rendered
+- Sinks write results straight to a directory, a zip file or a (streamed) tar
+- render_many() does the same with cards drawn in worker processes, encoding
+  each from the shared memory its worker drew into (batch.SharedRenderPool)
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import sys
+import tarfile
+import time
+import traceback
+import zipfile
+
+from card_data import build_kwargs
+
+EXTENSIONS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+
+# Fixed timestamp for archive members so identical renders give identical archives
+ARCHIVE_DATE = (2000, 1, 1, 0, 0, 0)
+
+
+class EncodedCard:
+    """One finished card; `data` is None once a sink has written it"""
+
+    __slots__ = ("card_id", "filename", "data", "size", "seconds", "error")
+
+    def __init__(self, card_id, filename=None, data=None, seconds=0.0, error=None):
+        self.card_id = card_id
+        self.filename = filename
+        self.data = data
+        self.size = len(data) if data else 0
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class Sink(ABC):
+    """Destination for encoded cards; use as a context manager to close it"""
+
+    @abstractmethod
+    def write(self, filename, data):
+        """Store one encoded card under `filename`"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectorySink(Sink):
+    """Writes each card to <path>/<filename>"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, filename, data):
+        path = os.path.join(self.path, filename)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class ZipSink(Sink):
+    """Appends each card to a zip file (stored, the images are already compressed)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+
+    def write(self, filename, data):
+        self.zip.writestr(zipfile.ZipInfo(filename, ARCHIVE_DATE), data)
+
+    def close(self):
+        self.zip.close()
+
+
+class TarSink(Sink):
+    """Streams each card into a tar archive; `fileobj` may be a pipe such as stdout"""
+
+    def __init__(self, path=None, fileobj=None, compression=""):
+        self.path = path
+        mode = f"w|{compression}" if fileobj is not None else f"w:{compression}"
+        self.tar = tarfile.open(path, mode, fileobj=fileobj)
+
+    def write(self, filename, data):
+        info = tarfile.TarInfo(filename)
+        info.size = len(data)
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tar.close()
+
+
+def open_sink(target):
+    """Sink for a CLI target: "-" (tar on stdout), *.zip, *.tar[.gz], or a directory"""
+    if target == "-":
+        return TarSink(fileobj=sys.stdout.buffer)
+    if target.endswith(".zip"):
+        return ZipSink(target)
+    if target.endswith((".tar.gz", ".tgz")):
+        return TarSink(target, compression="gz")
+    if target.endswith(".tar"):
+        return TarSink(target)
+    return DirectorySink(target)
+
+
+def _encode(image, format, options):
+    start = time.perf_counter()
+    image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format.upper(), **options)
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+def _finish(card_id, future, render_seconds, extension, sink):
+    try:
+        data, encode_seconds = future.result()
+    except Exception:
+        return EncodedCard(card_id, error=traceback.format_exc(limit=3).strip())
+    result = EncodedCard(card_id, card_id + extension, data, render_seconds + encode_seconds)
+    if sink is not None:
+        sink.write(result.filename, data)
+        result.data = None
+    return result
+
+
+def build_many(builder, cards, sink=None, format="png", art_dirs=None, max_pending=4, encode_threads=2,
+               **save_options):
+    """
+    Render and encode cards in order, one EncodedCard per card.
+
+    Args:
+        builder: CardBuilder used for every card; with low_memory set, each
+                 canvas is copied before it is handed to the encoder
+        cards: Card dicts (any iterable; consumed lazily)
+        sink: Optional DirectorySink/ZipSink/TarSink; each result is written as
+              soon as it is ready and yielded without its data
+        format: "png", "webp" or "jpeg"
+        art_dirs: Directories searched for <id>.png art
+        max_pending: Cards rendered but not yet encoded and consumed. When the
+                     encoder falls behind, rendering blocks until it catches up
+        encode_threads: Threads encoding while the next card is drawn
+        save_options: Passed to Image.save
+
+    Yields:
+        EncodedCard per card, in the same order as `cards`; failed cards carry
+        the error instead of raising
+    """
+    def finish(card_id, future, render_seconds):
+        return _finish(card_id, future, render_seconds, EXTENSIONS[format], sink)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=encode_threads) as pool:
+        for card in cards:
+            # Backpressure: wait for the oldest card before drawing another one
+            while len(pending) >= max_pending:
+                yield finish(*pending.popleft())
+
+            start = time.perf_counter()
+            try:
+                image = builder.build(**build_kwargs(card, builder, art_dirs))
+            except Exception:
+                while pending:
+                    yield finish(*pending.popleft())
+                yield EncodedCard(card["id"], seconds=time.perf_counter() - start,
+                                  error=traceback.format_exc(limit=3).strip())
+                continue
+            if builder.low_memory:
+                # build() returned the builder's reused canvas, which the next
+                # card is drawn into while this one is still being encoded
+                image = image.copy()
+            render_seconds = time.perf_counter() - start
+            pending.append((card["id"], pool.submit(_encode, image, format, save_options), render_seconds))
+            del image
+
+            while pending and pending[0][1].done():
+                yield finish(*pending.popleft())
+
+        while pending:
+            yield finish(*pending.popleft())
+
+
+def render_many(pool, cards, sink=None, format="png", art_dirs=None, encode_threads=2, **save_options):
+    """
+    build_many() across processes: a batch.SharedRenderPool draws the cards and
+    they are encoded here straight from the shared memory they were drawn into.
+
+    Args:
+        pool: batch.SharedRenderPool; its slot count bounds the cards in flight
+        cards, sink, format, art_dirs, encode_threads, save_options: As build_many
+
+    Yields:
+        EncodedCard per card, in the same order as `cards`
+    """
+    def encode(render):
+        try:
+            return _encode(render.image, format, save_options)
+        finally:
+            render.release()
+
+    def finish(card_id, future, render_seconds):
+        return _finish(card_id, future, render_seconds, EXTENSIONS[format], sink)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=encode_threads) as threads:
+        for render in pool.render(cards, art_dirs):
+            result = render.result
+            if not result.ok:
+                while pending:
+                    yield finish(*pending.popleft())
+                yield EncodedCard(result.card_id, seconds=result.seconds, error=result.error)
+                continue
+            pending.append((result.card_id, threads.submit(encode, render), result.seconds))
+            del render
+
+            while pending and pending[0][1].done():
+                yield finish(*pending.popleft())
+
+        while pending:
+            yield finish(*pending.popleft())
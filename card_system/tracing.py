@@ -0,0 +1,138 @@
+"""
+Build Tracing
+- Optional per-layer instrumentation for CardBuilder.build and ArtLoader
+- Each span records wall time, Pillow image allocations and the growth of peak RSS
+- Exports Chrome trace-event JSON (chrome://tracing, Perfetto) and per-layer
+  histograms aggregated over a batch
+
+Attach a Tracer to a builder (and its art loader) to turn it on:
+
+    tracer = Tracer()
+    builder.tracer = builder.art_loader.tracer = tracer
+"""
+
+from contextlib import contextmanager, nullcontext
+from PIL import Image
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not recorded
+    resource = None
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Returned by span helpers when tracing is off, so disabled tracing costs one check
+NO_TRACE = nullcontext()
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+def _image_allocations():
+    """(images created, memory blocks allocated) by Pillow so far in this process"""
+    stats = Image.core.get_stats()
+    return stats["new_count"], stats["allocated_blocks"]
+
+
+class Tracer:
+    """Collects spans as Chrome trace "complete" events"""
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+
+    @contextmanager
+    def span(self, name, **args):
+        images, blocks = _image_allocations()
+        rss = _peak_rss_kb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            end_images, end_blocks = _image_allocations()
+            args["images"] = end_images - images
+            args["blocks"] = end_blocks - blocks
+            if rss is not None:
+                args["peak_rss_kb"] = _peak_rss_kb() - rss
+            self.events.append({
+                "name": name, "ph": "X", "pid": self.pid, "tid": threading.get_ident(),
+                "ts": start * 1e6, "dur": (end - start) * 1e6, "args": args,
+            })
+
+    def drain(self):
+        """Return and forget the events recorded so far (e.g. to ship them from a worker)"""
+        events, self.events = self.events, []
+        return events
+
+    def extend(self, events):
+        self.events.extend(events)
+
+    # === EXPORT ===
+
+    def chrome_trace(self):
+        """Trace-event JSON object; timestamps start at the first event"""
+        origin = min((event["ts"] for event in self.events), default=0)
+        events = [dict(event, ts=round(event["ts"] - origin, 3), dur=round(event["dur"], 3))
+                  for event in self.events]
+        pids = sorted({event["pid"] for event in events})
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"render worker {pid}"}}
+                    for pid in pids]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def histograms(self):
+        """Per span name: count, total/mean/percentile ms, allocations, peak RSS growth and bucket counts"""
+        by_name = {}
+        for event in self.events:
+            by_name.setdefault(event["name"], []).append(event)
+
+        result = {}
+        for name, events in sorted(by_name.items()):
+            durations = sorted(event["dur"] / 1000 for event in events)
+            buckets = [0] * (len(BUCKETS_MS) + 1)
+            for ms in durations:
+                buckets[next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))] += 1
+            result[name] = {
+                "count": len(durations),
+                "total_ms": sum(durations),
+                "mean_ms": sum(durations) / len(durations),
+                "p50_ms": _percentile(durations, 0.50),
+                "p90_ms": _percentile(durations, 0.90),
+                "p99_ms": _percentile(durations, 0.99),
+                "max_ms": durations[-1],
+                "images": sum(event["args"].get("images", 0) for event in events),
+                "blocks": sum(event["args"].get("blocks", 0) for event in events),
+                "peak_rss_kb": sum(event["args"].get("peak_rss_kb", 0) for event in events),
+                "buckets_ms": {str(bound): count for bound, count in zip(BUCKETS_MS + ("inf",), buckets)},
+            }
+        return result
+
+    def format_histograms(self):
+        """Text table of histograms(), slowest total first"""
+        histograms = self.histograms()
+        lines = [f"  {'span':<18}{'count':>7}{'total ms':>11}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}"
+                 f"{'images':>8}{'rss KB':>8}"]
+        for name, h in sorted(histograms.items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"  {name:<18}{h['count']:>7}{h['total_ms']:>11.1f}{h['mean_ms']:>9.2f}"
+                         f"{h['p50_ms']:>9.2f}{h['p90_ms']:>9.2f}{h['p99_ms']:>9.2f}"
+                         f"{h['images'] / h['count']:>8.1f}{h['peak_rss_kb']:>8}")
+        return "\n".join(lines)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
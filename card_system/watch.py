@@ -0,0 +1,261 @@
+"""
+Watch Mode
+- Polls the card file, the art directories and the frame image, and collects
+  changes into one batch until nothing has changed for --debounce seconds
+- Re-renders only the cards a batch affects:
+  - a card file edit: the cards whose data changed (added, edited, removed)
+  - a swapped, added or removed art file: the cards that use it
+  - a frame image change: every card
+- Renders in a warm batch.RenderPool, so a one-card edit does not pay for
+  worker start-up, and keeps the output manifest current so a later
+  render-all skips what watch mode already rendered
+- With a notify port, sends the changed files to the running Electron app
+  (started with CARD_RELOAD_PORT set) so it reloads just those images; the deck
+  builder shows cards from game/images/cards, so render there (--out) to see edits
+
+Polling instead of OS file notifications keeps this stdlib-only and works the
+same on every platform and on network drives; a scan only stats files.
+
+Usage:
+    python cli.py watch --back frame.png --cards ../game/js/cards.js --art-dir art/ --out ../game/images/cards
+    CARD_RELOAD_PORT=47615 npm start    # in another terminal, then add --notify-port 47615
+"""
+
+import json
+import os
+import pathlib
+import socket
+import time
+import traceback
+
+from batch import RenderPool
+from card_builder import CardBuilder
+from card_data import ART_EXTENSIONS, find_art, load_cards
+from render_cache import OutputManifest, card_key, file_digest
+
+DEFAULT_INTERVAL = 0.25
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_NOTIFY_PORT = 47615
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def notify_reload(port, paths, host="127.0.0.1"):
+    """Send changed file paths (as file:// URLs) to the Electron reload server; False if it isn't listening"""
+    message = {"type": "assets-changed", "files": [pathlib.Path(os.path.abspath(p)).as_uri() for p in paths]}
+    try:
+        with socket.create_connection((host, port), timeout=1) as sock:
+            sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+    except OSError:
+        return False
+    return True
+
+
+class CardWatcher:
+    """
+    Keeps <out_dir>/<id>.png in step with a card file, its art and the frame.
+
+    Args:
+        cards_path: Card source (.json, cards.js or .cdb)
+        back_path: Card back/frame image
+        out_dir: Output directory
+        art_dirs: Directories searched for <id>.<ext> art
+        workers: Render processes (default: CPU count, 1 = render in-process)
+        art_cache_dir: Optional on-disk store of art fitted to the art window
+        notify_port: Port of the Electron reload server, or None
+        log: print-like callable for progress
+    """
+
+    def __init__(self, cards_path, back_path, out_dir, art_dirs=None, workers=None, art_cache_dir=None,
+                 notify_port=None, log=print):
+        self.cards_path = cards_path
+        self.back_path = back_path
+        self.out_dir = out_dir
+        self.art_dirs = list(art_dirs or ())
+        self.notify_port = notify_port
+        self.log = log
+        self.pool = RenderPool(back_path, workers, art_cache_dir)
+        self.manifest = OutputManifest(out_dir)
+        self.cards = {}
+        self.art = {}
+        self._stats = {}
+        self._notify_warned = False
+
+    # ==================================================================
+    # SCANNING
+    # ==================================================================
+
+    def _watched_paths(self):
+        paths = {self.cards_path, self.back_path}
+        for art_dir in self.art_dirs:
+            try:
+                names = os.listdir(art_dir)
+            except OSError:
+                continue
+            paths.update(os.path.join(art_dir, name) for name in names
+                         if os.path.splitext(name)[1].lower() in ART_EXTENSIONS)
+        # Explicit "art" fields can point anywhere
+        paths.update(card["art"] for card in self.cards.values() if card.get("art"))
+        return paths
+
+    def scan(self):
+        """Paths created, modified or deleted since the last scan"""
+        stats = {path: _stat(path) for path in self._watched_paths()}
+        changed = {path for path in stats.keys() | self._stats.keys() if stats.get(path) != self._stats.get(path)}
+        self._stats = {path: stat for path, stat in stats.items() if stat is not None}
+        return changed
+
+    def wait_for_changes(self, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        """Block until something changes, then until it has been quiet for `debounce` seconds; the batch"""
+        batch = set()
+        quiet_since = None
+        while True:
+            time.sleep(interval)
+            changed = self.scan()
+            if changed:
+                batch |= changed
+                quiet_since = time.monotonic()
+            elif batch and time.monotonic() - quiet_since >= debounce:
+                return batch
+
+    # ==================================================================
+    # CHANGE -> CARDS
+    # ==================================================================
+
+    def _load_cards(self):
+        return {card["id"]: card for card in load_cards(self.cards_path)}
+
+    def _resolve_art(self, cards):
+        return {card_id: find_art(card, self.art_dirs) for card_id, card in cards.items()}
+
+    def affected(self, changed):
+        """
+        Apply a batch of changed paths; returns (card ids to render, card ids removed).
+
+        A card file that no longer parses is reported and the previous cards are kept.
+        """
+        changed = {os.path.abspath(path) for path in changed}
+        to_render = set()
+        removed = set()
+        cards = self.cards
+        if os.path.abspath(self.cards_path) in changed:
+            try:
+                cards = self._load_cards()
+            except (OSError, ValueError) as e:
+                self.log(f"  {self.cards_path}: {e} (keeping the previous cards)")
+            else:
+                removed = set(self.cards) - set(cards)
+                to_render |= {card_id for card_id, card in cards.items() if self.cards.get(card_id) != card}
+
+        art = self._resolve_art(cards)
+        for card_id, art_path in art.items():
+            # Art that now resolves elsewhere (added/removed file), or the same file with new contents
+            if art_path != self.art.get(card_id) or (art_path and os.path.abspath(art_path) in changed):
+                to_render.add(card_id)
+        self.cards = cards
+        self.art = art
+        if os.path.abspath(self.back_path) in changed:
+            self.log("  frame changed: re-rendering every card")
+            self.pool.restart()
+            to_render = set(cards)
+        return to_render, removed
+
+    # ==================================================================
+    # RENDERING
+    # ==================================================================
+
+    def render(self, card_ids, removed=()):
+        """Render the given cards, drop outputs of removed ones, update the manifest and notify the app"""
+        start = time.perf_counter()
+        written = []
+        for card_id in sorted(removed):
+            out_path = os.path.join(self.out_dir, f"{card_id}.png")
+            if os.path.exists(out_path):
+                os.remove(out_path)
+                written.append(out_path)
+            self.manifest.keys.pop(card_id, None)
+
+        cards = [self.cards[card_id] for card_id in sorted(card_ids)]
+        frame_digest = file_digest(self.back_path)
+        layout_version = CardBuilder.layout_version()
+        failed = 0
+        for card, result in zip(cards, self.pool.render(cards, self.out_dir, self.art_dirs)):
+            if result.ok:
+                written.append(result.path)
+                try:
+                    self.manifest.keys[card["id"]] = card_key(card, self.art.get(card["id"]), frame_digest,
+                                                              layout_version)
+                except OSError:
+                    self.manifest.keys.pop(card["id"], None)
+                self.log(f"  {card['id']:<28} rendered {result.seconds * 1000:7.0f} ms")
+            else:
+                failed += 1
+                self.manifest.keys.pop(card["id"], None)
+                self.log(f"  {card['id']:<28} failed")
+                for line in result.error.splitlines():
+                    self.log(f"    {line}")
+        if written or removed:
+            self.manifest.save()
+
+        summary = f"{len(cards) - failed} rendered"
+        if failed:
+            summary += f", {failed} failed"
+        if removed:
+            summary += f", {len(removed)} removed"
+        self.log(f"  {summary} in {time.perf_counter() - start:.2f}s")
+        if written and self.notify_port:
+            if notify_reload(self.notify_port, written):
+                self.log(f"  notified the game ({len(written)} file(s))")
+            elif not self._notify_warned:
+                self.log(f"  no game listening on port {self.notify_port} (start it with CARD_RELOAD_PORT set)")
+                self._notify_warned = True
+        return written
+
+    def start(self):
+        """Load the cards, take the first scan and render cards whose output is missing or stale"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.cards = self._load_cards()
+        self.art = self._resolve_art(self.cards)
+        self.scan()
+        self.pool.start()
+
+        frame_digest = file_digest(self.back_path)
+        layout_version = CardBuilder.layout_version()
+        stale = set()
+        for card_id, card in self.cards.items():
+            out_path = os.path.join(self.out_dir, f"{card_id}.png")
+            try:
+                key = card_key(card, self.art[card_id], frame_digest, layout_version)
+            except OSError:
+                key = None
+            if key is None or not self.manifest.is_current(card_id, key, [out_path]):
+                stale.add(card_id)
+        self.log(f"Watching {len(self.cards)} cards from {self.cards_path} -> {self.out_dir}")
+        if stale:
+            self.log(f"  {len(stale)} card(s) out of date")
+            self.render(stale)
+
+    def run(self, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        """Watch until interrupted"""
+        self.start()
+        try:
+            while True:
+                changed = self.wait_for_changes(interval, debounce)
+                self.log(f"{time.strftime('%H:%M:%S')} {len(changed)} file(s) changed")
+                try:
+                    to_render, removed = self.affected(changed)
+                    if to_render or removed:
+                        self.render(to_render, removed)
+                    else:
+                        self.log("  no cards affected")
+                except Exception:
+                    # Keep watching; the next save usually fixes it
+                    self.log(traceback.format_exc())
+        finally:
+            self.pool.close()
@@ -5,16 +5,22 @@ GRIMDARK TCG - Hero Portrait Creator
 
 Usage:
     python create_hero_portrait.py <artwork.png> <hero_name> [--face-y 0.25] [--zoom 1.4]
+    python create_hero_portrait.py --batch heroes.json [--out-dir .] [--workers 4] [--force]
 
 Examples:
     python create_hero_portrait.py vampire_art.png hero_vampire --face-y 0.22 --zoom 1.4
     python create_hero_portrait.py demon_art.png hero_demon --face-y 0.30 --zoom 1.2
+    python create_hero_portrait.py --batch heroes.json
 
 Arguments:
     artwork.png  - Source artwork (any size, will be cropped/scaled)
     hero_name    - Output filename (without .png)
     --face-y     - Vertical position of face (0.0=top, 1.0=bottom, default=0.25)
     --zoom       - Zoom factor (1.0=fit to circle, >1=zoom in, default=1.0)
+    --batch      - JSON manifest of heroes, rendered in parallel:
+                   [{"artwork": "vampire_art.png", "name": "hero_vampire", "face_y": 0.22, "zoom": 1.4}, ...]
+                   Artwork paths are relative to the manifest. Heroes whose artwork,
+                   settings and frame are unchanged since the last run are skipped.
 
 Outputs:
     {hero_name}_full.png  - High resolution (1024x1024)
@@ -25,8 +31,11 @@ Requirements:
     - PIL/Pillow: pip install Pillow
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw
 import argparse
+import hashlib
+import json
 import os
 
 # === CONFIGURATION ===
@@ -36,26 +45,31 @@ PORTRAIT_RADIUS = 344      # Inner circle radius (calibrated to frame)
 PORTRAIT_DIAMETER = 688    # Inner circle diameter
 PORTRAIT_CENTER = 512      # Center of frame
 GAME_SIZE = 200            # Final game UI size
+MASK_SUPERSAMPLE = 4       # Circle mask is drawn this much larger, then downsampled
 
+# Bump when the compositing below changes so batch mode re-renders every hero
+PORTRAIT_VERSION = 2
+STAMP_FILE = ".hero_portraits.json"
 
-def create_hero_portrait(frame_path, artwork_path, output_name, face_y=0.25, zoom=1.0):
-    """
-    Create a hero portrait with the artwork placed inside the frame.
-    
-    Args:
-        frame_path: Path to hero_frame_clean.png
-        artwork_path: Path to source artwork
-        output_name: Base name for output files
-        face_y: Vertical position of face in artwork (0=top, 1=bottom)
-        zoom: Zoom factor (1.0=fit, higher=zoom in)
-    
-    Returns:
-        Tuple of (full_path, game_path) for created files
-    """
-    # Load images
-    frame = Image.open(frame_path).convert("RGBA")
-    artwork = Image.open(artwork_path).convert("RGBA")
-    
+# Per-process frame and mask, loaded once by _init_worker
+_frame = None
+_mask = None
+
+
+def load_frame(frame_path):
+    return Image.open(frame_path).convert("RGBA")
+
+
+def circle_mask(diameter=PORTRAIT_DIAMETER, supersample=MASK_SUPERSAMPLE):
+    """Antialiased circular mask: drawn at `supersample` x size, then box-filtered down"""
+    big = diameter * supersample
+    mask = Image.new("L", (big, big), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, big - 1, big - 1], fill=255)
+    return mask.resize((diameter, diameter), Image.Resampling.BOX)
+
+
+def compose_portrait(frame, mask, artwork, face_y=0.25, zoom=1.0):
+    """Place artwork inside the frame's circle; returns the FRAME_SIZE RGBA image"""
     art_w, art_h = artwork.size
     
     # Calculate crop region
@@ -77,18 +91,9 @@ def create_hero_portrait(frame_path, artwork_path, output_name, face_y=0.25, zoo
     right = left + actual_size
     bottom = top + actual_size
     
-    # Crop and resize to fit frame
+    # Crop and resize to fit frame, then cut the circle out of the resized art itself
     cropped = artwork.crop((left, top, right, bottom))
-    resized = cropped.resize((PORTRAIT_DIAMETER, PORTRAIT_DIAMETER), Image.Resampling.LANCZOS)
-    
-    # Create circular mask
-    mask = Image.new("L", (PORTRAIT_DIAMETER, PORTRAIT_DIAMETER), 0)
-    mask_draw = ImageDraw.Draw(mask)
-    mask_draw.ellipse([0, 0, PORTRAIT_DIAMETER - 1, PORTRAIT_DIAMETER - 1], fill=255)
-    
-    # Apply circular mask to portrait
-    circular_portrait = Image.new("RGBA", (PORTRAIT_DIAMETER, PORTRAIT_DIAMETER), (0, 0, 0, 0))
-    circular_portrait.paste(resized, (0, 0))
+    circular_portrait = cropped.resize((PORTRAIT_DIAMETER, PORTRAIT_DIAMETER), Image.Resampling.LANCZOS)
     circular_portrait.putalpha(mask)
     
     # Composite: portrait behind frame
@@ -96,15 +101,14 @@ def create_hero_portrait(frame_path, artwork_path, output_name, face_y=0.25, zoo
     offset = PORTRAIT_CENTER - PORTRAIT_RADIUS
     result.paste(circular_portrait, (offset, offset), circular_portrait)
     result.paste(frame, (0, 0), frame)
-    
-    # Determine output directory
-    output_dir = os.path.dirname(artwork_path) or "."
-    
-    # Save high-res version
+    return result
+
+
+def save_portrait(result, output_dir, output_name):
+    """Write {output_name}_full.png and the game-size {output_name}.png"""
     full_path = os.path.join(output_dir, f"{output_name}_full.png")
     result.save(full_path, "PNG")
     
-    # Save game-ready version
     game_result = result.resize((GAME_SIZE, GAME_SIZE), Image.Resampling.LANCZOS)
     game_path = os.path.join(output_dir, f"{output_name}.png")
     game_result.save(game_path, "PNG")
@@ -112,23 +116,191 @@ def create_hero_portrait(frame_path, artwork_path, output_name, face_y=0.25, zoo
     return full_path, game_path
 
 
+def create_hero_portrait(frame_path, artwork_path, output_name, face_y=0.25, zoom=1.0):
+    """
+    Create a hero portrait with the artwork placed inside the frame.
+    
+    Args:
+        frame_path: Path to hero_frame_clean.png
+        artwork_path: Path to source artwork
+        output_name: Base name for output files
+        face_y: Vertical position of face in artwork (0=top, 1=bottom)
+        zoom: Zoom factor (1.0=fit, higher=zoom in)
+    
+    Returns:
+        Tuple of (full_path, game_path) for created files
+    """
+    frame = load_frame(frame_path)
+    artwork = Image.open(artwork_path).convert("RGBA")
+    result = compose_portrait(frame, circle_mask(), artwork, face_y, zoom)
+    
+    # Outputs go next to the artwork
+    output_dir = os.path.dirname(artwork_path) or "."
+    return save_portrait(result, output_dir, output_name)
+
+
+# === BATCH MODE ===
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    Hero entries with artwork paths made relative to the manifest's directory.
+    
+    Raises OSError if the manifest can't be read, and ValueError if it isn't valid
+    JSON, isn't a list of heroes, or has an entry missing artwork or name or reusing a name.
+    """
+    with open(manifest_path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("heroes") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"{manifest_path}: expected a list of heroes or {{\"heroes\": [...]}}")
+    
+    base_dir = os.path.dirname(manifest_path)
+    heroes = []
+    names = set()
+    for index, entry in enumerate(entries):
+        missing = [field for field in ("artwork", "name") if not isinstance(entry, dict) or field not in entry]
+        if missing:
+            raise ValueError(f"{manifest_path}: hero {index} has no {' or '.join(missing)}")
+        if entry["name"] in names:
+            # Both would write {name}.png and share one stamp
+            raise ValueError(f"{manifest_path}: hero name {entry['name']!r} is used more than once")
+        names.add(entry["name"])
+        heroes.append({
+            "artwork": os.path.join(base_dir, entry["artwork"]),
+            "name": entry["name"],
+            "face_y": float(entry.get("face_y", 0.25)),
+            "zoom": float(entry.get("zoom", 1.0)),
+        })
+    return heroes
+
+
+def _hero_key(hero, frame_digest):
+    payload = [PORTRAIT_VERSION, frame_digest, _file_digest(hero["artwork"]), hero["face_y"], hero["zoom"]]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def _init_worker(frame_path):
+    global _frame, _mask
+    _frame = load_frame(frame_path)
+    _mask = circle_mask()
+
+
+def _render_hero(job):
+    """Render one manifest entry in the current worker; returns (name, error)"""
+    hero, output_dir = job
+    try:
+        artwork = Image.open(hero["artwork"]).convert("RGBA")
+        result = compose_portrait(_frame, _mask, artwork, hero["face_y"], hero["zoom"])
+        save_portrait(result, output_dir, hero["name"])
+        return hero["name"], None
+    except Exception as e:
+        return hero["name"], f"{type(e).__name__}: {e}"
+
+
+def create_hero_portraits(frame_path, heroes, output_dir, workers=None, force=False):
+    """
+    Render many heroes, loading the frame and mask once per worker.
+    
+    Args:
+        frame_path: Path to hero_frame_clean.png
+        heroes: Entries from load_manifest
+        output_dir: Directory for {name}_full.png and {name}.png
+        workers: Process count (default: CPU count, 1 = in-process)
+        force: Re-render heroes even if their inputs are unchanged
+    
+    Returns:
+        Dict of hero name -> "rendered", "unchanged" or an error message
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp_path = os.path.join(output_dir, STAMP_FILE)
+    try:
+        with open(stamp_path, encoding="utf-8") as f:
+            stamps = json.load(f)
+    except (OSError, ValueError):
+        stamps = {}
+    
+    frame_digest = _file_digest(frame_path)
+    status = {}
+    keys = {}
+    jobs = []
+    for hero in heroes:
+        name = hero["name"]
+        try:
+            keys[name] = _hero_key(hero, frame_digest)
+        except OSError as e:
+            status[name] = f"{type(e).__name__}: {e}"
+            continue
+        outputs = [os.path.join(output_dir, f"{name}_full.png"), os.path.join(output_dir, f"{name}.png")]
+        if not force and stamps.get(name) == keys[name] and all(os.path.exists(p) for p in outputs):
+            status[name] = "unchanged"
+        else:
+            jobs.append((hero, output_dir))
+    
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers == 1:
+        _init_worker(frame_path)
+        results = map(_render_hero, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frame_path,))
+        results = pool.map(_render_hero, jobs)
+    
+    try:
+        for name, error in results:
+            status[name] = error or "rendered"
+            if not error:
+                stamps[name] = keys[name]
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    
+    if jobs:
+        tmp_path = stamp_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stamps, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, stamp_path)
+    
+    return {hero["name"]: status[hero["name"]] for hero in heroes}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Create hero portraits for Grimdark TCG",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__
     )
-    parser.add_argument("artwork", help="Source artwork file")
-    parser.add_argument("name", help="Output name (without .png)")
+    parser.add_argument("artwork", nargs="?", help="Source artwork file")
+    parser.add_argument("name", nargs="?", help="Output name (without .png)")
     parser.add_argument("--face-y", type=float, default=0.25,
                         help="Vertical position of face (0=top, 1=bottom)")
     parser.add_argument("--zoom", type=float, default=1.0,
                         help="Zoom factor (1.0=fit, >1=zoom in)")
     parser.add_argument("--frame", default="hero_frame_clean.png",
                         help="Path to frame image")
+    parser.add_argument("--batch", metavar="MANIFEST",
+                        help="JSON manifest of heroes to render in one run")
+    parser.add_argument("--out-dir",
+                        help="Batch output directory (default: the manifest's directory)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Batch worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="Batch: re-render heroes even if unchanged")
     
     args = parser.parse_args()
     
+    if args.batch:
+        return run_batch(args)
+    
+    if not args.artwork or not args.name:
+        parser.error("artwork and name are required unless --batch is given")
+    
     if not os.path.exists(args.artwork):
         print(f"Error: Artwork file not found: {args.artwork}")
         return 1
@@ -158,5 +330,32 @@ def main():
     return 0
 
 
+def run_batch(args):
+    if not os.path.exists(args.frame):
+        print(f"Error: Frame file not found: {args.frame}")
+        return 1
+    
+    try:
+        heroes = load_manifest(args.batch)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 1
+    output_dir = args.out_dir or os.path.dirname(args.batch) or "."
+    print(f"Creating {len(heroes)} hero portraits in {output_dir}")
+    
+    status = create_hero_portraits(args.frame, heroes, output_dir, args.workers, args.force)
+    failed = 0
+    for name, state in status.items():
+        if state in ("rendered", "unchanged"):
+            print(f"  {name}: {state}")
+        else:
+            failed += 1
+            print(f"  {name}: FAILED ({state})")
+    
+    rendered = sum(1 for state in status.values() if state == "rendered")
+    print(f"\nRendered {rendered}, unchanged {len(status) - rendered - failed}, failed {failed}")
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
     exit(main())
@@ -151,7 +151,7 @@ function startTurn() {
     render();
     
     if (player.isAI && !game.gameOver) {
-        setTimeout(doAITurn, 800);
+        setTimeout(searchAIAvailable() ? doSearchAITurn : doAITurn, 800);
     }
 }
 
@@ -1136,6 +1136,133 @@ function resolveCombatAI(attacker, defender) {
     removeDeadCreatures(game.enemy);
 }
 
+// ============================================================================
+// SEARCH AI
+// Plans the AI's turn with card_system/search_ai.py through the Electron
+// bridge (main.js); without it, or if it fails, doAITurn plays instead
+// ============================================================================
+
+const SEARCH_AI_BUDGET_MS = 400;
+const SEARCH_AI_MAX_ACTIONS = 40;
+let searchAIFailed = false;
+
+function searchAIAvailable() {
+    return !searchAIFailed && typeof window !== 'undefined' && !!window.electronAPI?.planAITurn;
+}
+
+function serializeCardForAI(c) {
+    return {
+        id: c.id, isToken: !!c.isToken, cost: c.cost, hpCost: c.hpCost || 0,
+        attack: c.attack ?? null, defense: c.defense ?? null,
+        currentAttack: c.currentAttack ?? null, currentDefense: c.currentDefense ?? null,
+        keywords: [...(c.keywords || [])].sort(),
+        canAttack: !!c.canAttack, hasAttacked: !!c.hasAttacked, summonedThisTurn: !!c.summonedThisTurn,
+        attacksThisTurn: Number.isFinite(c.attacksThisTurn) ? c.attacksThisTurn : null,
+        curses: (c.curses || []).map(k => [k.type, k.turns ?? null]),
+        undyingUsed: !!c.undyingUsed, frenzyUsed: !!c.frenzyUsed, diesEndOfTurn: !!c.diesEndOfTurn
+    };
+}
+
+function serializeGameForAI() {
+    const side = p => ({
+        health: p.health, maxHealth: p.maxHealth, mana: p.mana, maxMana: p.maxMana,
+        fatigue: p.fatigue, curses: p.curses.map(k => k.id), deck: p.deck.map(c => c.id),
+        hand: p.hand.map(serializeCardForAI), board: p.board.map(serializeCardForAI),
+        graveyard: p.graveyard.map(serializeCardForAI)
+    });
+    return {
+        turnNumber: game.turnNumber, creaturesDeadThisTurn: game.creaturesDeadThisTurn, gameOver: game.gameOver,
+        current: game.currentTurn === game.enemy ? 'enemy' : 'player',
+        player: side(game.player), enemy: side(game.enemy)
+    };
+}
+
+async function doSearchAITurn() {
+    if (game.gameOver) return;
+    const enemy = game.enemy;
+    
+    try {
+        for (let i = 0; i < SEARCH_AI_MAX_ACTIONS; i++) {
+            if (game.gameOver || game.enemy !== enemy || game.currentTurn !== enemy) return;
+            const reply = await window.electronAPI.planAITurn(serializeGameForAI(), SEARCH_AI_BUDGET_MS);
+            if (reply.error) throw new Error(reply.error);
+            if (game.enemy !== enemy) return;
+            if (reply.action.type === 'end') break;
+            if (!applyAIAction(enemy, reply.action)) throw new Error(`Illegal action ${JSON.stringify(reply.action)}`);
+            render();
+            await new Promise(resolve => setTimeout(resolve, 400));
+        }
+    } catch (e) {
+        console.warn('Search AI unavailable, using the built-in AI:', e);
+        searchAIFailed = true;
+        if (game.enemy === enemy && game.currentTurn === enemy) doAITurn();
+        return;
+    }
+    
+    if (!game.gameOver && game.enemy === enemy) {
+        processEndOfTurn(enemy);
+        setTimeout(() => {
+            game.currentTurn = game.player;
+            startTurn();
+        }, 500);
+    }
+}
+
+function applyAIAction(ai, action) {
+    const opponent = getOpponent(ai);
+    if (action.type === 'play') {
+        const card = ai.hand[action.hand];
+        let target = action.target;
+        if (Array.isArray(target)) target = (target[0] === 'own' ? ai : opponent).board[target[1]];
+        if (!card || target === undefined) return false;
+        return playCard(ai, card, ai.board.length, target);
+    }
+    if (action.type === 'attack') {
+        const attacker = ai.board[action.attacker];
+        const target = action.target === null ? null : opponent.board[action.target];
+        if (!attacker || target === undefined) return false;
+        return tryAttackAI(attacker, target);
+    }
+    return false;
+}
+
+// tryAttack for the AI: the same checks, with combat resolved like doAITurn's
+function tryAttackAI(attacker, target) {
+    if (game.gameOver || game.currentTurn !== game.enemy) return false;
+    if (!attacker.canAttack || !game.enemy.board.includes(attacker)) return false;
+    
+    const maxAttacks = hasKeyword(attacker, 'feral') ? 2 : 1;
+    if (attacker.attacksThisTurn >= maxAttacks) return false;
+    if (target && !game.player.board.includes(target)) return false;
+    
+    const taunts = game.player.board.filter(c => hasKeyword(c, 'taunt'));
+    if (taunts.length && (target === null || !hasKeyword(target, 'taunt'))) return false;
+    if (target && hasKeyword(target, 'stealth') && !hasKeyword(attacker, 'bloodScent')) return false;
+    
+    if (hasKeyword(attacker, 'stealth')) {
+        attacker.keywords = attacker.keywords.filter(k => k !== 'stealth');
+    }
+    
+    attacker.attacksThisTurn++;
+    attacker.hasAttacked = true;
+    if (attacker.attacksThisTurn >= maxAttacks) attacker.canAttack = false;
+    
+    if (target === null) {
+        const dmg = attacker.currentAttack;
+        game.player.health -= dmg;
+        addLog(`Enemy ${attacker.name} hits you for ${dmg}`);
+        if (hasKeyword(attacker, 'drain')) {
+            game.enemy.health = Math.min(game.enemy.maxHealth, game.enemy.health + dmg);
+        }
+    } else {
+        addLog(`Enemy ${attacker.name} attacks ${target.name}`);
+        resolveCombatAI(attacker, target);
+    }
+    
+    checkGameOver();
+    return true;
+}
+
 // ============================================================================
 // SELECTION & DRAG/DROP
 // ============================================================================
@@ -1293,7 +1420,7 @@ function render() {
     for (let i = 0; i < enemyHandSize; i++) {
         const img = document.createElement('img');
         img.className = 'card-back';
-        img.src = 'images/card_back.png';
+        img.src = assetURL('images/card_back.png');
         
         // Calculate fan position centered on hand (inverted for enemy)
         const centerIndex = (enemyHandSize - 1) / 2;
@@ -1517,6 +1644,7 @@ function openDeckBuilder() {
     showScreen('deckbuilder-screen');
     deckBuilderDeck = [];
     renderDeckBuilder();
+    refreshCardRenders();
 }
 
 function renderDeckBuilder() {
@@ -1625,6 +1753,24 @@ function createDeckBuilderCard(id, card) {
         `;
     }
     
+    // Rendered card image over the text tile: from the render service, else (when
+    // configured) the card_system watch/render-all output in RENDERED_CARDS_DIR,
+    // reloaded through assetURL when watch mode re-renders it. The tile shows
+    // while the image is missing
+    const serviceURL = cardRenderURL(id, DECK_BUILDER_RENDER_WIDTH);
+    const renderURL = serviceURL || (renderedCardsAvailable ? assetURL(`${RENDERED_CARDS_DIR}/${id}.png`) : null);
+    if (renderURL) {
+        const img = document.createElement('img');
+        img.className = 'db-render';
+        img.alt = card.name;
+        img.draggable = false;
+        img.src = renderURL;
+        img.addEventListener('load', () => el.classList.add('rendered'));
+        img.addEventListener('error', () => el.classList.remove('rendered'));
+        if (serviceURL) el.classList.add('rendered');
+        el.prepend(img);
+    }
+    
     el.addEventListener('click', () => addToDeck(id));
     return el;
 }
@@ -1662,6 +1808,69 @@ function backToMenu() {
     showScreen('menu-screen');
 }
 
+// ============================================================================
+// RENDERED CARDS (card_system render service, via main.js CARD_RENDER_URL)
+// ============================================================================
+
+let renderServiceURL = null;
+// Card id -> render version from the service; part of each image URL, so only
+// cards whose render changed are fetched again
+let renderVersions = {};
+const DECK_BUILDER_RENDER_WIDTH = 280;
+// Where `cli.py render-all`/`watch --out ../game/images/cards` put card PNGs
+const RENDERED_CARDS_DIR = 'images/cards';
+// Set from main.js: the directory exists or watch mode is connected
+let renderedCardsAvailable = false;
+
+async function refreshCardRenders() {
+    if (!renderServiceURL) return;
+    try {
+        renderVersions = await window.electronAPI.renderVersions();
+    } catch (e) {
+        renderVersions = {};
+    }
+    renderDeckBuilder();
+}
+
+function cardRenderURL(id, width) {
+    const version = renderVersions[id];
+    if (!renderServiceURL || !version) return null;
+    return `${renderServiceURL}/card/${encodeURIComponent(id)}.jpg?width=${width}&v=${version}`;
+}
+
+// ============================================================================
+// ASSET RELOAD (card_system watch mode, via main.js when CARD_RELOAD_PORT is set)
+// ============================================================================
+
+// Absolute URL -> version stamp of images re-rendered while the game is open
+const assetVersions = {};
+
+function assetURL(path) {
+    const url = new URL(path, document.baseURI).href;
+    return assetVersions[url] ? `${url}?v=${assetVersions[url]}` : path;
+}
+
+// Point every <img> and inline background-image showing one of these files at
+// a fresh URL, so only the changed images are fetched again
+function reloadAssets(files) {
+    const stamp = Date.now();
+    for (const file of files) assetVersions[file] = stamp;
+    const versioned = url => {
+        const u = new URL(url, document.baseURI);
+        u.search = '';
+        return assetVersions[u.href] === stamp ? `${u.href}?v=${stamp}` : null;
+    };
+    document.querySelectorAll('img').forEach(img => {
+        const url = versioned(img.src);
+        if (url) img.src = url;
+    });
+    document.querySelectorAll('[style*="background-image"]').forEach(el => {
+        const match = /url\(["']?([^"')]+)["']?\)/.exec(el.style.backgroundImage);
+        const url = match && versioned(match[1]);
+        if (url) el.style.backgroundImage = `url("${url}")`;
+    });
+}
+
 // ============================================================================
 // EVENT LISTENERS
 // ============================================================================
@@ -1734,6 +1943,14 @@ document.addEventListener('DOMContentLoaded', () => {
     document.getElementById('save-deck-btn')?.addEventListener('click', saveDeck);
     document.getElementById('clear-deck-btn')?.addEventListener('click', clearDeck);
     document.getElementById('back-to-menu-btn')?.addEventListener('click', backToMenu);
+    window.electronAPI?.onAssetsChanged?.(reloadAssets);
+    window.electronAPI?.renderServiceURL?.().then(url => { renderServiceURL = url; });
+    window.electronAPI?.renderedCardsAvailable?.().then(available => { renderedCardsAvailable = available; });
+    // Pick up card edits when coming back from the editor
+    window.addEventListener('focus', () => {
+        const screen = document.getElementById('deckbuilder-screen');
+        if (screen && !screen.classList.contains('hidden')) refreshCardRenders();
+    });
     
     document.addEventListener('mousemove', onDrag);
     document.addEventListener('mousemove', updateHandHover);
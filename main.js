@@ -1,5 +1,106 @@
-const { app, BrowserWindow } = require('electron');
+const { app, BrowserWindow, ipcMain } = require('electron');
+const { spawn } = require('child_process');
+const fs = require('fs');
+const net = require('net');
 const path = require('path');
+const readline = require('readline');
+
+// Search AI (card_system/search_ai.py --serve): one JSON request per line on
+// stdin, one reply per line on stdout. Started on first use; if Python or the
+// script is missing, requests fail and the game falls back to its built-in AI
+const AI_PYTHON = process.env.CARD_AI_PYTHON || (process.platform === 'win32' ? 'python' : 'python3');
+const AI_SCRIPT = path.join(__dirname, 'card_system', 'search_ai.py');
+// How long past its budget a request may run (Python start-up, a stalled
+// process) before it is rejected and the game plays its built-in AI
+const AI_GRACE_MS = 2000;
+
+let aiProcess = null;
+let aiRequestId = 0;
+const aiPending = new Map();
+
+function failAIRequests(message) {
+    for (const { reject, timer } of aiPending.values()) {
+        clearTimeout(timer);
+        reject(new Error(message));
+    }
+    aiPending.clear();
+    aiProcess = null;
+}
+
+function startAIProcess() {
+    const proc = spawn(AI_PYTHON, [AI_SCRIPT, '--serve'], { stdio: ['pipe', 'pipe', 'inherit'] });
+    proc.on('error', e => failAIRequests(`Search AI failed to start: ${e.message}`));
+    proc.on('exit', code => failAIRequests(`Search AI exited (${code})`));
+    proc.stdin.on('error', () => {});
+    readline.createInterface({ input: proc.stdout }).on('line', line => {
+        let reply;
+        try {
+            reply = JSON.parse(line);
+        } catch (e) {
+            return;
+        }
+        const pending = aiPending.get(reply.id);
+        if (pending) {
+            aiPending.delete(reply.id);
+            clearTimeout(pending.timer);
+            pending.resolve(reply);
+        }
+    });
+    return proc;
+}
+
+ipcMain.handle('ai-plan', (event, state, budgetMs) => {
+    if (!aiProcess) aiProcess = startAIProcess();
+    const id = ++aiRequestId;
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            aiPending.delete(id);
+            reject(new Error(`Search AI did not reply within ${budgetMs + AI_GRACE_MS} ms`));
+        }, budgetMs + AI_GRACE_MS);
+        aiPending.set(id, { resolve, reject, timer });
+        aiProcess.stdin.write(JSON.stringify({ id, state, budget_ms: budgetMs }) + '\n');
+    });
+});
+
+// On-demand card images (python card_system/cli.py serve): the deck builder
+// shows rendered cards from CARD_RENDER_URL when it is set. The service sends no
+// CORS headers, so its JSON is fetched here; images load as plain <img> URLs
+ipcMain.handle('render-service-url', () => process.env.CARD_RENDER_URL || null);
+
+ipcMain.handle('render-versions', async () => {
+    const response = await fetch(`${process.env.CARD_RENDER_URL}/cards`);
+    if (!response.ok) throw new Error(`Render service: ${response.status}`);
+    return response.json();
+});
+
+// Whether the deck builder should look for rendered cards in game/images/cards:
+// only when they exist or watch mode is about to write them, so a stock install
+// doesn't try (and fail) to load one image per card
+ipcMain.handle('rendered-cards-available', () =>
+    !!process.env.CARD_RELOAD_PORT || fs.existsSync(path.join(__dirname, 'game', 'images', 'cards')));
+
+// Asset reload (python card_system/cli.py watch --notify-port <port>): with
+// CARD_RELOAD_PORT set, the watcher sends {"type": "assets-changed", "files": [...]}
+// lines to this localhost port and every window reloads just those images
+function startReloadServer(port) {
+    const server = net.createServer(socket => {
+        socket.on('error', () => {});
+        readline.createInterface({ input: socket }).on('line', line => {
+            let message;
+            try {
+                message = JSON.parse(line);
+            } catch (e) {
+                return;
+            }
+            if (message.type !== 'assets-changed') return;
+            for (const win of BrowserWindow.getAllWindows()) {
+                win.webContents.send('assets-changed', message.files || []);
+            }
+        });
+    });
+    server.on('error', e => console.warn(`Asset reload server: ${e.message}`));
+    server.listen(port, '127.0.0.1');
+}
 
 function createWindow() {
     const win = new BrowserWindow({
@@ -7,7 +108,8 @@ function createWindow() {
         height: 800,
         webPreferences: {
             nodeIntegration: false,
-            contextIsolation: true
+            contextIsolation: true,
+            preload: path.join(__dirname, 'preload.js')
         }
     });
 
@@ -17,7 +119,10 @@ function createWindow() {
     // win.webContents.openDevTools();
 }
 
-app.whenReady().then(createWindow);
+app.whenReady().then(() => {
+    createWindow();
+    if (process.env.CARD_RELOAD_PORT) startReloadServer(Number(process.env.CARD_RELOAD_PORT));
+});
 
 app.on('window-all-closed', () => {
     if (process.platform !== 'darwin') {
@@ -25,6 +130,10 @@ app.on('window-all-closed', () => {
     }
 });
 
+app.on('will-quit', () => {
+    if (aiProcess) aiProcess.kill();
+});
+
 app.on('activate', () => {
     if (BrowserWindow.getAllWindows().length === 0) {
         createWindow();
@@ -3,5 +3,10 @@ const { contextBridge, ipcRenderer } = require('electron');
 contextBridge.exposeInMainWorld('electronAPI', {
     exitGame: () => ipcRenderer.send('exit-game'),
     toggleFullscreen: () => ipcRenderer.invoke('toggle-fullscreen'),
-    isFullscreen: () => ipcRenderer.invoke('is-fullscreen')
+    isFullscreen: () => ipcRenderer.invoke('is-fullscreen'),
+    planAITurn: (state, budgetMs) => ipcRenderer.invoke('ai-plan', state, budgetMs),
+    onAssetsChanged: callback => ipcRenderer.on('assets-changed', (event, files) => callback(files)),
+    renderServiceURL: () => ipcRenderer.invoke('render-service-url'),
+    renderVersions: () => ipcRenderer.invoke('render-versions'),
+    renderedCardsAvailable: () => ipcRenderer.invoke('rendered-cards-available')
 });